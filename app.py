@@ -1,6 +1,7 @@
 from flask import Flask, Response, render_template,abort, request,stream_with_context, redirect, url_for, flash, send_file, jsonify
 import calculator
 #import re
+import hashlib
 import json
 import re
 import time
@@ -8,9 +9,7 @@ from io import BytesIO
 import uuid
 import tempfile
 import os
-from concurrent.futures import ProcessPoolExecutor
 from markupsafe import Markup
-import threading
 from datetime import datetime
 from dotenv import load_dotenv
 from reportlab.lib.pagesizes import letter
@@ -18,8 +17,14 @@ from reportlab.lib.units import inch
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib import colors
-from routes.education_routes import education_bp
-from modules import education_store
+from routes.education_routes import education_bp, lesson_fragments, sim_sessions
+from modules import content_store, education_store, event_archive
+from modules.content_store import lesson_content
+from modules.result_cache import ResultCache, make_key
+from modules.pdf_jobs import PRIORITIES, PdfJobQueue, QueueFull
+from modules.pdf_report import RENDER_VERSION as PDF_RENDER_VERSION, build_pdf_to_file
+from modules.artifact_store import ArtifactKind, ArtifactManager
+from modules.event_broadcaster import EventBroadcaster, TooManySubscribers
 
 # Load environment variables from .env file
 load_dotenv()
@@ -114,44 +119,98 @@ app.register_blueprint(education_bp)
 # Store last result cache for PDF export
 last_result = {'text': '', 'title': '', 'chemistry': 'LiFePO4', 'dod': '80'}
 
-# Background PDF executor and job store
-executor = ProcessPoolExecutor(max_workers=2)
-pdf_jobs = {}  # job_id -> {'future': Future, 'path': str}
-
-
-# Cleanup thread: remove temp PDF files older than X seconds
-def cleanup_temp_files(interval_seconds=1800, max_age_seconds=3600):
-    def _cleanup():
-        while True:
-            try:
-                now = datetime.now().timestamp()
-                for job_id, info in list(pdf_jobs.items()):
-                    path = info.get('path')
-                    # remove files older than max_age
-                    if path and os.path.exists(path):
-                        mtime = os.path.getmtime(path)
-                        if now - mtime > max_age_seconds:
-                            try:
-                                os.remove(path)
-                            except Exception:
-                                pass
-                            # also remove job entry
-                            try:
-                                del pdf_jobs[job_id]
-                            except Exception:
-                                pass
-                # sleep
-            except Exception:
-                pass
-            try:
-                threading.Event().wait(interval_seconds)
-            except Exception:
-                break
-
-
-# start cleanup thread as daemon
-cleanup_thread = threading.Thread(target=cleanup_temp_files, args=(1800, 3600), daemon=True)
-cleanup_thread.start()
+# PDF export queue shared by every gunicorn worker. Only the worker holding the
+# render lease runs a process pool; PDF_RENDER_MODE=external leaves rendering
+# to scripts/pdf_worker.py.
+pdf_queue = PdfJobQueue(
+    db_path=(os.environ.get("PDF_JOB_DB") or "").strip()
+    or os.path.join(os.path.dirname(education_store.db_path()), "pdf_jobs.db"),
+    output_dir=(os.environ.get("PDF_JOB_DIR") or "").strip()
+    or os.path.join(tempfile.gettempdir(), "battery_pdf_jobs"),
+    render_fn=build_pdf_to_file,
+    max_workers=int(os.environ.get("PDF_RENDER_WORKERS", "2")),
+    max_depth=int(os.environ.get("PDF_QUEUE_MAX_DEPTH", "50")),
+    cache_max_bytes=int(float(os.environ.get("PDF_CACHE_MAX_MB", "200")) * 1024 * 1024),
+    render_version=PDF_RENDER_VERSION,
+)
+if (os.environ.get("PDF_RENDER_MODE") or "web").strip().lower() != "external":
+    pdf_queue.start()
+
+# Memoised /calculator results. Set CALC_CACHE_SQLITE to a file path to share
+# entries between gunicorn workers; CALC_CACHE_MAX_ENTRIES=0 disables caching.
+calc_cache = ResultCache(
+    max_entries=int(os.environ.get("CALC_CACHE_MAX_ENTRIES", "256")),
+    ttl_seconds=float(os.environ.get("CALC_CACHE_TTL_SECONDS", "600")),
+    sqlite_path=(os.environ.get("CALC_CACHE_SQLITE") or "").strip() or None,
+)
+
+
+# Generated files (PDF exports, Mermaid PDFs) share one disk quota. Each kind
+# expires after its TTL since last access; past ARTIFACT_QUOTA_MB the
+# least-recently-used files go first.
+artifacts = ArtifactManager(quota_bytes=int(float(os.environ.get("ARTIFACT_QUOTA_MB", "512")) * 1024 * 1024))
+artifacts.register(ArtifactKind(
+    name="pdf_exports",
+    directory=pdf_queue.output_dir,
+    ttl_seconds=float(os.environ.get("PDF_ARTIFACT_TTL_SECONDS", "3600")),
+    delete_after_download=os.environ.get("PDF_DELETE_AFTER_DOWNLOAD", "0") == "1",
+    on_remove=pdf_queue.forget_artifact,
+))
+artifacts.register(ArtifactKind(
+    name="mermaid_pdfs",
+    directory=(os.environ.get("MERMAID_PDF_DIR") or "").strip()
+    or os.path.join(tempfile.gettempdir(), "mermaid_pdf"),
+    ttl_seconds=float(os.environ.get("MERMAID_PDF_TTL_SECONDS", "600")),
+    delete_after_download=True,
+))
+_pdf_job_max_age = float(os.environ.get("PDF_ARTIFACT_TTL_SECONDS", "3600"))
+artifacts.start(
+    float(os.environ.get("ARTIFACT_SWEEP_INTERVAL_SECONDS", "300")),
+    before_sweep=lambda: pdf_queue.purge_finished(_pdf_job_max_age),
+)
+
+# Roll old user_events into compressed archives (EVENT_RETENTION_DAYS=0 disables).
+_event_retention_days = float(os.getenv("EVENT_RETENTION_DAYS", "90") or 0)
+if _event_retention_days > 0:
+    event_archive.start_retention_job(
+        older_than_days=_event_retention_days,
+        interval_seconds=float(os.getenv("EVENT_RETENTION_INTERVAL_SECONDS", str(6 * 3600))),
+    )
+
+# Pick up lesson content edits without a restart (off when FLASK_ENV=production).
+if content_store.hot_reload_enabled():
+    lesson_content.start_watcher(float(os.getenv("CONTENT_HOT_RELOAD_INTERVAL_SECONDS", "1.0")))
+
+
+# One DB poller per process feeds every /admin/events/stream connection. Each
+# stream still holds a worker thread, so streams are capped per process and
+# closed after _EVENT_STREAM_MAX_SECONDS (EventSource reconnects and resumes).
+# A closed tab is only noticed when the next heartbeat write fails, so the
+# heartbeat is kept short, and a stream turned away by the cap gets a 200
+# with a `busy` event and a retry delay: EventSource gives up on non-200s.
+event_broadcaster = EventBroadcaster(
+    lambda after_id, limit: education_store.get_events_since(after_id, limit=limit),
+    education_store.latest_event_id,
+    poll_interval=float(os.getenv("EVENT_STREAM_POLL_SECONDS", "0.5")),
+    max_queue=int(os.getenv("EVENT_STREAM_MAX_QUEUE", "1000")),
+    max_replay=int(os.getenv("EVENT_STREAM_MAX_REPLAY", "1000")),
+    max_subscribers=int(os.getenv("EVENT_STREAM_MAX_SUBSCRIBERS", "1")),
+)
+_EVENT_STREAM_HEARTBEAT_SECONDS = float(os.getenv("EVENT_STREAM_HEARTBEAT_SECONDS", "5"))
+_EVENT_STREAM_MAX_SECONDS = float(os.getenv("EVENT_STREAM_MAX_SECONDS", "300"))
+
+# STREAM_SERVER_EMBED=1 also serves the streaming endpoints from an asyncio
+# loop in each worker (see stream_server.py); point the proxy's stream paths
+# at STREAM_SERVER_PORT so open streams stop holding gunicorn threads.
+if os.getenv("STREAM_SERVER_EMBED", "0") == "1":
+    import stream_server
+
+    stream_server.serve_in_thread(
+        stream_server.build_service(),
+        os.getenv("STREAM_SERVER_HOST", "0.0.0.0"),
+        int(os.getenv("STREAM_SERVER_PORT", "5002")),
+        reuse_port=True,
+    )
 
 
 def _require_admin_stream_token() -> None:
@@ -180,6 +239,9 @@ def admin_events_page():
           es.addEventListener("user_event", (e) => {{
             log.textContent += e.data + "\\n";
           }});
+          es.addEventListener("evicted", () => {{
+            log.textContent += "[SSE fell behind, reconnecting]\\n";
+          }});
           es.onerror = () => {{
             log.textContent += "[SSE disconnected]\\n";
           }};
@@ -197,21 +259,55 @@ def admin_events_recent():
     events = education_store.get_events_since(since, limit=limit)
     return {"events": events, "last_id": (events[-1]["id"] if events else since)}
 
+@app.get("/admin/cache/stats")
+def admin_cache_stats():
+    _require_admin_stream_token()
+    return {
+        "calculator": calc_cache.stats(),
+        "simulation_sessions": sim_sessions.stats(),
+        "education_db_pool": education_store.pool_stats(),
+        "event_writer": education_store.event_writer_stats(),
+        "event_retention": event_archive.job_status(),
+        "lesson_content": lesson_content.stats(),
+        "lesson_fragments": lesson_fragments.stats(),
+        "pdf_queue": pdf_queue.stats(),
+        "artifacts": artifacts.stats(),
+        "event_stream": event_broadcaster.stats(),
+    }
+
 @app.get("/admin/events/stream")
 def admin_events_stream():
+    """SSE feed of user_events, resumable via Last-Event-ID (or ?since=)."""
     _require_admin_stream_token()
+    try:
+        last_id = int(request.headers.get("Last-Event-ID") or request.args.get("since", "0"))
+    except ValueError:
+        abort(400, description="Last-Event-ID must be an integer")
+    try:
+        sub = event_broadcaster.subscribe(last_id)
+    except TooManySubscribers as e:
+        retry_ms = max(1000, int(_EVENT_STREAM_HEARTBEAT_SECONDS * 2000))
+        busy = {"error": "Too many open event streams", "open_streams": e.count, "retry_ms": retry_ms}
+        resp = Response(f"retry: {retry_ms}\nevent: busy\ndata: {json.dumps(busy)}\n\n",
+                        mimetype="text/event-stream")
+        resp.headers["Cache-Control"] = "no-cache"
+        return resp
+    deadline = time.monotonic() + _EVENT_STREAM_MAX_SECONDS
 
-    @stream_with_context
     def gen():
-        last_id = int(request.args.get("since", "0"))
-        while True:
-            events = education_store.get_events_since(last_id, limit=200)
-            for ev in events:
-                last_id = int(ev["id"])
-                yield f"id: {last_id}\n"
-                yield "event: user_event\n"
-                yield f"data: {json.dumps(ev, ensure_ascii=False)}\n\n"
-            time.sleep(0.5)
+        try:
+            yield "retry: 3000\n\n"
+            while time.monotonic() < deadline:
+                events = sub.get(_EVENT_STREAM_HEARTBEAT_SECONDS)
+                for ev in events:
+                    yield f"id: {ev['id']}\nevent: user_event\ndata: {json.dumps(ev, ensure_ascii=False)}\n\n"
+                if sub.evicted:
+                    yield f"event: evicted\ndata: {json.dumps({'last_id': sub.last_id})}\n\n"
+                    return
+                if not events:
+                    yield ": keepalive\n\n"
+        finally:
+            sub.close()
 
     resp = Response(gen(), mimetype="text/event-stream")
     resp.headers["Cache-Control"] = "no-cache"
@@ -219,125 +315,6 @@ def admin_events_stream():
     return resp
 
 
-def build_pdf_to_file(result_text, title, chemistry, dod, out_path):
-    """Builds the PDF using ReportLab and writes it to out_path (path string).
-    This function is executed in a separate process so it must be self-contained.
-    """
-    try:
-        # Strip HTML tags and convert <br> to newlines
-        plain_text = result_text.replace('<br>', '\n')
-        import re
-        plain_text = re.sub('<[^<]+?>', '', plain_text)
-
-        from reportlab.lib.pagesizes import letter
-        from reportlab.lib.units import inch
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-        from reportlab.lib import colors
-        from datetime import datetime
-
-        doc = SimpleDocTemplate(
-            out_path,
-            pagesize=letter,
-            rightMargin=0.75*inch,
-            leftMargin=0.75*inch,
-            topMargin=1*inch,
-            bottomMargin=0.75*inch
-        )
-
-        story = []
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#667eea'),
-            spaceAfter=6,
-            alignment=1
-        )
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#667eea'),
-            spaceAfter=12,
-            spaceBefore=6
-        )
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=11,
-            textColor=colors.HexColor('#333333'),
-            spaceAfter=6
-        )
-        cell_style = ParagraphStyle(
-            'CellText',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#333333')
-        )
-
-        story.append(Paragraph("Battery Design Report", title_style))
-        story.append(Spacer(1, 0.3*inch))
-
-        metadata = f"<b>Generated:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}<br/>"
-        metadata += f"<b>Report Type:</b> {title}<br/>"
-        metadata += f"<b>Chemistry:</b> {chemistry}<br/>"
-        metadata += f"<b>DOD:</b> {dod}%"
-        story.append(Paragraph(metadata, normal_style))
-        story.append(Spacer(1, 0.2*inch))
-
-        story.append(Paragraph("_" * 80, normal_style))
-        story.append(Spacer(1, 0.1*inch))
-
-        story.append(Paragraph("Configuration Details", heading_style))
-
-        lines = [line.strip() for line in plain_text.split('\n') if line.strip() and ':' in line]
-        table_data = [["Parameter", "Value"]]
-        for line in lines:
-            if ':' in line:
-                parts = line.split(':', 1)
-                param = parts[0].strip()
-                value = parts[1].strip()
-                table_data.append([
-                    Paragraph(param, cell_style),
-                    Paragraph(value, cell_style)
-                ])
-
-        if len(table_data) > 1:
-            table = Table(table_data, colWidths=[2.2*inch, 4.3*inch])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#667eea')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f9f9f9')),
-                ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#ddd')),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')]),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 10),
-                ('TOPPADDING', (0, 1), (-1, -1), 8),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-                ('LEFTPADDING', (0, 1), (-1, -1), 6),
-                ('RIGHTPADDING', (0, 1), (-1, -1), 6),
-            ]))
-            story.append(table)
-
-        doc.build(story)
-        return out_path
-    except Exception:
-        # ensure any partial file is removed on error
-        try:
-            if os.path.exists(out_path):
-                os.remove(out_path)
-        except Exception:
-            pass
-        raise
-
-
 @app.route('/', methods=['GET'])
 def index():
     """App landing page.
@@ -347,6 +324,49 @@ def index():
     return redirect(url_for('education.login'))
 
 
+# Every template that contributes bytes to a cached calculator result page.
+_RESULT_PAGE_TEMPLATES = ('result.html', '_favicon.html', '_site_footer.html')
+_result_template_versions = {}
+
+
+def _result_template_version():
+    """Hash of the result page templates, recomputed only when a file's mtime moves."""
+    files = [app.jinja_env.get_template(name).filename for name in _RESULT_PAGE_TEMPLATES]
+    stamp = tuple((path, os.stat(path).st_mtime_ns) for path in files)
+    version = _result_template_versions.get(stamp)
+    if version is None:
+        h = hashlib.sha256()
+        for path in files:
+            with open(path, 'rb') as fh:
+                h.update(fh.read())
+        version = h.hexdigest()[:16]
+        _result_template_versions.clear()
+        _result_template_versions[stamp] = version
+    return version
+
+
+def _cached_result_page(kind, params, title, compute):
+    """Return {'html', 'summary_text'} for a calculator result, memoised on inputs.
+
+    `params` must already be normalised (see calculator.normalize_*_inputs) so
+    equivalent submissions share one entry. The key includes the template
+    version, so a deploy that changes result.html never gets old HTML back
+    from the shared SQLite tier. Caching is bypassed in debug mode so
+    template edits show up immediately.
+    """
+    def _render():
+        res = compute()
+        return {
+            'html': render_template('result.html', title=title, result=res),
+            'summary_text': res['summary_text'],
+        }
+
+    if app.debug:
+        return _render()
+    key = make_key(kind, {'params': params, 'title': title, 'template': _result_template_version()})
+    return calc_cache.get_or_compute(key, _render)
+
+
 @app.route('/calculator', methods=['GET', 'POST'])
 def calculator_page():
     """Battery design calculator UI."""
@@ -365,7 +385,7 @@ def calculator_page():
                 chemistry = request.form.get('chemistry') or 'LiFePO4'
                 dod = int(request.form.get('dod') or 80)
 
-                res = calculator.compute_pack_design(
+                params = calculator.normalize_pack_inputs(
                     cell_voltage=cell_voltage,
                     cell_capacity=cell_capacity,
                     num_cells=num_cells,
@@ -377,14 +397,18 @@ def calculator_page():
                     chemistry=chemistry,
                     dod=dod
                 )
+                cached = _cached_result_page(
+                    'pack', params, 'Pack Design Result',
+                    lambda: calculator.compute_pack_design(**params),
+                )
 
                 # Store for PDF export
-                last_result['text'] = res['summary_text']
+                last_result['text'] = cached['summary_text']
                 last_result['title'] = 'Pack Design Result'
-                last_result['chemistry'] = chemistry
-                last_result['dod'] = str(dod)
+                last_result['chemistry'] = params['chemistry']
+                last_result['dod'] = str(params['dod'])
 
-                return render_template('result.html', title='Pack Design Result', result=res)
+                return cached['html']
 
             elif form_type == 'bank':
                 energy = float(request.form.get('energy') or 0)
@@ -392,15 +416,19 @@ def calculator_page():
                 chemistry = request.form.get('bank_chemistry') or 'LiFePO4'
                 dod = int(request.form.get('bank_dod') or 100)
 
-                res = calculator.compute_bank_design(energy, module_capacity, chemistry, dod)
+                params = calculator.normalize_bank_inputs(energy, module_capacity, chemistry, dod)
+                cached = _cached_result_page(
+                    'bank', params, 'Bank Design Result',
+                    lambda: calculator.compute_bank_design(**params),
+                )
 
                 # Store for PDF export
-                last_result['text'] = res['summary_text']
+                last_result['text'] = cached['summary_text']
                 last_result['title'] = 'Bank Design Result'
-                last_result['chemistry'] = chemistry
-                last_result['dod'] = str(dod)
+                last_result['chemistry'] = params['chemistry']
+                last_result['dod'] = str(params['dod'])
 
-                return render_template('result.html', title='Bank Design Result', result=res)
+                return cached['html']
 
         except Exception as e:
             flash(f'Error: {e}', 'danger')
@@ -410,6 +438,56 @@ def calculator_page():
     return render_template('index.html')
 
 
+# Upper bound on `max_cells` and on the number of series counts one topology
+# search may consider; keeps a single request from allocating without limit.
+_TOPOLOGY_MAX_CELLS = 100_000
+
+
+@app.route('/calculator/topologies', methods=['POST'])
+def calculator_topologies():
+    """Return a ranked shortlist of SxP layouts that meet the posted targets.
+
+    Accepts form fields or JSON: cell_voltage, cell_capacity, min_voltage,
+    max_voltage, min_energy_kwh, min_peak_kw, c_rate, cell_ir, max_cells,
+    max_sag_v, chemistry, dod, top_n.
+    """
+    data = request.get_json(silent=True) or request.form
+
+    def _num(name, default=None, cast=float):
+        raw = data.get(name)
+        if raw in (None, ''):
+            return default
+        return cast(raw)
+
+    try:
+        cell_voltage = _num('cell_voltage', 0.0)
+        max_voltage = _num('max_voltage', 0.0)
+        max_cells = _num('max_cells', None, int)
+        if max_cells is not None and max_cells > _TOPOLOGY_MAX_CELLS:
+            raise ValueError(f'max_cells must not exceed {_TOPOLOGY_MAX_CELLS}')
+        if cell_voltage > 0 and max_voltage / cell_voltage > _TOPOLOGY_MAX_CELLS:
+            raise ValueError(f'max_voltage allows more than {_TOPOLOGY_MAX_CELLS} cells in series')
+        shortlist = calculator.search_pack_topologies(
+            cell_voltage=cell_voltage,
+            cell_capacity=_num('cell_capacity', 0.0),
+            min_voltage=_num('min_voltage', 0.0),
+            max_voltage=max_voltage,
+            min_energy_kwh=_num('min_energy_kwh', 0.0),
+            min_peak_kw=_num('min_peak_kw', 0.0),
+            c_rate=_num('c_rate', 1.0),
+            cell_ir_milli=_num('cell_ir', 0.0),
+            max_cells=max_cells,
+            max_sag_v=_num('max_sag_v', None),
+            chemistry=data.get('chemistry') or 'LiFePO4',
+            dod=_num('dod', 80, int),
+            top_n=min(_num('top_n', 10, int), 100),
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"layouts": [calculator.pack_design_to_dict(row, with_summary=False) for row in shortlist]})
+
+
 @app.route('/export-pdf',methods = ['POST'])
 def export_pdf():
     # Allow the client to POST the result text (works across multiple workers)
@@ -423,77 +501,88 @@ def export_pdf():
     if not str(result_text).strip():
         return jsonify({"error": "No result to export"}), 400
 
-    tmp = tempfile.NamedTemporaryFile(prefix='battery_pdf_', suffix='.pdf', delete=False)
-    tmp_path = tmp.name
-    tmp.close()
-
-    job_id = str(uuid.uuid4())
-    future = executor.submit(build_pdf_to_file, result_text, title, chemistry, dod, tmp_path)
-    pdf_jobs[job_id] = {'future': future, 'path': tmp_path}
-
-    return jsonify({"job_id": job_id})
+    priority = PRIORITIES.get(
+        str(request.form.get('priority') or (req_json and req_json.get('priority')) or 'normal').lower(),
+        PRIORITIES['normal'],
+    )
+    payload = {'result_text': result_text, 'title': title, 'chemistry': chemistry, 'dod': dod}
+    try:
+        job = pdf_queue.submit(payload, priority=priority)
+    except QueueFull as e:
+        resp = jsonify({"error": "PDF queue is full, please retry shortly", "queue_depth": e.depth})
+        resp.status_code = 429
+        resp.headers["Retry-After"] = "10"
+        return resp
+
+    return jsonify({"job_id": job.id, "queue_position": pdf_queue.position(job)})
+
+
+def _pdf_job_json(job):
+    """Shared JSON body for the status endpoints; `status` keeps the old values."""
+    if job.status == 'error':
+        body = {'status': 'error', 'message': job.error}
+    elif job.status == 'done':
+        body = {'status': 'ready', 'download_url': url_for('download_pdf', job_id=job.id, _external=True)}
+    else:
+        body = {'status': 'working', 'position': pdf_queue.position(job)}
+    body['state'] = job.status
+    body['cache'] = job.cache
+    body['timing'] = job.timing()
+    return body
 
 
 @app.route('/pdf-status/<job_id>')
 def pdf_status_page(job_id):
-    job = pdf_jobs.get(job_id)
+    job = pdf_queue.get(job_id)
     if not job:
         return render_template('pdf_status.html', job_id=job_id, status='not_found')
-    future = job['future']
-    if future.done():
-        if future.exception():                
-           return render_template('pdf_status.html', job_id=job_id, status='error', message=str(future.exception()))
+    if job.status == 'error':
+        return render_template('pdf_status.html', job_id=job_id, status='error', message=job.error)
+    if job.status == 'done':
         return render_template('pdf_status.html', job_id=job_id, status='ready', url=url_for('download_pdf', job_id=job_id))
-    else:
-        return render_template('pdf_status.html', job_id=job_id, status='working')
+    return render_template('pdf_status.html', job_id=job_id, status='working')
 
 
 @app.route('/pdf-status-api/<job_id>')
 def pdf_status_api(job_id):
     """Return JSON status for a PDF job. Used by client-side polling."""
-    job = pdf_jobs.get(job_id)
+    job = pdf_queue.get(job_id)
     if not job:
         return jsonify({'status': 'not_found'}), 404
-    future = job['future']
-    if future.done():
-        if future.exception():
-            return jsonify({'status': 'error', 'message': str(future.exception())})
-        return jsonify({'status': 'ready', 'download_url': url_for('download_pdf', job_id=job_id, _external=True)})
-    else:
-        return jsonify({'status': 'working'})
+    return jsonify(_pdf_job_json(job))
 
 
 @app.route('/download/<job_id>')
 def download_pdf(job_id):
-    job = pdf_jobs.get(job_id)
+    job = pdf_queue.get(job_id)
     if not job:
         flash('File not found', 'danger')
         return redirect(url_for('calculator_page'))
-    future = job['future']
-    if not future.done():
+    if not job.finished:
         flash('File still being generated. Try again in a moment.', 'warning')
         return redirect(url_for('pdf_status_page', job_id=job_id))
-    path = job['path']
-    if not os.path.exists(path):
+    path = job.path
+    if job.status == 'error' or not os.path.exists(path):
         flash('Generated file missing', 'danger')
         return redirect(url_for('calculator_page'))
-    # send file and optionally remove after sending
-    return send_file(path, mimetype='application/pdf', as_attachment=True, download_name=os.path.basename(path))
+    body = path
+    if artifacts.kind('pdf_exports').delete_after_download:
+        # Read it first so the file can be removed before the response streams.
+        with open(path, 'rb') as fh:
+            body = BytesIO(fh.read())
+    artifacts.downloaded('pdf_exports', path)
+    return send_file(body, mimetype='application/pdf', as_attachment=True, download_name=f'battery_pdf_{job.id}.pdf')
 
 
 @app.route('/pdf-status-json/<job_id>')
 def pdf_status_json(job_id):
     """Return JSON status for a PDF job so clients can poll asynchronously."""
-    job = pdf_jobs.get(job_id)
+    job = pdf_queue.get(job_id)
     if not job:
         return jsonify({'status': 'not_found'}), 404
-    future = job['future']
-    if future.done():
-        # return external download URL
-        download_url = url_for('download_pdf', job_id=job_id, _external=True)
-        return jsonify({'status': 'ready', 'download_url': download_url})
-    else:
-        return jsonify({'status': 'working'})
+    return jsonify(_pdf_job_json(job))
+
+
 if __name__ == '__main__':
     # Tidy startup: allow controlling debug with env var, avoid double browser
     # opens from the reloader, and reduce werkzeug log noise.
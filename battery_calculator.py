@@ -10,6 +10,7 @@ import os
 import matplotlib.pyplot as plt
 from dataclasses import dataclass
 import math
+from modules import cycle_life as cycle_life_model
 
 icon_path = os.path.join(os.path.dirname(__file__), "Unleashing-Solar-Power-Illuminate-Your-Life-with-Solar-Panels-in-Poquoson-700x441.png")
 
@@ -17,23 +18,10 @@ icon_path = os.path.join(os.path.dirname(__file__), "Unleashing-Solar-Power-Illu
 # -------chemistry cycle and DOD for Energy bank design tab__
 class cycleLifeEstimator():
     def __init__(self):
-        self.base_cycle_life = {
-            "Li-ion": 500,
-            "LiFePO4": 2000,
-            "Lead Acid": 300,
-            "NiMH": 500
-        }
-        self.dod_multiplier = {
-            100: 1.0,
-            80: 1.2,
-            60: 1.5,
-            40: 2.0,
-            20: 3.0
-        }
+        self.base_cycle_life = cycle_life_model.BASE_CYCLE_LIFE
+        self.dod_multiplier = cycle_life_model.DOD_MULTIPLIER
     def estimate(self, chemistry: str, dod: int) -> int:
-        base = self.base_cycle_life.get(chemistry, 500)
-        multiplier = self.dod_multiplier.get(dod, 1.0)
-        return int(base * multiplier)    
+        return cycle_life_model.estimate_cycle_life(chemistry, dod)
 
 
 # --- Solar design dataclasses and helper functions ---
@@ -922,16 +910,7 @@ class BatteryCalculator(QMainWindow):
             conn_type = self.connection_type.currentText().lower()
             chem = self.chemistry_box.currentText() if hasattr(self, "chemistry_box") else "Li-ion"
             dod = int(self.dod_combo.currentText().replace("%", ""))  # get correct DOD value
-            cycle_life_dict = {
-                "Li-ion": 500,
-                "LiFePO4": 2000,
-                "Lead Acid": 300,
-                "NiMH": 500
-            }
-            dod_multiplier_dict = {100: 1.0, 80: 1.2, 60: 1.5, 40: 2.0, 20: 3.0}
-            cycle_life = cycle_life_dict.get(chem, 500)
-            dod_multiplier = dod_multiplier_dict.get(dod, 1.2)
-            cycle_life_estimate = int(cycle_life * dod_multiplier)
+            cycle_life_estimate = cycle_life_model.estimate_cycle_life(chem, dod)
 
             # Get user C-rate or default to 5
             c_rate = float(self.c_rate_input.text() or 5)
@@ -1,128 +1,415 @@
 """Calculator logic extracted from the original PyQt app.
 Provides functions to compute pack design and bank/module requirements.
+
+`compute_pack_design_batch` evaluates many pack configurations in a single
+NumPy pass and returns a structured array (one record per configuration).
+`compute_pack_design` is a thin single-row wrapper used by the web form.
 """
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 
-def estimate_cycle_life(chemistry: str, dod: int) -> int:
-    base_cycle_life = {
-        "Li-ion": 500,
-        "LiFePO4": 2000,
-        "Lead Acid": 300,
-        "NiMH": 500
-    }
-    dod_multiplier = {100: 1.0, 80: 1.2, 60: 1.5, 40: 2.0, 20: 3.0}
-    base = base_cycle_life.get(chemistry, 500)
-    multiplier = dod_multiplier.get(dod, 1.0)
-    return int(base * multiplier)
+from modules import cycle_life as cycle_life_model
 
 
-def compute_pack_design(cell_voltage: float,
-                        cell_capacity: float,
-                        num_cells: int,
-                        connection_type: str,
-                        series_cells: int = None,
-                        parallel_cells: int = None,
-                        c_rate: float = 5.0,
-                        cell_ir_milli: float = 0.0,
-                        chemistry: str = 'LiFePO4',
-                        dod: int = 80) -> Dict:
-    """Compute battery pack parameters and return a result dict.
+_SAFETY_VOLTAGES = {"Li-ion": 4.2, "LiFePO4": 3.65, "Lead Acid": 2.45, "NiMH": 1.5}
+_BMS_RECOMMENDATION = 'Use a BMS with cell balancing and over/under-voltage protection.'
 
-    Returns keys: series_cells, parallel_cells, total_voltage, rated_voltage,
-    total_capacity, total_energy_Wh, cycle_life_estimate, warnings, summary_html
+# Case/spelling variants seen in saved links, mapped to the names used above.
+_CHEMISTRY_ALIASES = {
+    "lifepo4": "LiFePO4",
+    "lfp": "LiFePO4",
+    "li-ion": "Li-ion",
+    "liion": "Li-ion",
+    "li ion": "Li-ion",
+    "lead acid": "Lead Acid",
+    "lead-acid": "Lead Acid",
+    "nimh": "NiMH",
+}
+
+
+def canonical_chemistry(name: str) -> str:
+    """Return the canonical chemistry name (unknown names are only trimmed)."""
+    name = (name or '').strip()
+    return _CHEMISTRY_ALIASES.get(name.lower(), name)
+
+
+def canonical_connection(name: str) -> str:
+    """Return 'series', 'parallel' or 'series-parallel' style names in lower case."""
+    return '-'.join((name or '').strip().lower().replace('_', ' ').split())
+
+
+def normalize_pack_inputs(cell_voltage, cell_capacity, num_cells, connection_type,
+                          series_cells=None, parallel_cells=None, c_rate=5.0,
+                          cell_ir_milli=0.0, chemistry='LiFePO4', dod=80,
+                          precision: int = 6) -> Dict:
+    """Return canonical `compute_pack_design` kwargs for equivalent form inputs.
+
+    Floats are rounded to `precision` decimals, names are canonicalised and
+    inputs the chosen connection type ignores are dropped, so the result can
+    be used both as a cache key and as the arguments actually computed with.
     """
+    conn = canonical_connection(connection_type)
+    num_cells = int(num_cells)
+    if conn == 'series-parallel':
+        series_cells = int(series_cells) if series_cells else None
+        parallel_cells = int(parallel_cells) if parallel_cells else None
+        if series_cells and parallel_cells:
+            num_cells = series_cells * parallel_cells
+    else:
+        series_cells = parallel_cells = None
+    return {
+        'cell_voltage': round(float(cell_voltage), precision),
+        'cell_capacity': round(float(cell_capacity), precision),
+        'num_cells': num_cells,
+        'connection_type': conn,
+        'series_cells': series_cells,
+        'parallel_cells': parallel_cells,
+        'c_rate': round(float(c_rate), precision),
+        'cell_ir_milli': round(float(cell_ir_milli), precision),
+        'chemistry': canonical_chemistry(chemistry),
+        'dod': int(dod),
+    }
+
+
+def normalize_bank_inputs(target_energy_kwh, module_capacity_kwh, chemistry='LiFePO4',
+                          dod=100, precision: int = 6) -> Dict:
+    """Return canonical `compute_bank_design` kwargs (see `normalize_pack_inputs`)."""
+    return {
+        'target_energy_kwh': round(float(target_energy_kwh), precision),
+        'module_capacity_kwh': round(float(module_capacity_kwh), precision),
+        'chemistry': canonical_chemistry(chemistry),
+        'dod': int(dod),
+    }
+
+
+def estimate_cycle_life(chemistry: str, dod: int) -> int:
+    return cycle_life_model.estimate_cycle_life(chemistry, dod)
+
+
+def _lookup(table: Dict, keys: np.ndarray, default: float) -> np.ndarray:
+    """Map every element of `keys` through `table` (one dict probe per unique key)."""
+    if keys.size == 1:
+        return np.full(keys.shape, table.get(keys.flat[0].item(), default), dtype=float)
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    values = np.array([table.get(k.item(), default) for k in uniq], dtype=float)
+    return values[inverse].reshape(keys.shape)
+
+
+def estimate_cycle_life_batch(chemistry, dod) -> np.ndarray:
+    """Vectorised `estimate_cycle_life` over arrays of chemistry names and DOD values."""
+    return cycle_life_model.estimate_cycle_life_batch(chemistry, dod)
+
+
+def _resolve_topology(num_cells: int, connection_type: str,
+                      series_cells=None, parallel_cells=None) -> Tuple[int, int]:
+    """Return (series, parallel) for a connection type as entered on the form."""
     conn = connection_type.lower()
     if conn == 'series':
-        series = num_cells
-        parallel = 1
-    elif conn == 'parallel':
-        series = 1
-        parallel = num_cells
-    elif conn in ('series-parallel', 'series_parallel'):
+        return num_cells, 1
+    if conn == 'parallel':
+        return 1, num_cells
+    if conn in ('series-parallel', 'series_parallel'):
         if not series_cells or not parallel_cells:
             raise ValueError('series and parallel values required for series-parallel')
-        series = int(series_cells)
-        parallel = int(parallel_cells)
-        if series * parallel != num_cells:
-            # continue but warn
-            mismatch = True
-        else:
-            mismatch = False
-    else:
-        raise ValueError('Invalid connection type')
+        # A series*parallel != num_cells mismatch is tolerated (the explicit
+        # SxP values win), matching the behaviour of the original form.
+        return int(series_cells), int(parallel_cells)
+    raise ValueError('Invalid connection type')
+
+
+def _pack_design_dtype(chemistry_dtype: np.dtype) -> np.dtype:
+    return np.dtype([
+        ('cell_voltage', 'f8'),
+        ('series_cells', 'i8'),
+        ('parallel_cells', 'i8'),
+        ('chemistry', chemistry_dtype),
+        ('dod', 'i8'),
+        ('c_rate', 'f8'),
+        ('total_voltage', 'f8'),
+        ('rated_voltage', 'f8'),
+        ('total_capacity_Ah', 'f8'),
+        ('total_energy_Wh', 'f8'),
+        ('cycle_life_estimate', 'i8'),
+        ('has_ir', '?'),
+        ('pack_ir_milliohm', 'f8'),
+        ('voltage_sag_V', 'f8'),
+        ('max_power_kW', 'f8'),
+        ('runtime_hrs', 'i8'),
+        ('max_cell_voltage', 'f8'),
+        ('overvoltage', '?'),
+        ('needs_bms', '?'),
+    ])
+
+
+def compute_pack_design_batch(cell_voltage,
+                              cell_capacity,
+                              series_cells,
+                              parallel_cells,
+                              c_rate=5.0,
+                              cell_ir_milli=0.0,
+                              chemistry='LiFePO4',
+                              dod=80) -> np.ndarray:
+    """Compute pack parameters for many configurations at once.
+
+    Every argument may be a scalar or a 1-D array; scalars are broadcast
+    against the arrays. Returns a NumPy structured array with one record per
+    configuration. IR-derived fields (pack IR, sag, max power) are NaN where
+    `has_ir` is False. Warnings are exposed as boolean flags (`overvoltage`,
+    `needs_bms`); use `render_pack_summary` / `pack_design_to_dict` to build
+    the human-readable text only for the rows you need.
+    """
+    chem = np.asarray(chemistry, dtype=str)
+    (cell_voltage, cell_capacity, series, parallel,
+     c_rate, cell_ir_milli, dod, chem) = np.broadcast_arrays(
+        np.asarray(cell_voltage, dtype=float),
+        np.asarray(cell_capacity, dtype=float),
+        np.asarray(series_cells, dtype=np.int64),
+        np.asarray(parallel_cells, dtype=np.int64),
+        np.asarray(c_rate, dtype=float),
+        np.asarray(cell_ir_milli, dtype=float),
+        np.asarray(dod, dtype=np.int64),
+        chem,
+    )
+    if cell_voltage.ndim > 1:
+        raise ValueError('batch inputs must be scalars or 1-D arrays')
+    cell_voltage = np.atleast_1d(cell_voltage)
+    n = cell_voltage.shape[0]
+
+    out = np.empty(n, dtype=_pack_design_dtype(chem.dtype))
+    out['cell_voltage'] = cell_voltage
+    out['series_cells'] = series
+    out['parallel_cells'] = parallel
+    out['chemistry'] = chem
+    out['dod'] = dod
+    out['c_rate'] = c_rate
 
     total_voltage = cell_voltage * series
-    nominal_voltage = (cell_voltage - 0.2)
-    rated_voltage = nominal_voltage * series
     total_capacity = cell_capacity * parallel
-    total_energy_Wh = total_voltage * total_capacity
-
-    cycle_life_estimate = estimate_cycle_life(chemistry, dod)
+    out['total_voltage'] = total_voltage
+    out['rated_voltage'] = (cell_voltage - 0.2) * series
+    out['total_capacity_Ah'] = total_capacity
+    out['total_energy_Wh'] = total_voltage * total_capacity
+    out['cycle_life_estimate'] = estimate_cycle_life_batch(chem, dod)
 
-    # Internal resistance calculations
+    # Internal resistance model: pack IR scales with S/P, sag at the rated C-rate.
     cell_ir = cell_ir_milli / 1000.0
-    ir_lines = ""
-    runtime = 0
-    max_power = None
-    voltage_sag = None
-    if cell_ir > 0:
+    has_ir = cell_ir > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
         pack_ir = cell_ir * series / parallel
         max_current = total_capacity * c_rate
         voltage_sag = pack_ir * max_current
         max_power = (total_voltage - voltage_sag) * max_current
-        runtime = int(total_capacity // max_current) if max_current > 0 else 0
-        ir_lines = {
-            'pack_ir_milliohm': pack_ir * 1000.0,
-            'voltage_sag_V': voltage_sag,
-            'max_power_kW': (max_power / 1000.0) if max_power is not None else None,
-        }
-
-    safety_voltages = {"Li-ion": 4.2, "LiFePO4": 3.65, "Lead Acid": 2.45, "NiMH": 1.5}
-    max_cell_v = safety_voltages.get(chemistry, 4.2)
-    warning = None
-    if cell_voltage > max_cell_v:
-        warning = f"Cell voltage {cell_voltage}V exceeds safe max {max_cell_v}V for {chemistry}"
-
-    bms_recommendation = None
-    if series > 1:
-        bms_recommendation = 'Use a BMS with cell balancing and over/under-voltage protection.'
+        runtime = np.where(max_current > 0, np.floor_divide(total_capacity, max_current), 0.0)
+    out['has_ir'] = has_ir
+    out['pack_ir_milliohm'] = np.where(has_ir, pack_ir * 1000.0, np.nan)
+    out['voltage_sag_V'] = np.where(has_ir, voltage_sag, np.nan)
+    out['max_power_kW'] = np.where(has_ir, max_power / 1000.0, np.nan)
+    out['runtime_hrs'] = np.where(has_ir & np.isfinite(runtime), runtime, 0).astype(np.int64)
+
+    max_cell_v = _lookup(_SAFETY_VOLTAGES, chem, 4.2)
+    out['max_cell_voltage'] = max_cell_v
+    out['overvoltage'] = cell_voltage > max_cell_v
+    out['needs_bms'] = series > 1
+    return out
+
+
+def _row_warning(row) -> Optional[str]:
+    if not row['overvoltage']:
+        return None
+    return (f"Cell voltage {float(row['cell_voltage'])}V exceeds safe max "
+            f"{float(row['max_cell_voltage'])}V for {row['chemistry']}")
 
+
+def _row_ir_info(row):
+    if not row['has_ir']:
+        return ""
+    return {
+        'pack_ir_milliohm': float(row['pack_ir_milliohm']),
+        'voltage_sag_V': float(row['voltage_sag_V']),
+        'max_power_kW': float(row['max_power_kW']),
+    }
+
+
+def render_pack_summary(row) -> str:
+    """Render the plain-text summary for one record of `compute_pack_design_batch`."""
+    series = int(row['series_cells'])
+    total_energy_Wh = float(row['total_energy_Wh'])
+    c_rate = float(row['c_rate'])
     summary = (
-        f"Configuration: {series}S{parallel}P\n"
-        f"Chemistry: {chemistry}\n"
-        f"Rated Voltage: {rated_voltage:.2f} V\n"
-        f"Nominal Voltage: {total_voltage:.2f} V\n"
-        f"Rated Capacity: {total_capacity:.2f} Ah\n"
+        f"Configuration: {series}S{int(row['parallel_cells'])}P\n"
+        f"Chemistry: {row['chemistry']}\n"
+        f"Rated Voltage: {float(row['rated_voltage']):.2f} V\n"
+        f"Nominal Voltage: {float(row['total_voltage']):.2f} V\n"
+        f"Rated Capacity: {float(row['total_capacity_Ah']):.2f} Ah\n"
         f"Total Energy: {total_energy_Wh/1000.0:.2f} kWh ({total_energy_Wh:.2f} Wh)\n"
-        f"Estimated Cycle Life: {cycle_life_estimate} cycles @ {dod}% DOD\n"
+        f"Estimated Cycle Life: {int(row['cycle_life_estimate'])} cycles @ {int(row['dod'])}% DOD\n"
     )
 
-    if isinstance(ir_lines, dict) and ir_lines:
-        summary += (f"Pack IR: {ir_lines['pack_ir_milliohm']:.2f} mΩ\n"
-                    f"Voltage Sag @ {c_rate:.1f}C: {ir_lines['voltage_sag_V']:.2f} V\n"
-                    f"Max Power @ {c_rate:.1f}C: {ir_lines['max_power_kW']:.2f} kW\n")
+    if row['has_ir']:
+        summary += (f"Pack IR: {float(row['pack_ir_milliohm']):.2f} mΩ\n"
+                    f"Voltage Sag @ {c_rate:.1f}C: {float(row['voltage_sag_V']):.2f} V\n"
+                    f"Max Power @ {c_rate:.1f}C: {float(row['max_power_kW']):.2f} kW\n")
 
-    if bms_recommendation:
-        summary += f"Recommendation: {bms_recommendation}\n"
+    if row['needs_bms']:
+        summary += f"Recommendation: {_BMS_RECOMMENDATION}\n"
+    warning = _row_warning(row)
     if warning:
         summary += f"Warning: {warning}\n"
+    runtime = int(row['runtime_hrs'])
     if runtime:
         summary += f"Runtime (hrs): {runtime}\n"
+    return summary
 
-    return {
-        'series_cells': series,
-        'parallel_cells': parallel,
-        'total_voltage': total_voltage,
-        'rated_voltage': rated_voltage,
-        'total_capacity_Ah': total_capacity,
-        'total_energy_Wh': total_energy_Wh,
-        'cycle_life_estimate': cycle_life_estimate,
-        'ir_info': ir_lines,
-        'warning': warning,
-        'bms_recommendation': bms_recommendation,
-        'summary_text': summary,
+
+def render_pack_summaries(result: np.ndarray) -> List[str]:
+    """Render summaries for every record of a batch result."""
+    return [render_pack_summary(row) for row in result]
+
+
+def pack_design_to_dict(row, with_summary: bool = True) -> Dict:
+    """Convert one batch record to the dict shape returned by `compute_pack_design`."""
+    out = {
+        'series_cells': int(row['series_cells']),
+        'parallel_cells': int(row['parallel_cells']),
+        'total_voltage': float(row['total_voltage']),
+        'rated_voltage': float(row['rated_voltage']),
+        'total_capacity_Ah': float(row['total_capacity_Ah']),
+        'total_energy_Wh': float(row['total_energy_Wh']),
+        'cycle_life_estimate': int(row['cycle_life_estimate']),
+        'ir_info': _row_ir_info(row),
+        'warning': _row_warning(row),
+        'bms_recommendation': _BMS_RECOMMENDATION if row['needs_bms'] else None,
     }
+    if with_summary:
+        out['summary_text'] = render_pack_summary(row)
+    return out
+
+
+def compute_pack_design(cell_voltage: float,
+                        cell_capacity: float,
+                        num_cells: int,
+                        connection_type: str,
+                        series_cells: int = None,
+                        parallel_cells: int = None,
+                        c_rate: float = 5.0,
+                        cell_ir_milli: float = 0.0,
+                        chemistry: str = 'LiFePO4',
+                        dod: int = 80) -> Dict:
+    """Compute battery pack parameters and return a result dict.
+
+    Returns keys: series_cells, parallel_cells, total_voltage, rated_voltage,
+    total_capacity_Ah, total_energy_Wh, cycle_life_estimate, ir_info, warning,
+    bms_recommendation, summary_text
+    """
+    series, parallel = _resolve_topology(num_cells, connection_type, series_cells, parallel_cells)
+    if cell_ir_milli > 0 and parallel <= 0:
+        raise ValueError('at least one parallel cell is required for IR calculations')
+    result = compute_pack_design_batch(
+        cell_voltage, cell_capacity, series, parallel,
+        c_rate=c_rate, cell_ir_milli=cell_ir_milli, chemistry=chemistry, dod=dod,
+    )
+    return pack_design_to_dict(result[0])
+
+
+def search_pack_topologies(cell_voltage: float,
+                           cell_capacity: float,
+                           min_voltage: float,
+                           max_voltage: float,
+                           min_energy_kwh: float = 0.0,
+                           min_peak_kw: float = 0.0,
+                           c_rate: float = 1.0,
+                           cell_ir_milli: float = 0.0,
+                           max_cells: Optional[int] = None,
+                           max_sag_v: Optional[float] = None,
+                           chemistry: str = 'LiFePO4',
+                           dod: int = 80,
+                           top_n: int = 10) -> np.ndarray:
+    """Enumerate feasible SxP layouts for one cell type and return a ranked shortlist.
+
+    Targets: pack voltage window (nominal, `cell_voltage * S`), minimum energy,
+    minimum peak power at `c_rate`, and a cell-count and/or voltage-sag
+    budget. At least one of `max_cells` / `max_sag_v` must be given.
+
+    Instead of trying every S and P, each series count is bounded
+    analytically using the same model as `compute_pack_design_batch`:
+    sag = IR*S/P * (cap*P*C) does not depend on P, so a series count either
+    meets the sag budget or is dropped outright; energy and peak power grow
+    linearly with P, giving a closed-form minimum P; `max_cells` caps P from
+    above. Without `max_cells` only the minimum P per S is returned. Only
+    the smallest `top_n` P values per S can make the shortlist, so only
+    those are evaluated, in one batch pass, and ranked by cell count, then
+    sag, then energy. Returns a structured array (see
+    `compute_pack_design_batch`) of at most `top_n` rows.
+    """
+    if max_cells is None and max_sag_v is None:
+        raise ValueError('max_cells or max_sag_v is required')
+    if cell_voltage <= 0 or cell_capacity <= 0:
+        raise ValueError('cell voltage and capacity must be positive')
+    if min_voltage > max_voltage:
+        raise ValueError('min_voltage must not exceed max_voltage')
+
+    s_lo = max(1, int(np.ceil(min_voltage / cell_voltage - 1e-9)))
+    s_hi = int(np.floor(max_voltage / cell_voltage + 1e-9))
+    if max_cells is not None:
+        s_hi = min(s_hi, int(max_cells))
+    empty = compute_pack_design_batch(cell_voltage, cell_capacity, 1, 1, c_rate,
+                                      cell_ir_milli, chemistry, dod)[:0]
+    if s_hi < s_lo:
+        return empty
+
+    series = np.arange(s_lo, s_hi + 1, dtype=np.int64)
+    pack_v = cell_voltage * series
+    sag = (cell_ir_milli / 1000.0) * series * cell_capacity * c_rate
+    keep = np.ones(series.shape, dtype=bool)
+    if max_sag_v is not None:
+        keep &= sag <= max_sag_v
+
+    # Minimum P from the energy target and from the peak power target.
+    p_min = np.ones(series.shape, dtype=np.int64)
+    if min_energy_kwh > 0:
+        p_energy = np.ceil(min_energy_kwh * 1000.0 / (pack_v * cell_capacity) - 1e-9)
+        p_min = np.maximum(p_min, p_energy.astype(np.int64))
+    if min_peak_kw > 0:
+        watts_per_p = (pack_v - sag) * cell_capacity * c_rate
+        keep &= watts_per_p > 0
+        with np.errstate(divide='ignore'):
+            p_power = np.ceil(min_peak_kw * 1000.0 / np.where(keep, watts_per_p, 1.0) - 1e-9)
+        p_min = np.maximum(p_min, p_power.astype(np.int64))
+
+    if max_cells is not None:
+        p_max = int(max_cells) // series
+    else:
+        p_max = p_min.copy()
+    keep &= p_max >= p_min
+    series, p_min, p_max = series[keep], p_min[keep], p_max[keep]
+    if series.size == 0:
+        return empty
+
+    # Rows rank by cell count, then sag (fixed per S), then energy, all of
+    # which grow with P, so no S contributes more than its `top_n` smallest
+    # P values. One spare covers a p_min dropped by the re-check below.
+    counts = np.minimum(p_max - p_min + 1, max(0, int(top_n)) + 1)
+    cand_s = np.repeat(series, counts)
+    offsets = np.arange(cand_s.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    cand_p = np.repeat(p_min, counts) + offsets
+
+    result = compute_pack_design_batch(cell_voltage, cell_capacity, cand_s, cand_p,
+                                       c_rate, cell_ir_milli, chemistry, dod)
+    # Exact re-check on the evaluated rows guards the rounding slack above.
+    ok = ((result['total_voltage'] >= min_voltage - 1e-9)
+          & (result['total_voltage'] <= max_voltage + 1e-9)
+          & (result['total_energy_Wh'] >= min_energy_kwh * 1000.0 - 1e-6))
+    if min_peak_kw > 0:
+        peak_kw = np.where(result['has_ir'], result['max_power_kW'],
+                           result['total_voltage'] * result['total_capacity_Ah'] * c_rate / 1000.0)
+        ok &= peak_kw >= min_peak_kw - 1e-9
+    result = result[ok]
+
+    sag_v = np.nan_to_num(result['voltage_sag_V'], nan=0.0)
+    order = np.lexsort((result['total_energy_Wh'], sag_v,
+                        result['series_cells'] * result['parallel_cells']))
+    return result[order[:max(0, int(top_n))]]
 
 
 def compute_bank_design(target_energy_kwh: float, module_capacity_kwh: float, chemistry: str = 'LiFePO4', dod: int = 100) -> Dict:
@@ -7,12 +7,24 @@ from pathlib import Path
 
 from flask import Flask, flash, render_template, request, send_file
 
+from modules.artifact_store import ArtifactKind, ArtifactManager
 from scripts.generate_system_pdf import build_pdf, parse_mermaid
 
 
 standalone_app = Flask(__name__)
 standalone_app.config["SECRET_KEY"] = os.environ.get("MERMAID_PDF_SECRET_KEY", "dev")
 
+# PDFs are deleted once read back into memory; the sweeper only catches ones
+# orphaned by a crash. The main app sweeps the same directory.
+artifacts = ArtifactManager(quota_bytes=int(float(os.environ.get("ARTIFACT_QUOTA_MB", "512")) * 1024 * 1024))
+mermaid_pdfs = artifacts.register(ArtifactKind(
+    name="mermaid_pdfs",
+    directory=(os.environ.get("MERMAID_PDF_DIR") or "").strip()
+    or os.path.join(tempfile.gettempdir(), "mermaid_pdf"),
+    ttl_seconds=float(os.environ.get("MERMAID_PDF_TTL_SECONDS", "600")),
+    delete_after_download=True,
+))
+
 
 def _safe_pdf_download_name(raw_name: str | None) -> str:
     name = (raw_name or "mermaid_diagram").strip()
@@ -41,7 +53,9 @@ def mermaid_home():
         tmp_path = ""
         try:
             diagram = parse_mermaid(mermaid_text)
-            tmp = tempfile.NamedTemporaryFile(prefix="mermaid_pdf_", suffix=".pdf", delete=False)
+            tmp = tempfile.NamedTemporaryFile(
+                prefix="mermaid_pdf_", suffix=".pdf", dir=mermaid_pdfs.directory, delete=False
+            )
             tmp_path = tmp.name
             tmp.close()
 
@@ -57,11 +71,8 @@ def mermaid_home():
                 output_name=output_name_raw,
             )
         finally:
-            try:
-                if tmp_path and os.path.exists(tmp_path):
-                    os.remove(tmp_path)
-            except Exception:
-                pass
+            if tmp_path:
+                artifacts.downloaded(mermaid_pdfs.name, tmp_path)
 
         return send_file(
             BytesIO(pdf_bytes),
@@ -82,4 +93,5 @@ if __name__ == "__main__":
     host = os.environ.get("MERMAID_PDF_HOST", "127.0.0.1")
     port = int(os.environ.get("MERMAID_PDF_PORT", "5001"))
     debug = os.environ.get("MERMAID_PDF_DEBUG", "1") == "1"
+    artifacts.start(float(os.environ.get("ARTIFACT_SWEEP_INTERVAL_SECONDS", "300")))
     standalone_app.run(host=host, port=port, debug=debug)
\ No newline at end of file
@@ -0,0 +1,247 @@
+"""Lifecycle management for generated files on local disk.
+
+High-level responsibilities
+--------------------------
+- Track every directory the app writes throwaway artifacts into (calculator
+  PDF exports, Mermaid diagram PDFs) as a named `ArtifactKind`.
+- Expire artifacts whose last access is older than their kind's TTL.
+- Keep the total size of all kinds under one disk quota by evicting the
+  least-recently-used files first.
+- Optionally delete an artifact as soon as it has been downloaded.
+- Report per-kind disk usage and eviction counts for `/admin/cache/stats`.
+
+Notes
+-----
+- "Last access" is the newer of a file's atime and mtime. Many mounts are
+  `relatime`/`noatime`, so downloads call `touch()` to bump atime
+  explicitly instead of relying on the kernel.
+- State lives in the filesystem only, so every gunicorn worker can sweep
+  the same directories. Two sweeps racing on one file is harmless: the
+  loser sees `FileNotFoundError` and moves on.
+- Files ending in `.part` are renders still being written. The quota pass
+  never touches them; the TTL pass removes ones left behind by a crash.
+- A kind's `on_remove` callback lets the owner drop its own bookkeeping
+  (e.g. the PDF queue's cache index) when the manager deletes a file.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ArtifactKind:
+    name: str
+    directory: str
+    patterns: tuple[str, ...] = ("*.pdf", "*.part")
+    ttl_seconds: float = 3600.0
+    delete_after_download: bool = False
+    on_remove: Optional[Callable[[str], None]] = None
+
+    def matches(self, filename: str) -> bool:
+        return any(fnmatch.fnmatch(filename, pattern) for pattern in self.patterns)
+
+
+@dataclass
+class _Entry:
+    kind: ArtifactKind
+    path: str
+    size: int
+    last_access: float
+
+    @property
+    def partial(self) -> bool:
+        return self.path.endswith(".part")
+
+
+class ArtifactManager:
+    """TTL + disk-quota + LRU eviction across several artifact directories."""
+
+    def __init__(self, quota_bytes: int, *, protect_seconds: float = 60.0) -> None:
+        self.quota_bytes = max(0, int(quota_bytes))
+        # Files touched this recently are never quota-evicted: they were just
+        # rendered or are being downloaded right now.
+        self.protect_seconds = float(protect_seconds)
+        self._kinds: dict[str, ArtifactKind] = {}
+        self._lock = threading.Lock()
+        self._evictions = {"ttl": 0, "quota": 0, "download": 0}
+        self._bytes_freed = 0
+        self._last_sweep: Optional[dict[str, Any]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def register(self, kind: ArtifactKind) -> ArtifactKind:
+        os.makedirs(kind.directory, exist_ok=True)
+        self._kinds[kind.name] = kind
+        return kind
+
+    def kind(self, name: str) -> ArtifactKind:
+        return self._kinds[name]
+
+    def _scan(self) -> list[_Entry]:
+        entries: list[_Entry] = []
+        for kind in self._kinds.values():
+            try:
+                names = os.listdir(kind.directory)
+            except FileNotFoundError:
+                continue
+            for name in names:
+                if not kind.matches(name):
+                    continue
+                path = os.path.join(kind.directory, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append(_Entry(kind, path, st.st_size, max(st.st_atime, st.st_mtime)))
+        return entries
+
+    def touch(self, path: str) -> None:
+        """Mark `path` as just used so LRU eviction keeps it."""
+        try:
+            st = os.stat(path)
+            os.utime(path, (time.time(), st.st_mtime))
+        except OSError:
+            pass
+
+    def _remove(self, kind: ArtifactKind, path: str, size: int, reason: str) -> bool:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        except OSError:
+            log.warning("Could not remove %s artifact %s", kind.name, path)
+            return False
+        if kind.on_remove is not None:
+            try:
+                kind.on_remove(path)
+            except Exception:
+                log.exception("on_remove hook failed for %s", path)
+        with self._lock:
+            self._evictions[reason] += 1
+            self._bytes_freed += size
+        return True
+
+    def downloaded(self, kind_name: str, path: str) -> bool:
+        """Call once `path` has been sent; deletes it when the kind asks for that."""
+        kind = self._kinds[kind_name]
+        if not kind.delete_after_download:
+            self.touch(path)
+            return False
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return False
+        return self._remove(kind, path, size, "download")
+
+    def sweep(self, now: Optional[float] = None) -> dict[str, Any]:
+        """Expire by TTL, then evict LRU-first until under quota."""
+        started = time.monotonic()
+        now = time.time() if now is None else now
+        expired = evicted = freed = 0
+        live: list[_Entry] = []
+        for entry in self._scan():
+            if now - entry.last_access > entry.kind.ttl_seconds:
+                if self._remove(entry.kind, entry.path, entry.size, "ttl"):
+                    expired += 1
+                    freed += entry.size
+            else:
+                live.append(entry)
+
+        total = sum(e.size for e in live)
+        if self.quota_bytes and total > self.quota_bytes:
+            candidates = sorted(
+                (e for e in live if not e.partial and now - e.last_access > self.protect_seconds),
+                key=lambda e: e.last_access,
+            )
+            for entry in candidates:
+                if total <= self.quota_bytes:
+                    break
+                if self._remove(entry.kind, entry.path, entry.size, "quota"):
+                    evicted += 1
+                    freed += entry.size
+                    total -= entry.size
+            if total > self.quota_bytes:
+                log.warning("Artifacts still use %d bytes after eviction (quota %d)", total, self.quota_bytes)
+
+        result = {
+            "at": now,
+            "expired": expired,
+            "evicted": evicted,
+            "bytes_freed": freed,
+            "bytes_in_use": total,
+            "duration_ms": round((time.monotonic() - started) * 1000, 2),
+        }
+        self._last_sweep = result
+        return result
+
+    def usage(self) -> dict[str, dict[str, int]]:
+        per_kind = {name: {"files": 0, "bytes": 0} for name in self._kinds}
+        for entry in self._scan():
+            per_kind[entry.kind.name]["files"] += 1
+            per_kind[entry.kind.name]["bytes"] += entry.size
+        return per_kind
+
+    def start(self, interval_seconds: float = 300.0, *, before_sweep: Optional[Callable[[], Any]] = None
+              ) -> threading.Thread:
+        """Start (once) a daemon thread sweeping every `interval_seconds`.
+
+        `before_sweep` runs first on each pass, for owners that keep their own
+        rows about the files (the PDF queue purges old jobs there).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+
+        def _loop() -> None:
+            while not self._stop.is_set():
+                try:
+                    if before_sweep is not None:
+                        before_sweep()
+                    self.sweep()
+                except Exception:
+                    log.exception("Artifact sweep failed")
+                self._stop.wait(interval_seconds)
+
+        self._thread = threading.Thread(target=_loop, name="artifact-sweeper", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> dict[str, Any]:
+        usage = self.usage()
+        total = sum(k["bytes"] for k in usage.values())
+        with self._lock:
+            evictions = dict(self._evictions)
+            freed = self._bytes_freed
+        return {
+            "quota_bytes": self.quota_bytes,
+            "bytes_in_use": total,
+            "quota_used_pct": round(100.0 * total / self.quota_bytes, 2) if self.quota_bytes else None,
+            "kinds": {
+                name: {
+                    **usage[name],
+                    "directory": kind.directory,
+                    "ttl_seconds": kind.ttl_seconds,
+                    "delete_after_download": kind.delete_after_download,
+                }
+                for name, kind in self._kinds.items()
+            },
+            "evictions": evictions,
+            "bytes_freed": freed,
+            "last_sweep": self._last_sweep,
+            "running": self._thread is not None and self._thread.is_alive(),
+        }
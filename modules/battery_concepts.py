@@ -0,0 +1,266 @@
+"""Battery concept models and calculators used by the interactive tools.
+
+High-level responsibilities
+---------------------------
+- Cell chemistry / specification models shared by the simulators.
+- Capacity, depth-of-discharge, C-rate and cycle-life calculators.
+
+Notes
+-----
+- These classes used to live at the bottom of `modules.lithium_education`,
+  which meant every importer also paid for parsing ~450 KB of lesson content.
+  `modules.lithium_education` still re-exports them for compatibility.
+"""
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from modules import cycle_life as cycle_life_model
+
+
+class CellChemistry(Enum):
+    """Battery cell chemistry identifiers"""
+    LI_ION = "LI_ION"
+    LIFEPO4 = "LIFEPO4"
+    LI_POLYMER = "LI_POLYMER"
+    NCA = "NCA"
+    NCM = "NCM"
+
+@dataclass
+class CellSpecifications:
+    """Minimal cell specification model used by the interactive tools."""
+    nominal_voltage_v: float
+    capacity_mah: float
+    chemistry: CellChemistry
+    min_voltage_v: float
+    max_voltage_v: float
+
+    def energy_wh(self) -> float:
+        """Return the nominal stored energy in watt-hours."""
+        return self.nominal_voltage_v * (self.capacity_mah / 1000.0)
+
+    def voltage_range(self) -> float:
+        """Return the usable voltage window from min to max."""
+        return max(0.0, self.max_voltage_v - self.min_voltage_v)
+
+class CapacityAndDOD:
+    """Educational module about Capacity and Depth of Discharge"""
+    
+    @staticmethod
+    def capacity_explanation() -> Dict:
+        """Explain what battery capacity means"""
+        return {
+            "definition": "Capacity is the total amount of charge a cell can store, measured in mAh (milliamp-hours) or Ah (amp-hours)",
+            "energy_vs_capacity": {
+                "capacity_mah": "Charge quantity (current × time)",
+                "energy_wh": "Actual usable energy (capacity × voltage)",
+                "formula": "Energy (Wh) = Capacity (Ah) × Nominal Voltage (V)"
+            },
+            "nominal_vs_practical": {
+                "nominal": "Rated capacity under standard conditions (25°C, constant discharge)",
+                "practical": "Actual available capacity varies with temperature, discharge rate, and age"
+            },
+            "factors_affecting_capacity": [
+                "Discharge rate (C-rate) - faster discharge = less available capacity",
+                "Temperature - cold reduces capacity, heat accelerates aging",
+                "Age and cycles - capacity fades over time",
+                "Internal resistance - builds up, reducing discharge capability"
+            ]
+        }
+    
+    @staticmethod
+    def dod_explanation() -> Dict:
+        """Explain Depth of Discharge and its impact"""
+        return {
+            "definition": "DOD is the percentage of a battery's capacity that has been discharged, expressed as a percentage of total capacity",
+            "dod_vs_soc": {
+                "dod": "How much was used (100% - SOC)",
+                "soc": "How much is currently stored (0-100%)",
+                "relationship": "DOD + SOC = 100%"
+            },
+            "cycle_life_impact": {
+                "explanation": "Deeper discharges accelerate aging, shallower discharges extend cycle life",
+                "examples": {
+                    "100_percent_dod": {
+                        "dod": "100% (fully discharged each cycle)",
+                        "lifepo4_cycles": "2000 cycles",
+                        "liion_cycles": "500 cycles"
+                    },
+                    "80_percent_dod": {
+                        "dod": "80% (leave 20% charged)",
+                        "lifepo4_cycles": "2500 cycles (25% improvement)",
+                        "liion_cycles": "700 cycles (40% improvement)"
+                    },
+                    "50_percent_dod": {
+                        "dod": "50% (use only middle range)",
+                        "lifepo4_cycles": "4000+ cycles",
+                        "liion_cycles": "1200+ cycles"
+                    }
+                }
+            },
+            "practical_recommendations": {
+                "everyday_use": "Keep between 20-80% SOC (80% DOD) for longevity",
+                "critical_applications": "Never go below 10% or above 90%",
+                "lifepo4_advantage": "Can safely do 100% DOD, better for energy storage systems"
+            }
+        }
+    
+    @staticmethod
+    def calculate_cycle_life(chemistry: CellChemistry, dod_percent: int, base_cycles: int) -> int:
+        """Estimate cycle life based on DOD (interpolated between tabulated points)"""
+        return cycle_life_model.estimate_cycle_life(chemistry, dod_percent, base_cycles)
+
+
+class CRate:
+    """Educational module about C-rates and charging/discharging"""
+    
+    @staticmethod
+    def crate_explanation() -> Dict:
+        """Explain what C-rate means"""
+        return {
+            "definition": "C-rate is the charging/discharging current relative to the cell's capacity",
+            "formula": "C-rate = Current (A) / Capacity (Ah)",
+            "examples": {
+                "1c": {
+                    "description": "1C rate (standard rate)",
+                    "meaning": "Discharge cell in exactly 1 hour",
+                    "example": "2000 mAh cell at 1C = 2000 mA = 2A current"
+                },
+                "2c": {
+                    "description": "2C rate (fast discharge)",
+                    "meaning": "Discharge cell in 30 minutes",
+                    "example": "2000 mAh cell at 2C = 4000 mA = 4A current"
+                },
+                "0_5c": {
+                    "description": "0.5C rate (slow discharge)",
+                    "meaning": "Discharge cell in 2 hours",
+                    "example": "2000 mAh cell at 0.5C = 1000 mA = 1A current"
+                }
+            },
+            "impact_on_capacity": {
+                "lower_crate": "Slower discharge = more capacity available",
+                "higher_crate": "Faster discharge = less capacity available (internal resistance losses)"
+            }
+        }
+    
+    @staticmethod
+    def calculate_discharge_time(capacity_mah: float, current_ma: float) -> float:
+        """Calculate discharge time in hours"""
+        if current_ma <= 0:
+            return 0
+        return capacity_mah / current_ma
+    
+    @staticmethod
+    def calculate_crate(current_a: float, capacity_ah: float) -> float:
+        """Calculate C-rate"""
+        if capacity_ah <= 0:
+            return 0
+        return current_a / capacity_ah
+    
+    @staticmethod
+    def capacity_derating(crate, chemistry: CellChemistry) -> np.ndarray:
+        """Vectorised capacity deration factor for an array (or scalar) of C-rates.
+
+        Factors are linearly interpolated between the tabulated C-rates and held
+        at the end values outside 0.2C-5C.
+        """
+        rates, factors = _CRATE_DERATING_CURVES[chemistry]
+        return np.interp(np.asarray(crate, dtype=float), rates, factors)
+
+    @staticmethod
+    def get_capacity_derating(crate: float, chemistry: CellChemistry) -> float:
+        """Get capacity deration factor based on C-rate"""
+        # Higher C-rates result in lower available capacity
+        return float(CRate.capacity_derating(crate, chemistry))
+
+
+# Available-capacity fraction vs discharge C-rate, per chemistry. LFP holds its
+# capacity best at high rates; high-energy NCA and pouch Li-polymer fade fastest.
+_CRATE_DERATING = {
+    CellChemistry.LI_ION: {0.2: 1.0, 0.5: 0.98, 1.0: 0.95, 2.0: 0.90, 5.0: 0.75},
+    CellChemistry.LIFEPO4: {0.2: 1.0, 0.5: 0.99, 1.0: 0.98, 2.0: 0.96, 5.0: 0.88},
+    CellChemistry.LI_POLYMER: {0.2: 1.0, 0.5: 0.98, 1.0: 0.96, 2.0: 0.91, 5.0: 0.78},
+    CellChemistry.NCA: {0.2: 1.0, 0.5: 0.97, 1.0: 0.94, 2.0: 0.88, 5.0: 0.72},
+    CellChemistry.NCM: {0.2: 1.0, 0.5: 0.98, 1.0: 0.95, 2.0: 0.91, 5.0: 0.80},
+}
+
+# Precomputed (rates, factors) arrays so lookups are a single np.interp call.
+_CRATE_DERATING_CURVES = {
+    chem: (np.array(sorted(table), dtype=float),
+           np.array([table[r] for r in sorted(table)], dtype=float))
+    for chem, table in _CRATE_DERATING.items()
+}
+
+
+class BatteryLifeAndCycles:
+    """Educational module about cycle life and battery aging"""
+    
+    @staticmethod
+    def cycle_definition() -> Dict:
+        """Explain what a battery cycle is"""
+        return {
+            "definition": "One complete charge-discharge cycle from 0% to 100% and back to 0%",
+            "variations": {
+                "full_cycle": "Complete 0% → 100% → 0%",
+                "partial_cycles": "20% → 80% counts as 0.6 of a cycle",
+                "example": "If you charge from 20% to 80% and back to 20%, that's 0.6 cycles"
+            },
+            "cycle_counting": [
+                "Total cycles is cumulative over life of battery",
+                "End of life typically defined as 80% of original capacity",
+                "Each battery chemistry has different cycle life expectations"
+            ]
+        }
+    
+    @staticmethod
+    def get_cycle_life_estimate(chemistry: CellChemistry, dod: int) -> Dict:
+        """Get cycle life estimates for different chemistries at different DOD"""
+        base_cycles = {
+            CellChemistry.LI_ION: 800,
+            CellChemistry.LIFEPO4: 2500,
+            CellChemistry.LI_POLYMER: 500,
+            CellChemistry.NCA: 800,
+            CellChemistry.NCM: 1000
+        }
+        
+        cycles = CapacityAndDOD.calculate_cycle_life(chemistry, dod, base_cycles.get(chemistry, 500))
+        
+        return {
+            "chemistry": chemistry.value,
+            "dod": f"{dod}%",
+            "estimated_cycles": cycles,
+            "years_at_daily_cycle": cycles,  # Rough estimate
+            "calendar_years": f"5-10 years (depends on storage conditions)"
+        }
+    
+    @staticmethod
+    def degradation_factors() -> Dict:
+        """Explain what causes battery degradation"""
+        return {
+            "main_factors": {
+                "cycling": "Charge/discharge cycles cause structural changes",
+                "temperature": "Heat accelerates degradation (primary factor)",
+                "voltage_stress": "Operating at limits (too high/low voltage) stresses cell",
+                "time": "Calendar aging even without use",
+                "overcharging": "Charging above max voltage damages material",
+                "over_discharge": "Discharging below min voltage causes plating"
+            },
+            "degradation_mechanisms": [
+                "SEI layer growth - solid electrolyte interphase thickens",
+                "Electrolyte decomposition - loss of ion conductivity",
+                "Active material loss - cathode and anode particles dissolve",
+                "Electrode cracking - repeated expansion/contraction"
+            ],
+            "mitigation_strategies": [
+                "Keep cool (store at 15-25°C, avoid >35°C)",
+                "Limit charge voltage (keep below max)",
+                "Avoid deep discharges (use 20-80% SOC range)",
+                "Consistent C-rates (avoid extreme currents)",
+                "Regular use (better than long storage)",
+                "Cell balancing in packs"
+            ]
+        }
+
@@ -0,0 +1,234 @@
+"""Time-stepped equivalent-circuit (ECM) cell model, batched with NumPy.
+
+High-level responsibilities
+--------------------------
+- Describe a cell as OCV(SOC) + series resistance R0 + one or two RC branches,
+  with resistance and capacity depending on cell temperature.
+- Step any number of cells (or scenarios) forward together: every parameter
+  and state array broadcasts against the batch shape.
+- Run whole current profiles and return voltage / SOC / heat / temperature
+  traces for the cell and pack simulators.
+
+Notes
+-----
+- Current is positive on discharge, in amps; time steps are in seconds.
+- RC branches and the thermal node use the exact zero-order-hold update
+  (heat held constant over the step), so large steps stay stable.
+- Temperature is a single lumped node per cell (thermal mass + resistance to
+  ambient), heated by the I^2R losses in R0 and the RC resistors.
+- Current is limited to the charge left in the cell (or the room left when
+  charging), so SOC never overshoots 0/100% and no energy is delivered from
+  an empty cell.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import numpy as np
+
+from modules.battery_concepts import CellChemistry, CellSpecifications
+
+
+# Normalised OCV shapes (0 = min voltage, 1 = max voltage) at 0, 10, ... 100% SOC.
+_OCV_SOC_POINTS = np.linspace(0.0, 100.0, 11)
+_OCV_SHAPES = {
+    CellChemistry.LIFEPO4: (0.0, 0.45, 0.55, 0.58, 0.60, 0.61, 0.62, 0.64, 0.67, 0.75, 1.0),
+    CellChemistry.LI_ION: (0.0, 0.30, 0.42, 0.50, 0.56, 0.62, 0.68, 0.75, 0.82, 0.90, 1.0),
+}
+_DEFAULT_OCV_SHAPE = _OCV_SHAPES[CellChemistry.LI_ION]
+
+# R0 scales inversely with capacity: ~30 mOhm for a 2 Ah cell, ~0.6 mOhm at 100 Ah.
+_R0_OHM_AH = 0.06
+
+
+@dataclass
+class EcmParameters:
+    """Cell parameters; every numeric field may be a scalar or a batch array."""
+
+    capacity_ah: Any
+    r0_ohm: Any
+    ocv_soc: np.ndarray
+    ocv_v: np.ndarray
+    min_voltage_v: Any
+    max_voltage_v: Any
+    # One or two RC branches: resistances (ohm) and time constants (s).
+    rc_r_ohm: tuple = ()
+    rc_tau_s: tuple = ()
+    reference_temp_c: float = 25.0
+    # Fractional R increase per degree C below the reference temperature.
+    r_temp_coeff: float = 0.02
+    # Fractional capacity loss per degree C below the reference temperature.
+    capacity_temp_coeff: float = 0.006
+    thermal_mass_j_per_k: Any = 40.0
+    thermal_resistance_k_per_w: Any = 10.0
+
+    def __post_init__(self) -> None:
+        if len(self.rc_r_ohm) != len(self.rc_tau_s) or len(self.rc_r_ohm) > 2:
+            raise ValueError("Provide matching rc_r_ohm/rc_tau_s for at most two RC branches")
+
+    def ocv(self, soc) -> np.ndarray:
+        return np.interp(soc, self.ocv_soc, self.ocv_v)
+
+    def resistance_scale(self, temp_c) -> np.ndarray:
+        return np.exp(self.r_temp_coeff * (self.reference_temp_c - np.asarray(temp_c)))
+
+    def capacity_scale(self, temp_c) -> np.ndarray:
+        cold = np.maximum(0.0, self.reference_temp_c - np.asarray(temp_c))
+        return np.clip(1.0 - self.capacity_temp_coeff * cold, 0.3, 1.0)
+
+
+@dataclass
+class EcmState:
+    """Mutable per-cell state advanced by `step`."""
+
+    soc: np.ndarray
+    temp_c: np.ndarray
+    # (n_rc, *batch) RC branch voltages
+    v_rc: np.ndarray
+
+
+@dataclass
+class EcmTrace:
+    """Time series returned by `simulate`; arrays are (steps, *batch)."""
+
+    time_s: np.ndarray
+    current_a: np.ndarray
+    voltage_v: np.ndarray
+    soc: np.ndarray
+    temp_c: np.ndarray
+    heat_w: np.ndarray
+    # First step index at which each cell hit min voltage (-1 if never).
+    cutoff_index: np.ndarray
+    final_state: EcmState = field(repr=False)
+
+    def energy_wh(self) -> np.ndarray:
+        dt = np.diff(self.time_s, prepend=0.0).reshape((-1,) + (1,) * (self.voltage_v.ndim - 1))
+        return (self.voltage_v * self.current_a * dt).sum(axis=0) / 3600.0
+
+
+def params_for_cell(spec: CellSpecifications, r0_ohm: Optional[Any] = None,
+                    capacity_ah: Optional[Any] = None, rc_branches: int = 2) -> EcmParameters:
+    """Default ECM parameters for a `CellSpecifications`.
+
+    The OCV curve is the chemistry's shape stretched between the spec's min and
+    max voltage. `r0_ohm` / `capacity_ah` may be per-cell arrays.
+    """
+    if capacity_ah is None:
+        capacity_ah = spec.capacity_mah / 1000.0
+    if r0_ohm is None:
+        r0_ohm = _R0_OHM_AH / np.asarray(capacity_ah, dtype=float)
+    shape = np.asarray(_OCV_SHAPES.get(spec.chemistry, _DEFAULT_OCV_SHAPE))
+    ocv_v = spec.min_voltage_v + spec.voltage_range() * shape
+    r0 = np.asarray(r0_ohm, dtype=float)
+    branches = ((0.5, 30.0), (0.3, 600.0))[:max(0, min(2, rc_branches))]
+    return EcmParameters(
+        capacity_ah=capacity_ah,
+        r0_ohm=r0,
+        ocv_soc=_OCV_SOC_POINTS,
+        ocv_v=ocv_v,
+        min_voltage_v=spec.min_voltage_v,
+        max_voltage_v=spec.max_voltage_v,
+        rc_r_ohm=tuple(r0 * k for k, _ in branches),
+        rc_tau_s=tuple(tau for _, tau in branches),
+    )
+
+
+def initial_state(params: EcmParameters, soc: Any = 100.0, temp_c: Any = 25.0,
+                  batch_shape: tuple = ()) -> EcmState:
+    """Rested state (RC branches discharged) broadcast to the batch shape."""
+    shape = np.broadcast_shapes(batch_shape, np.shape(params.capacity_ah), np.shape(params.r0_ohm),
+                                np.shape(soc), np.shape(temp_c))
+    return EcmState(
+        soc=np.broadcast_to(np.asarray(soc, dtype=float), shape).copy(),
+        temp_c=np.broadcast_to(np.asarray(temp_c, dtype=float), shape).copy(),
+        v_rc=np.zeros((len(params.rc_r_ohm),) + shape),
+    )
+
+
+def _usable_capacity_ah(params: EcmParameters, state: EcmState) -> np.ndarray:
+    return np.asarray(params.capacity_ah, dtype=float) * params.capacity_scale(state.temp_c)
+
+
+def limit_current(params: EcmParameters, state: EcmState, current_a: Any, dt_s: float) -> np.ndarray:
+    """`current_a` clipped to what the cell can source (or sink) over `dt_s`."""
+    charge_as = _usable_capacity_ah(params, state) * 3600.0 / 100.0 / dt_s
+    return np.clip(np.asarray(current_a, dtype=float), -(100.0 - state.soc) * charge_as, state.soc * charge_as)
+
+
+def step(params: EcmParameters, state: EcmState, current_a: Any, dt_s: float,
+         ambient_c: Any = 25.0) -> tuple[np.ndarray, np.ndarray]:
+    """Advance `state` in place by `dt_s`; returns (terminal voltage, heat W).
+
+    The current is first passed through `limit_current`; callers that account
+    for energy should do the same to know what actually flowed.
+    """
+    current = limit_current(params, state, current_a, dt_s)
+    r_scale = params.resistance_scale(state.temp_c)
+    capacity_ah = _usable_capacity_ah(params, state)
+
+    heat = current ** 2 * np.asarray(params.r0_ohm) * r_scale
+    for k, (r, tau) in enumerate(zip(params.rc_r_ohm, params.rc_tau_s)):
+        r_k = np.asarray(r) * r_scale
+        decay = np.exp(-dt_s / tau)
+        state.v_rc[k] = state.v_rc[k] * decay + r_k * (1.0 - decay) * current
+        heat = heat + state.v_rc[k] ** 2 / r_k
+
+    state.soc -= current * dt_s / 3600.0 / capacity_ah * 100.0
+    np.clip(state.soc, 0.0, 100.0, out=state.soc)
+
+    r_th = np.asarray(params.thermal_resistance_k_per_w, dtype=float)
+    tau_th = np.asarray(params.thermal_mass_j_per_k, dtype=float) * r_th
+    temp_inf = ambient_c + heat * r_th
+    state.temp_c[...] = temp_inf + (state.temp_c - temp_inf) * np.exp(-dt_s / tau_th)
+
+    voltage = params.ocv(state.soc) - current * np.asarray(params.r0_ohm) * r_scale - state.v_rc.sum(axis=0)
+    return voltage, heat
+
+
+def simulate(params: EcmParameters, current_profile: Any, dt_s: float, soc: Any = 100.0,
+             temp_c: Any = 25.0, ambient_c: Any = 25.0, stop_at_cutoff: bool = True,
+             state: Optional[EcmState] = None) -> EcmTrace:
+    """Run a current profile of shape (steps,) or (steps, *batch) through the model.
+
+    With `stop_at_cutoff`, a cell that reaches min voltage rests (zero current)
+    for the rest of the profile.
+    """
+    profile = np.asarray(current_profile, dtype=float)
+    if profile.ndim == 0:
+        profile = profile.reshape(1)
+    steps = profile.shape[0]
+    if state is None:
+        state = initial_state(params, soc, temp_c, profile.shape[1:])
+    shape = np.broadcast_shapes(state.soc.shape, profile.shape[1:])
+
+    out = {name: np.empty((steps,) + shape) for name in ("current", "voltage", "soc", "temp", "heat")}
+    cutoff = np.full(shape, -1, dtype=np.int64)
+    tripped = np.zeros(shape, dtype=bool)
+    for t in range(steps):
+        current = np.broadcast_to(profile[t], shape)
+        if stop_at_cutoff and tripped.any():
+            current = np.where(tripped, 0.0, current)
+        current = limit_current(params, state, current, dt_s)
+        voltage, heat = step(params, state, current, dt_s, ambient_c)
+        if stop_at_cutoff:
+            newly = ~tripped & (voltage <= params.min_voltage_v)
+            cutoff[newly] = t
+            tripped |= newly
+        out["current"][t] = current
+        out["voltage"][t] = voltage
+        out["soc"][t] = state.soc
+        out["temp"][t] = state.temp_c
+        out["heat"][t] = heat
+
+    return EcmTrace(
+        time_s=dt_s * np.arange(1, steps + 1),
+        current_a=out["current"],
+        voltage_v=out["voltage"],
+        soc=out["soc"],
+        temp_c=out["temp"],
+        heat_w=out["heat"],
+        cutoff_index=cutoff,
+        final_state=state,
+    )
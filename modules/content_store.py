@@ -0,0 +1,379 @@
+"""Precompiled, lazily loaded lesson content.
+
+High-level responsibilities
+--------------------------
+- Compile every `MODULE_*` dict in `modules/lithium_education.py` into its own
+  JSON artifact plus a `manifest.json` (source hash, per-module section count
+  and size) at build time.
+- Serve lesson content from those artifacts on demand, keeping only a bounded
+  number of decoded modules in memory (least-recently-used eviction).
+- Expose single sections by index so callers that need one step do not have to
+  hold on to the whole module.
+
+Notes
+-----
+- Artifact names are the Python names with the class prefix dropped, e.g.
+  `LithiumBatteryFundamentals.MODULE_1_FUNDAMENTALS` -> `MODULE_1_FUNDAMENTALS`.
+- If the artifacts are missing or were built from a different source file the
+  store rebuilds them once, on first access, by importing the source module.
+  Deploys should run `python scripts/build_content.py` so workers never pay
+  for that.
+- Files are written to a temp name and `os.replace`d into place, so several
+  workers building at once never observe a half-written artifact.
+- Returned dicts are shared between callers: treat them as read-only.
+- Hot reload (`start_watcher`) polls the source file's mtime from a daemon
+  thread. When the sha256 changes it rebuilds the artifacts once and swaps the
+  new manifest in; requests never re-execute the source. A source that fails
+  to import is logged and the previous content keeps being served. Production
+  leaves it off (see `hot_reload_enabled`).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+
+log = logging.getLogger(__name__)
+
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_SOURCE_PATH = _PROJECT_ROOT / "modules" / "lithium_education.py"
+DEFAULT_ARTIFACT_DIR = _PROJECT_ROOT / "build" / "lesson_content"
+
+MANIFEST_NAME = "manifest.json"
+ARTIFACT_FORMAT = 1
+
+
+def source_digest(source_path: os.PathLike | str) -> str:
+    """Return the sha256 hex digest of the lesson source file."""
+    h = hashlib.sha256()
+    with open(source_path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _collect_modules(namespace: Any) -> dict[str, Any]:
+    """Find MODULE_* values at module level and on classes defined in it."""
+    found: dict[str, Any] = {}
+
+    def _add(name: str, value: Any) -> None:
+        if name in found:
+            raise ValueError(f"Duplicate lesson content name: {name}")
+        found[name] = value
+
+    for name, value in vars(namespace).items():
+        if name.startswith("MODULE_"):
+            # A stray trailing comma turns `MODULE_X = {...},` into a 1-tuple.
+            if isinstance(value, tuple) and len(value) == 1 and isinstance(value[0], dict):
+                value = value[0]
+            _add(name, value)
+        elif isinstance(value, type) and value.__module__ == namespace.__name__:
+            for attr, attr_value in vars(value).items():
+                if attr.startswith("MODULE_"):
+                    _add(attr, attr_value)
+    return found
+
+
+def _load_source(source_path: Path) -> Any:
+    spec = importlib.util.spec_from_file_location("_lesson_content_source", source_path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load lesson source: {source_path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def build_artifacts(
+    source_path: os.PathLike | str = DEFAULT_SOURCE_PATH,
+    artifact_dir: os.PathLike | str = DEFAULT_ARTIFACT_DIR,
+) -> dict[str, Any]:
+    """Compile the lesson source into per-module JSON artifacts.
+
+    Returns the manifest that was written.
+    """
+    source_path = Path(source_path)
+    artifact_dir = Path(artifact_dir)
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+
+    digest = source_digest(source_path)
+    modules = _collect_modules(_load_source(source_path))
+
+    entries: dict[str, dict[str, Any]] = {}
+    for name, value in sorted(modules.items()):
+        data = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        filename = f"{name}.json"
+        _write_atomic(artifact_dir / filename, data)
+        sections = value.get("sections") if isinstance(value, dict) else None
+        entries[name] = {
+            "file": filename,
+            "bytes": len(data),
+            "sections": len(sections) if isinstance(sections, list) else None,
+        }
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "source": source_path.name,
+        "source_sha256": digest,
+        "modules": entries,
+    }
+    # The manifest goes last: readers only trust artifacts it lists.
+    _write_atomic(artifact_dir / MANIFEST_NAME, json.dumps(manifest, indent=2).encode("utf-8"))
+    return manifest
+
+
+class ContentStore:
+    """Read-only view of the compiled lesson artifacts with a bounded LRU."""
+
+    def __init__(
+        self,
+        *,
+        source_path: os.PathLike | str = DEFAULT_SOURCE_PATH,
+        artifact_dir: os.PathLike | str = DEFAULT_ARTIFACT_DIR,
+        max_modules: int = 4,
+        auto_build: bool = True,
+    ) -> None:
+        self.source_path = Path(source_path)
+        self.artifact_dir = Path(artifact_dir)
+        self.max_modules = max(1, int(max_modules))
+        self.auto_build = auto_build
+
+        self._lock = threading.Lock()
+        self._manifest: Optional[dict[str, Any]] = None
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        # Bumped on every swap so a read that straddles one is not cached.
+        self._generation = 0
+        self._source_mtime_ns: Optional[int] = None
+        self._listeners: list[Callable[[], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._builds = 0
+        self._reloads = 0
+        self._reload_errors = 0
+
+    def _read_manifest(self) -> Optional[dict[str, Any]]:
+        try:
+            with open(self.artifact_dir / MANIFEST_NAME, "r", encoding="utf-8") as fh:
+                manifest = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("format") != ARTIFACT_FORMAT:
+            return None
+        return manifest
+
+    def _is_current(self, manifest: Optional[dict[str, Any]]) -> bool:
+        if manifest is None:
+            return False
+        if not self.source_path.exists():
+            # Deployed without the source: trust whatever was built.
+            return True
+        return manifest.get("source_sha256") == source_digest(self.source_path)
+
+    def _source_mtime(self) -> Optional[int]:
+        try:
+            return self.source_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def manifest(self) -> dict[str, Any]:
+        """Return the manifest, building artifacts first if they are stale."""
+        with self._lock:
+            if self._manifest is None:
+                self._source_mtime_ns = self._source_mtime()
+                manifest = self._read_manifest()
+                if not self._is_current(manifest):
+                    if self.auto_build:
+                        manifest = build_artifacts(self.source_path, self.artifact_dir)
+                        self._builds += 1
+                    elif manifest is None:
+                        raise FileNotFoundError(f"No lesson content artifacts in {self.artifact_dir}")
+                self._manifest = manifest
+            return self._manifest
+
+    def names(self) -> list[str]:
+        return list(self.manifest()["modules"])
+
+    def _entry(self, name: str) -> dict[str, Any]:
+        try:
+            return self.manifest()["modules"][name]
+        except KeyError:
+            raise KeyError(f"Unknown lesson content: {name}") from None
+
+    def module(self, name: str) -> Any:
+        """Return the decoded content for `name` (e.g. "MODULE_4_BMS")."""
+        entry = self._entry(name)
+        with self._lock:
+            if name in self._cache:
+                self._cache.move_to_end(name)
+                self._hits += 1
+                return self._cache[name]
+            self._misses += 1
+            generation = self._generation
+
+        with open(self.artifact_dir / entry["file"], "r", encoding="utf-8") as fh:
+            value = json.load(fh)
+
+        with self._lock:
+            if generation != self._generation:
+                return value
+            # Another thread may have loaded it meanwhile; keep one copy.
+            value = self._cache.setdefault(name, value)
+            self._cache.move_to_end(name)
+            while len(self._cache) > self.max_modules:
+                self._cache.popitem(last=False)
+                self._evictions += 1
+        return value
+
+    def section_count(self, name: str) -> int:
+        """Number of sections in `name`, answered from the manifest alone."""
+        return self._entry(name).get("sections") or 0
+
+    def section(self, name: str, index: int) -> dict[str, Any]:
+        """Return section `index` (0-based) of module `name`."""
+        count = self.section_count(name)
+        if not 0 <= index < count:
+            raise IndexError(f"{name} has {count} sections; index {index} is out of range")
+        return self.module(name)["sections"][index]
+
+    def rebuild(self) -> dict[str, Any]:
+        """Recompile artifacts from source and drop every cached module."""
+        manifest = build_artifacts(self.source_path, self.artifact_dir)
+        with self._lock:
+            self._builds += 1
+        self._swap(manifest)
+        return manifest
+
+    def on_reload(self, callback: Callable[[], None]) -> None:
+        """Call `callback` after new content has been swapped in."""
+        self._listeners.append(callback)
+
+    def _swap(self, manifest: dict[str, Any]) -> None:
+        with self._lock:
+            self._manifest = manifest
+            self._cache.clear()
+            self._generation += 1
+            self._reloads += 1
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception:
+                log.exception("Lesson content reload listener failed")
+
+    def check_for_changes(self) -> bool:
+        """Swap in rebuilt content if the source changed; True when it did.
+
+        The common case is a single `stat()`; the file is only hashed when its
+        mtime moves, and only rebuilt when the hash differs from what is loaded.
+        """
+        current = self.manifest()
+        mtime = self._source_mtime()
+        if mtime is None or mtime == self._source_mtime_ns:
+            return False
+        self._source_mtime_ns = mtime
+
+        digest = source_digest(self.source_path)
+        if digest == current.get("source_sha256"):
+            return False
+        # Another worker may already have rebuilt for this source.
+        manifest = self._read_manifest()
+        if manifest is None or manifest.get("source_sha256") != digest:
+            manifest = build_artifacts(self.source_path, self.artifact_dir)
+            with self._lock:
+                self._builds += 1
+        self._swap(manifest)
+        log.info("Reloaded lesson content from %s", self.source_path)
+        return True
+
+    def start_watcher(self, interval_seconds: float = 1.0) -> threading.Thread:
+        """Start (once) a daemon thread calling `check_for_changes` every interval."""
+        with self._lock:
+            if self._watcher is not None and self._watcher.is_alive():
+                return self._watcher
+            self._watcher_stop.clear()
+
+            def _loop() -> None:
+                while not self._watcher_stop.wait(interval_seconds):
+                    try:
+                        self.check_for_changes()
+                    except Exception:
+                        with self._lock:
+                            self._reload_errors += 1
+                        log.exception("Lesson content reload failed; keeping previous content")
+
+            self._watcher = threading.Thread(target=_loop, name="lesson-content-watcher", daemon=True)
+            self._watcher.start()
+            return self._watcher
+
+    def stop_watcher(self, timeout: float = 5.0) -> None:
+        self._watcher_stop.set()
+        watcher = self._watcher
+        if watcher is not None:
+            watcher.join(timeout)
+        self._watcher = None
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            manifest = self._manifest or {}
+            return {
+                "artifact_dir": str(self.artifact_dir),
+                "source_sha256": manifest.get("source_sha256"),
+                "modules_total": len(manifest.get("modules", {})),
+                "modules_cached": len(self._cache),
+                "max_modules": self.max_modules,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "builds": self._builds,
+                "reloads": self._reloads,
+                "reload_errors": self._reload_errors,
+                "watching": self._watcher is not None and self._watcher.is_alive(),
+            }
+
+
+def hot_reload_enabled() -> bool:
+    """CONTENT_HOT_RELOAD wins; otherwise on everywhere except FLASK_ENV=production."""
+    raw = os.getenv("CONTENT_HOT_RELOAD", "").strip().lower()
+    if raw:
+        return raw in {"1", "true", "yes", "on"}
+    return os.getenv("FLASK_ENV", "").strip().lower() != "production"
+
+
+def _store_from_env() -> ContentStore:
+    artifact_dir = os.getenv("CONTENT_ARTIFACT_DIR") or DEFAULT_ARTIFACT_DIR
+    try:
+        max_modules = int(os.getenv("CONTENT_CACHE_MAX_MODULES", "4"))
+    except ValueError:
+        max_modules = 4
+    return ContentStore(artifact_dir=artifact_dir, max_modules=max_modules)
+
+
+# Shared per-process store; construction is cheap and touches no files.
+lesson_content = _store_from_env()
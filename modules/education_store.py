@@ -8,6 +8,9 @@ High-level responsibilities
 --------------------------
 - Create/authenticate users.
 - Store progress/completion markers for learning items.
+- Store visited lesson steps as one bitmask per (user, lesson).
+- Keep a per-user `user_summary` row up to date (via triggers) for admin
+  dashboards.
 - Store best quiz attempts.
 - Issue and consume one-time password reset tokens.
 
@@ -15,6 +18,8 @@ Notes
 -----
 - Timestamps are stored as ISO-8601 strings in UTC.
 - A simple module-level flag avoids re-creating tables on every call.
+- Connections come from a per-thread pool (`modules.sqlite_pool`), so PRAGMAs
+  run once per connection rather than once per call.
 """
 
 from __future__ import annotations
@@ -26,10 +31,13 @@ from urllib.parse import unquote, urlparse
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from email.utils import parseaddr
-from typing import Any, Iterable, Optional
+from typing import Any, ContextManager, Iterable, Optional
 import json
 from werkzeug.security import check_password_hash, generate_password_hash
 
+from modules.event_writer import EventWriter
+from modules.sqlite_pool import SQLitePool
+
 
 # Bump this when you ship changes to learning content/structure and want all
 # existing users to restart learning progress from scratch.
@@ -60,6 +68,7 @@ def _ensure_content_version(conn: sqlite3.Connection) -> None:
 
     # Reset learning progress for all users.
     conn.execute("DELETE FROM progress")
+    conn.execute("DELETE FROM lesson_step_progress")
     conn.execute("DELETE FROM quiz_attempts")
     conn.execute(
         "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
@@ -122,6 +131,168 @@ def db_path() -> str:
     return os.path.abspath(os.path.join(_project_root(), raw))
 
 
+# Lesson steps are bits in a signed 64-bit SQLite INTEGER.
+MAX_LESSON_STEPS = 63
+
+
+def _migrate_lesson_step_rows(conn: sqlite3.Connection) -> None:
+    """Fold legacy `progress` rows like ``lesson:x:step:7`` into `lesson_step_progress`."""
+    rows = conn.execute(
+        "SELECT user_id, item_key, completed_at FROM progress WHERE item_key LIKE 'lesson:%:step:%'"
+    ).fetchall()
+    if not rows:
+        return
+
+    masks: dict[tuple[int, str], list] = {}
+    for user_id, item_key, completed_at in rows:
+        lesson_key, _, step = str(item_key).rpartition(":step:")
+        if not step.isdigit() or not 1 <= int(step) <= MAX_LESSON_STEPS:
+            continue
+        entry = masks.setdefault((int(user_id), lesson_key), [0, str(completed_at)])
+        entry[0] |= 1 << (int(step) - 1)
+        entry[1] = max(entry[1], str(completed_at))
+
+    conn.executemany(
+        """
+        INSERT INTO lesson_step_progress (user_id, lesson_key, steps_mask, updated_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(user_id, lesson_key) DO UPDATE SET
+            steps_mask = steps_mask | excluded.steps_mask,
+            updated_at = MAX(updated_at, excluded.updated_at)
+        """,
+        [(uid, key, mask, ts) for (uid, key), (mask, ts) in masks.items()],
+    )
+    conn.execute("DELETE FROM progress WHERE item_key LIKE 'lesson:%:step:%'")
+
+
+# Quiz pass mark baked into `user_summary.quizzes_passed`.
+SUMMARY_PASS_PCT = 75
+
+# Per-user summary computed from source tables. Every column is a correlated
+# subquery on the user's primary-key range, so filtering by user_id is cheap.
+# user_events are left out on purpose (see `_ensure_user_summary`).
+_USER_SUMMARY_LIVE_SQL = f"""
+    SELECT
+        u.id AS user_id,
+        (SELECT COUNT(*) FROM progress p
+          WHERE p.user_id = u.id AND p.item_key LIKE 'lesson:%' AND p.item_key NOT LIKE '%:step:%') AS lessons_completed,
+        (SELECT COUNT(*) FROM lesson_step_progress s
+          WHERE s.user_id = u.id AND s.steps_mask != 0
+            AND NOT EXISTS (SELECT 1 FROM progress d WHERE d.user_id = s.user_id AND d.item_key = s.lesson_key)
+        ) AS modules_in_progress,
+        (SELECT COUNT(*) FROM quiz_attempts q WHERE q.user_id = u.id) AS quizzes_attempted,
+        (SELECT COUNT(*) FROM quiz_attempts q
+          WHERE q.user_id = u.id AND q.total > 0
+            AND (CAST(q.best_score AS REAL) / q.total) * 100.0 >= {SUMMARY_PASS_PCT}) AS quizzes_passed,
+        (SELECT AVG(CAST(q.best_score AS REAL) / NULLIF(q.total, 0)) * 100.0
+           FROM quiz_attempts q WHERE q.user_id = u.id) AS overall_pct,
+        MAX(
+            COALESCE(u.created_at, ''),
+            COALESCE((SELECT MAX(completed_at) FROM progress p WHERE p.user_id = u.id), ''),
+            COALESCE((SELECT MAX(completed_at) FROM quiz_attempts q WHERE q.user_id = u.id), ''),
+            COALESCE((SELECT MAX(updated_at) FROM lesson_step_progress s WHERE s.user_id = u.id), '')
+        ) AS last_activity
+    FROM users u
+"""
+
+_USER_SUMMARY_COLUMNS = (
+    "user_id, lessons_completed, modules_in_progress, quizzes_attempted, quizzes_passed, overall_pct, last_activity"
+)
+
+
+def _ensure_user_summary(conn: sqlite3.Connection) -> None:
+    """Create `user_summary` plus the triggers that keep it current.
+
+    Writes to progress / lesson_step_progress / quiz_attempts recompute that
+    user's row from `user_summary_live`; user_events inserts only bump
+    `last_activity`. `last_activity` never moves backwards, so deleting or
+    archiving old rows keeps the last time the user was actually seen.
+    """
+    existed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_summary'"
+    ).fetchone()
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_summary (
+            user_id INTEGER PRIMARY KEY,
+            lessons_completed INTEGER NOT NULL DEFAULT 0,
+            modules_in_progress INTEGER NOT NULL DEFAULT 0,
+            quizzes_attempted INTEGER NOT NULL DEFAULT 0,
+            quizzes_passed INTEGER NOT NULL DEFAULT 0,
+            overall_pct REAL,
+            last_activity TEXT NOT NULL DEFAULT ''
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_user_summary_last_activity ON user_summary(last_activity)")
+    view_sql = f"CREATE VIEW user_summary_live AS {_USER_SUMMARY_LIVE_SQL}"
+    current = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'view' AND name = 'user_summary_live'"
+    ).fetchone()
+    definition_changed = not current or current[0] != view_sql
+    if definition_changed:
+        conn.execute("DROP VIEW IF EXISTS user_summary_live")
+        conn.execute(view_sql)
+
+    # An UPSERT rather than INSERT OR REPLACE: the outer statement's conflict
+    # policy would override an OR clause inside the trigger.
+    def refresh(ref: str) -> str:
+        return f"""
+            INSERT INTO user_summary ({_USER_SUMMARY_COLUMNS})
+            SELECT * FROM user_summary_live l WHERE l.user_id = {ref}
+            ON CONFLICT(user_id) DO UPDATE SET
+                lessons_completed = excluded.lessons_completed,
+                modules_in_progress = excluded.modules_in_progress,
+                quizzes_attempted = excluded.quizzes_attempted,
+                quizzes_passed = excluded.quizzes_passed,
+                overall_pct = excluded.overall_pct,
+                last_activity = MAX(last_activity, excluded.last_activity);
+        """
+
+    for table in ("progress", "lesson_step_progress", "quiz_attempts"):
+        for op, refs in (("INSERT", ("NEW",)), ("UPDATE", ("OLD", "NEW")), ("DELETE", ("OLD",))):
+            body = "".join(refresh(f"{r}.user_id") for r in refs)
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS trg_user_summary_{table}_{op.lower()} "
+                f"AFTER {op} ON {table} BEGIN {body} END"
+            )
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_user_summary_users_insert AFTER INSERT ON users BEGIN {refresh('NEW.id')} END")
+    conn.execute(
+        "CREATE TRIGGER IF NOT EXISTS trg_user_summary_users_delete AFTER DELETE ON users "
+        "BEGIN DELETE FROM user_summary WHERE user_id = OLD.id; END"
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_user_summary_events_insert AFTER INSERT ON user_events
+        WHEN NEW.user_id IS NOT NULL
+        BEGIN
+            UPDATE user_summary SET last_activity = MAX(last_activity, NEW.created_at)
+            WHERE user_id = NEW.user_id;
+        END
+        """
+    )
+    if not existed or definition_changed:
+        _rebuild_user_summaries(conn)
+
+
+def _rebuild_user_summaries(conn: sqlite3.Connection) -> int:
+    conn.execute("DELETE FROM user_summary")
+    cur = conn.execute(
+        f"""
+        INSERT INTO user_summary ({_USER_SUMMARY_COLUMNS})
+        SELECT l.user_id, l.lessons_completed, l.modules_in_progress, l.quizzes_attempted,
+               l.quizzes_passed, l.overall_pct, MAX(l.last_activity, COALESCE(e.last_event_at, ''))
+        FROM user_summary_live l
+        LEFT JOIN (
+            SELECT user_id, MAX(created_at) AS last_event_at
+            FROM user_events WHERE user_id IS NOT NULL
+            GROUP BY user_id
+        ) e ON e.user_id = l.user_id
+        """
+    )
+    return int(cur.rowcount)
+
+
 # Module-level cache so I only run CREATE TABLE statements once per process.
 _DB_READY = False
 
@@ -214,6 +385,21 @@ def ensure_db() -> None:
             """
         )
 
+        # `lesson_step_progress`: visited lesson steps, bit (n - 1) set for step n.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS lesson_step_progress (
+                user_id INTEGER NOT NULL,
+                lesson_key TEXT NOT NULL,
+                steps_mask INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (user_id, lesson_key),
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            ) WITHOUT ROWID
+            """
+        )
+        _migrate_lesson_step_rows(conn)
+
         # `quiz_attempts`: best score recorded per quiz.
         conn.execute(
             """
@@ -230,6 +416,12 @@ def ensure_db() -> None:
         )
 
         
+        # Keyset pagination / exports walk these newest-first.
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_progress_completed ON progress(completed_at, user_id, item_key)")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_quiz_attempts_completed ON quiz_attempts(completed_at, user_id, quiz_id)"
+        )
+
         # `user_events`: append-only stream for live monitoring + audit trail.
         conn.execute(
             """
@@ -246,6 +438,17 @@ def ensure_db() -> None:
         conn.execute("CREATE INDEX IF NOT EXISTS idx_user_events_id ON user_events(id)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_user_events_user ON user_events(user_id)")
 
+        # `archive_purges`: deleted users whose archived events still need
+        # removing from the gzip partitions (see modules.event_archive).
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS archive_purges (
+                user_id INTEGER PRIMARY KEY,
+                requested_at TEXT NOT NULL
+            )
+            """
+        )
+
         # `login_tracking`: track user logins and sessions
         conn.execute(
             """
@@ -301,6 +504,9 @@ def ensure_db() -> None:
         conn.execute("CREATE INDEX IF NOT EXISTS idx_module_certificates_user ON module_certificates(user_id)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_module_certificates_passed ON module_certificates(passed)")
 
+        # `user_summary`: materialized per-user dashboard numbers.
+        _ensure_user_summary(conn)
+
         # Content versioning (wipes progress when content changes).
         _ensure_content_version(conn)
 
@@ -312,16 +518,79 @@ def ensure_db() -> None:
         conn.close()
 
 
-def _connect() -> sqlite3.Connection:
-    """Open a SQLite connection with Row objects for dict-like access."""
+# One reusable connection per thread; PRAGMAs run once per connection.
+_POOL = SQLitePool(
+    max_uses=int(os.getenv("EDUCATION_DB_POOL_MAX_USES", "1000")),
+    pragmas=("PRAGMA foreign_keys=ON;", "PRAGMA busy_timeout=5000;"),
+)
+
+
+def _connect() -> ContextManager[sqlite3.Connection]:
+    """Borrow this thread's pooled connection (Row objects for dict-like access).
+
+    Use as ``with _connect() as conn:``; the block commits on success and rolls
+    back on error, like a plain sqlite3 connection context.
+    """
     ensure_db()
-    conn = sqlite3.connect(db_path())
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys=ON;")
-    conn.execute("PRAGMA busy_timeout=5000;")
-    return conn
+    return _POOL.connection(db_path())
+
+
+def pool_stats() -> dict[str, Any]:
+    """Connection pool counters for the admin side."""
+    return _POOL.stats()
     
+def _insert_events(conn: sqlite3.Connection, rows: list[tuple]) -> None:
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT INTO user_events (user_id, type, payload, created_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        return
+    except sqlite3.IntegrityError:
+        pass
+
+    # Some row references a deleted user; insert one by one, keeping order and
+    # nulling the user id only where needed.
+    with conn:
+        for row in rows:
+            try:
+                conn.execute(
+                    "INSERT INTO user_events (user_id, type, payload, created_at) VALUES (?, ?, ?, ?)", row
+                )
+            except sqlite3.IntegrityError:
+                conn.execute(
+                    "INSERT INTO user_events (user_id, type, payload, created_at) VALUES (?, ?, ?, ?)",
+                    (None,) + tuple(row[1:]),
+                )
+
+
+def _write_event_batch(items: list[tuple]) -> None:
+    """Insert queued events; items are (db_path, user_id, type, payload, created_at)."""
+    start = 0
+    while start < len(items):
+        path = items[start][0]
+        end = start
+        while end < len(items) and items[end][0] == path:
+            end += 1
+        with _POOL.connection(path) as conn:
+            _insert_events(conn, [item[1:] for item in items[start:end]])
+        start = end
+
+
+# Write-behind sink for record_event. EVENT_WRITER_MODE=sync writes inline.
+_EVENT_WRITER = EventWriter(
+    _write_event_batch,
+    asynchronous=(os.getenv("EVENT_WRITER_MODE", "async").strip().lower() != "sync"),
+    max_queue=int(os.getenv("EVENT_WRITER_MAX_QUEUE", "10000")),
+    batch_size=int(os.getenv("EVENT_WRITER_BATCH_SIZE", "500")),
+    flush_interval=float(os.getenv("EVENT_WRITER_FLUSH_INTERVAL", "0.2")),
+    overflow=(os.getenv("EVENT_WRITER_OVERFLOW", "sync").strip().lower() or "sync"),
+)
+
+
 def record_event(event_type: str, *, user_id: Optional[int] = None, payload: Optional[dict[str, Any]] = None) -> None:
+    """Queue an event for the background writer (see `_EVENT_WRITER`)."""
     event_type = (event_type or "").strip()
     if not event_type:
         return
@@ -333,33 +602,32 @@ def record_event(event_type: str, *, user_id: Optional[int] = None, payload: Opt
     except Exception:
         normalized_user_id = None
 
-    with _connect() as conn:
-        try:
-            conn.execute(
-                "INSERT INTO user_events (user_id, type, payload, created_at) VALUES (?, ?, ?, ?)",
-                (
-                    normalized_user_id,
-                    event_type,
-                    json.dumps(safe_payload, separators=(",", ":"), ensure_ascii=False),
-                    _utc_now_iso(),
-                ),
-            )
-        except sqlite3.IntegrityError:
-            conn.execute(
-                "INSERT INTO user_events (user_id, type, payload, created_at) VALUES (?, ?, ?, ?)",
-                (
-                    None,
-                    event_type,
-                    json.dumps(safe_payload, separators=(",", ":"), ensure_ascii=False),
-                    _utc_now_iso(),
-                ),
-            )
-        conn.commit()
+    ensure_db()
+    _EVENT_WRITER.submit(
+        (
+            db_path(),
+            normalized_user_id,
+            event_type,
+            json.dumps(safe_payload, separators=(",", ":"), ensure_ascii=False),
+            _utc_now_iso(),
+        )
+    )
+
+
+def flush_events(timeout: float = 5.0) -> bool:
+    """Wait until every queued event is in the database."""
+    return _EVENT_WRITER.flush(timeout)
+
+
+def event_writer_stats() -> dict[str, Any]:
+    """Event writer counters for the admin side."""
+    return _EVENT_WRITER.stats()
 
 def get_events_since(after_id: int, *, limit: int = 200) -> list[dict[str, Any]]:
     """Fetch events with id > after_id."""
     after_id = int(after_id or 0)
     limit = max(1, min(int(limit or 200), 1000))
+    flush_events()
 
     with _connect() as conn:
         rows = conn.execute(
@@ -387,6 +655,14 @@ def get_events_since(after_id: int, *, limit: int = 200) -> list[dict[str, Any]]
         )
     return out
 
+
+def latest_event_id() -> int:
+    """Highest `user_events` id written so far (0 when empty)."""
+    flush_events()
+    with _connect() as conn:
+        row = conn.execute("SELECT MAX(id) FROM user_events").fetchone()
+    return int(row[0] or 0)
+
 @dataclass(frozen=True)
 class User:
     """Public user shape used by routes/UI.
@@ -722,6 +998,78 @@ def mark_progress(user_id: int, item_key: str) -> None:
     
 
 
+def mark_lesson_step(user_id: int, lesson_key: str, step_number: int) -> int:
+    """Mark one lesson step as visited and return the lesson's updated step mask."""
+    step_number = int(step_number)
+    if not 1 <= step_number <= MAX_LESSON_STEPS:
+        raise ValueError(f"step_number must be between 1 and {MAX_LESSON_STEPS}")
+    lesson_key = str(lesson_key)
+    updated_at = _utc_now_iso()
+
+    with _connect() as conn:
+        conn.execute(
+            """
+            INSERT INTO lesson_step_progress (user_id, lesson_key, steps_mask, updated_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(user_id, lesson_key) DO UPDATE SET
+                steps_mask = steps_mask | excluded.steps_mask,
+                updated_at = excluded.updated_at
+            """,
+            (int(user_id), lesson_key, 1 << (step_number - 1), updated_at),
+        )
+        row = conn.execute(
+            "SELECT steps_mask FROM lesson_step_progress WHERE user_id = ? AND lesson_key = ?",
+            (int(user_id), lesson_key),
+        ).fetchone()
+    record_event(
+        "progress_marked",
+        user_id=int(user_id),
+        payload={"item_key": f"{lesson_key}:step:{step_number}", "completed_at": updated_at},
+    )
+    return int(row["steps_mask"])
+
+
+def get_lesson_step_masks(user_id: int) -> dict[str, int]:
+    """Return ``{lesson_key: steps_mask}`` for every lesson the user has opened."""
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT lesson_key, steps_mask FROM lesson_step_progress WHERE user_id = ?",
+            (int(user_id),),
+        ).fetchall()
+    return {str(r["lesson_key"]): int(r["steps_mask"]) for r in rows}
+
+
+def lesson_steps_complete(steps_mask: int, required_steps: int) -> bool:
+    """True when steps 1..`required_steps` are all set in `steps_mask`."""
+    full = (1 << int(required_steps)) - 1
+    return int(steps_mask) & full == full
+
+
+def get_learner_state(user_id: int) -> dict[str, Any]:
+    """Load completed items, lesson step masks and best quiz results in one go.
+
+    Returns ``{"completed_items", "step_masks", "quiz_best"}`` in the same shapes
+    as `get_completed_items`, `get_lesson_step_masks` and `get_quiz_best`.
+    """
+    with _connect() as conn:
+        items = conn.execute("SELECT item_key FROM progress WHERE user_id = ?", (int(user_id),)).fetchall()
+        masks = conn.execute(
+            "SELECT lesson_key, steps_mask FROM lesson_step_progress WHERE user_id = ?",
+            (int(user_id),),
+        ).fetchall()
+        quizzes = conn.execute(
+            "SELECT quiz_id, best_score, total FROM quiz_attempts WHERE user_id = ?",
+            (int(user_id),),
+        ).fetchall()
+    return {
+        "completed_items": {str(r["item_key"]) for r in items},
+        "step_masks": {str(r["lesson_key"]): int(r["steps_mask"]) for r in masks},
+        "quiz_best": {
+            str(r["quiz_id"]): {"best_score": int(r["best_score"]), "total": int(r["total"])} for r in quizzes
+        },
+    }
+
+
 def get_completed_items(user_id: int) -> set[str]:
     """Return the set of completed item keys for a user."""
     with _connect() as conn:
@@ -894,6 +1242,7 @@ def get_all_users_list() -> list[dict]:
 
 def delete_user(user_id: int) -> bool:
     """Delete a user and all related data (cascades)."""
+    flush_events()
     with _connect() as conn:
         # Check if user exists
         user = conn.execute("SELECT id FROM users WHERE id = ?", (int(user_id),)).fetchone()
@@ -902,9 +1251,16 @@ def delete_user(user_id: int) -> bool:
         
         # Delete all related data (cascades)
         conn.execute("DELETE FROM progress WHERE user_id = ?", (int(user_id),))
+        conn.execute("DELETE FROM lesson_step_progress WHERE user_id = ?", (int(user_id),))
         conn.execute("DELETE FROM quiz_attempts WHERE user_id = ?", (int(user_id),))
         conn.execute("DELETE FROM login_tracking WHERE user_id = ?", (int(user_id),))
         conn.execute("DELETE FROM user_events WHERE user_id = ?", (int(user_id),))
+        # Archived events are purged by the next retention pass; until then
+        # query_archive hides them.
+        conn.execute(
+            "INSERT OR IGNORE INTO archive_purges (user_id, requested_at) VALUES (?, ?)",
+            (int(user_id), datetime.now(timezone.utc).isoformat()),
+        )
         conn.execute("DELETE FROM password_resets WHERE user_id = ?", (int(user_id),))
         conn.execute("DELETE FROM users WHERE id = ?", (int(user_id),))
         conn.commit()
@@ -932,12 +1288,14 @@ def reset_user_progress(user_id: int) -> None:
     """Clear user's progress and quiz attempts."""
     with _connect() as conn:
         conn.execute("DELETE FROM progress WHERE user_id = ?", (int(user_id),))
+        conn.execute("DELETE FROM lesson_step_progress WHERE user_id = ?", (int(user_id),))
         conn.execute("DELETE FROM quiz_attempts WHERE user_id = ?", (int(user_id),))
         conn.commit()
 
 
 def get_user_stats(user_id: int) -> dict:
     """Get comprehensive statistics for a user."""
+    flush_events()
     with _connect() as conn:
         # Logins
         logins = conn.execute(
@@ -945,11 +1303,18 @@ def get_user_stats(user_id: int) -> dict:
             (int(user_id),)
         ).fetchone()["count"]
         
-        # Progress items
+        # Progress items (visited lesson steps count one each, as before)
         progress = conn.execute(
             "SELECT COUNT(*) as count FROM progress WHERE user_id = ?",
             (int(user_id),)
         ).fetchone()["count"]
+        progress += sum(
+            int(r["steps_mask"]).bit_count()
+            for r in conn.execute(
+                "SELECT steps_mask FROM lesson_step_progress WHERE user_id = ?",
+                (int(user_id),)
+            )
+        )
         
         # Quizzes taken
         quizzes = conn.execute(
@@ -972,6 +1337,55 @@ def get_user_stats(user_id: int) -> dict:
     }
 
 
+def rebuild_user_summaries() -> int:
+    """Recompute every `user_summary` row from the source tables; returns the row count."""
+    flush_events()
+    with _connect() as conn:
+        return _rebuild_user_summaries(conn)
+
+
+def check_user_summaries(limit: int = 100) -> dict[str, Any]:
+    """Compare `user_summary` against freshly computed values.
+
+    Returns ``{"checked", "mismatches": [...]}``; each mismatch names the user
+    and the fields that differ. `last_activity` only counts as a mismatch when
+    the stored value is older than the source data.
+    """
+    flush_events()
+    fields = ("lessons_completed", "modules_in_progress", "quizzes_attempted", "quizzes_passed")
+    with _connect() as conn:
+        live = {int(r["user_id"]): dict(r) for r in conn.execute(
+            f"""
+            SELECT l.*, MAX(l.last_activity, COALESCE(e.last_event_at, '')) AS live_last_activity
+            FROM user_summary_live l
+            LEFT JOIN (
+                SELECT user_id, MAX(created_at) AS last_event_at
+                FROM user_events WHERE user_id IS NOT NULL
+                GROUP BY user_id
+            ) e ON e.user_id = l.user_id
+            """
+        )}
+        stored = {int(r["user_id"]): dict(r) for r in conn.execute("SELECT * FROM user_summary")}
+
+    mismatches: list[dict[str, Any]] = []
+    for user_id in sorted(set(live) | set(stored)):
+        want, have = live.get(user_id), stored.get(user_id)
+        if want is None or have is None:
+            mismatches.append({"user_id": user_id, "fields": ["missing_row" if have is None else "orphan_row"]})
+            continue
+        bad = [f for f in fields if int(want[f]) != int(have[f])]
+        want_pct, have_pct = want["overall_pct"], have["overall_pct"]
+        if (want_pct is None) != (have_pct is None) or (
+            want_pct is not None and abs(float(want_pct) - float(have_pct)) > 1e-6
+        ):
+            bad.append("overall_pct")
+        if str(have["last_activity"]) < str(want["live_last_activity"]):
+            bad.append("last_activity")
+        if bad:
+            mismatches.append({"user_id": user_id, "fields": bad})
+    return {"checked": len(live), "mismatches": mismatches[: max(0, int(limit))], "mismatch_count": len(mismatches)}
+
+
 # ============= MODULE PROGRESS TRACKING =============
 
 
@@ -0,0 +1,357 @@
+"""Retention and archival for the `user_events` table.
+
+High-level responsibilities
+--------------------------
+- Move events older than a retention window out of SQLite into gzip JSONL
+  files partitioned by day (``<archive>/YYYY-MM/YYYY-MM-DD.jsonl.gz``).
+- Delete archived rows from the hot table in small chunks, so no single
+  transaction holds the write lock for long.
+- Let admins list partitions and query archived events on demand.
+- Run the whole thing periodically from a background thread.
+
+Notes
+-----
+- Each chunk is appended (and fsynced) to its archive files before the rows
+  are deleted. If the process dies between the two steps the next run
+  archives those rows again; `query_archive` drops duplicate ids.
+- Appending to a ``.gz`` file adds a new gzip member, which `gzip.open`
+  reads transparently.
+- With several gunicorn workers, a lease row in `maintenance_leases` makes
+  sure only one of them runs the job at a time. The pass renews the lease
+  between chunks and stops if it has been lost.
+- Deleting a user queues them in `archive_purges`. The next retention pass
+  rewrites the partitions without their rows; until then `query_archive`
+  skips them.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Iterator, Optional
+
+from modules import education_store
+
+log = logging.getLogger(__name__)
+
+_LEASE_NAME = "user_events_retention"
+_LEASE_TTL_SECONDS = 300.0
+
+
+def archive_root() -> str:
+    """Directory holding archive partitions (EVENT_ARCHIVE_DIR, else next to the DB)."""
+    raw = (os.getenv("EVENT_ARCHIVE_DIR") or "").strip()
+    if raw:
+        return os.path.abspath(raw)
+    return os.path.join(os.path.dirname(education_store.db_path()), "event_archive")
+
+
+def _partition_path(root: str, day: str) -> str:
+    return os.path.join(root, day[:7], f"{day}.jsonl.gz")
+
+
+def _append_partition(root: str, day: str, rows: list[dict[str, Any]]) -> None:
+    path = _partition_path(root, day)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="ab") as gz:
+            for row in rows:
+                gz.write((json.dumps(row, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8"))
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def archive_events(
+    *,
+    older_than_days: float,
+    chunk_size: int = 500,
+    pause_seconds: float = 0.05,
+    max_chunks: Optional[int] = None,
+    root: Optional[str] = None,
+    now: Optional[datetime] = None,
+    renew: Optional[Callable[[], bool]] = None,
+) -> dict[str, Any]:
+    """Archive and delete events older than `older_than_days`.
+
+    `renew` is called before every chunk after the first; if it returns False
+    (the lease went to another worker) the run stops early.
+
+    Returns counts for the run: rows archived, chunks, and partitions touched.
+    """
+    root = root or archive_root()
+    now = now or datetime.now(timezone.utc)
+    cutoff = (now - timedelta(days=float(older_than_days))).replace(microsecond=0).isoformat()
+    chunk_size = max(1, int(chunk_size))
+    education_store.flush_events()
+
+    archived = 0
+    chunks = 0
+    days: set[str] = set()
+    while max_chunks is None or chunks < max_chunks:
+        if chunks and renew is not None and not renew():
+            log.warning("user_events retention lost its lease after %d chunks", chunks)
+            break
+        with education_store._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, user_id, type, payload, created_at FROM user_events "
+                "WHERE created_at < ? ORDER BY id ASC LIMIT ?",
+                (cutoff, chunk_size),
+            ).fetchall()
+        if not rows:
+            break
+
+        by_day: dict[str, list[dict[str, Any]]] = {}
+        for r in rows:
+            row = dict(r)
+            by_day.setdefault(str(row["created_at"])[:10], []).append(row)
+        for day, day_rows in sorted(by_day.items()):
+            _append_partition(root, day, day_rows)
+        days.update(by_day)
+
+        ids = [int(r["id"]) for r in rows]
+        with education_store._connect() as conn:
+            conn.execute(
+                f"DELETE FROM user_events WHERE id IN ({','.join('?' * len(ids))})",
+                ids,
+            )
+        archived += len(ids)
+        chunks += 1
+        if len(rows) < chunk_size:
+            break
+        if pause_seconds > 0:
+            time.sleep(pause_seconds)
+
+    return {"archived": archived, "chunks": chunks, "partitions": sorted(days), "cutoff": cutoff}
+
+
+def _pending_purges() -> set[int]:
+    with education_store._connect() as conn:
+        return {int(r["user_id"]) for r in conn.execute("SELECT user_id FROM archive_purges")}
+
+
+def purge_deleted_users(
+    *,
+    root: Optional[str] = None,
+    renew: Optional[Callable[[], bool]] = None,
+) -> dict[str, Any]:
+    """Rewrite partitions without the rows of users queued in `archive_purges`.
+
+    Each changed partition is written to a temp file and swapped in with
+    `os.replace`. Must run under the retention lease so no pass appends to a
+    partition while it is being rewritten.
+    """
+    root = root or archive_root()
+    pending = _pending_purges()
+    removed = 0
+    rewritten = 0
+    if not pending:
+        return {"users": 0, "rows": 0, "partitions": 0}
+    for part in list_partitions(root):
+        if renew is not None and not renew():
+            log.warning("archive purge lost its lease; %d user(s) left queued", len(pending))
+            return {"users": 0, "rows": removed, "partitions": rewritten}
+        path = _partition_path(root, part["date"])
+        kept: list[str] = []
+        dropped = 0
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                if json.loads(line).get("user_id") in pending:
+                    dropped += 1
+                else:
+                    kept.append(line if line.endswith("\n") else line + "\n")
+        if not dropped:
+            continue
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+                gz.write("".join(kept).encode("utf-8"))
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp, path)
+        removed += dropped
+        rewritten += 1
+
+    with education_store._connect() as conn:
+        conn.executemany("DELETE FROM archive_purges WHERE user_id = ?", [(uid,) for uid in pending])
+    return {"users": len(pending), "rows": removed, "partitions": rewritten}
+
+
+def list_partitions(root: Optional[str] = None) -> list[dict[str, Any]]:
+    """Return ``[{"date", "bytes"}]`` for every archive partition, oldest first."""
+    root = root or archive_root()
+    out: list[dict[str, Any]] = []
+    if not os.path.isdir(root):
+        return out
+    for month in sorted(os.listdir(root)):
+        month_dir = os.path.join(root, month)
+        if not os.path.isdir(month_dir):
+            continue
+        for name in sorted(os.listdir(month_dir)):
+            if name.endswith(".jsonl.gz"):
+                out.append({"date": name[: -len(".jsonl.gz")],
+                            "bytes": os.path.getsize(os.path.join(month_dir, name))})
+    return out
+
+
+def query_archive(
+    start: date,
+    end: date,
+    *,
+    user_id: Optional[int] = None,
+    event_type: Optional[str] = None,
+    limit: int = 1000,
+    root: Optional[str] = None,
+) -> Iterator[dict[str, Any]]:
+    """Yield archived events dated `start`..`end` (inclusive), in id order per day.
+
+    Events of deleted users still waiting for `purge_deleted_users` are skipped.
+    """
+    root = root or archive_root()
+    deleted = _pending_purges()
+    produced = 0
+    day = start
+    while day <= end and produced < limit:
+        path = _partition_path(root, day.isoformat())
+        day += timedelta(days=1)
+        if not os.path.exists(path):
+            continue
+        seen: set[int] = set()
+        rows = []
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if row["id"] in seen:
+                    continue
+                seen.add(row["id"])
+                if user_id is not None and row.get("user_id") != user_id:
+                    continue
+                if row.get("user_id") in deleted:
+                    continue
+                if event_type and row.get("type") != event_type:
+                    continue
+                rows.append(row)
+        for row in sorted(rows, key=lambda r: r["id"]):
+            if produced >= limit:
+                return
+            try:
+                row["payload"] = json.loads(row.get("payload") or "{}")
+            except Exception:
+                row["payload"] = {"_raw": row.get("payload")}
+            produced += 1
+            yield row
+
+
+# ---- scheduling ----
+
+def _acquire_lease(holder: str, ttl_seconds: float) -> bool:
+    """Take (or renew) the cross-worker retention lease; False if someone else holds it."""
+    now = time.time()
+    with education_store._connect() as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS maintenance_leases (
+                name TEXT PRIMARY KEY,
+                holder TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO maintenance_leases (name, holder, expires_at) VALUES (?, ?, 0)",
+            (_LEASE_NAME, holder),
+        )
+        cur = conn.execute(
+            "UPDATE maintenance_leases SET holder = ?, expires_at = ? "
+            "WHERE name = ? AND (holder = ? OR expires_at < ?)",
+            (holder, now + ttl_seconds, _LEASE_NAME, holder, now),
+        )
+        return cur.rowcount == 1
+
+
+def _release_lease(holder: str) -> None:
+    """Expire the lease now if `holder` still owns it."""
+    with education_store._connect() as conn:
+        conn.execute(
+            "UPDATE maintenance_leases SET expires_at = 0 WHERE name = ? AND holder = ?",
+            (_LEASE_NAME, holder),
+        )
+
+
+_JOB_LOCK = threading.Lock()
+_JOB_STATE: dict[str, Any] = {"last_run_at": None, "last_result": None, "last_error": None, "runs": 0}
+_HOLDER: dict[int, str] = {}
+
+
+def _process_holder() -> str:
+    """Lease holder id for this process (a forked worker gets its own)."""
+    pid = os.getpid()
+    if pid not in _HOLDER:
+        _HOLDER.clear()
+        _HOLDER[pid] = f"{pid}-{secrets.token_hex(4)}"
+    return _HOLDER[pid]
+
+
+def run_retention_once(*, older_than_days: float, holder: Optional[str] = None, **kwargs: Any) -> Optional[dict[str, Any]]:
+    """One retention pass if this worker can take the lease; None otherwise.
+
+    The lease is renewed between chunks and released when the pass ends;
+    its TTL only matters if the process dies mid-run. Queued user purges run
+    after the archive step, under the same lease.
+    """
+    holder = holder or _process_holder()
+    if not _JOB_LOCK.acquire(blocking=False):
+        return None
+    try:
+        def renew() -> bool:
+            return _acquire_lease(holder, ttl_seconds=_LEASE_TTL_SECONDS)
+
+        if not renew():
+            return None
+        try:
+            result = archive_events(older_than_days=older_than_days, renew=renew, **kwargs)
+            if renew():
+                result["purged"] = purge_deleted_users(root=kwargs.get("root"), renew=renew)
+        finally:
+            _release_lease(holder)
+        _JOB_STATE.update(last_run_at=datetime.now(timezone.utc).isoformat(), last_result=result,
+                          last_error=None, runs=_JOB_STATE["runs"] + 1)
+        return result
+    except Exception as e:
+        _JOB_STATE.update(last_run_at=datetime.now(timezone.utc).isoformat(), last_error=str(e))
+        raise
+    finally:
+        _JOB_LOCK.release()
+
+
+def job_status() -> dict[str, Any]:
+    return dict(_JOB_STATE)
+
+
+def start_retention_job(*, older_than_days: float, interval_seconds: float = 6 * 3600,
+                        initial_delay_seconds: float = 60.0) -> threading.Thread:
+    """Start a daemon thread running `run_retention_once` every `interval_seconds`.
+
+    The first run waits `initial_delay_seconds` so it stays out of the way of startup.
+    """
+    def _loop() -> None:
+        time.sleep(initial_delay_seconds)
+        while True:
+            try:
+                run_retention_once(older_than_days=older_than_days)
+            except Exception:
+                log.exception("user_events retention run failed")
+            time.sleep(interval_seconds)
+
+    thread = threading.Thread(target=_loop, name="user-events-retention", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,266 @@
+"""Per-process fan-out of `user_events` to live admin streams.
+
+High-level responsibilities
+--------------------------
+- Run one poller per process that reads new events from the database and
+  hands them to every subscriber, so database load does not grow with the
+  number of open `/admin/events/stream` connections.
+- Give each subscriber a bounded queue and evict ones that fall behind
+  instead of buffering without limit.
+- Resume a reconnecting client from its Last-Event-ID, using a ring buffer
+  of recent events and the database only for older gaps.
+- Report subscriber counts, poll costs and evictions for the admin side.
+
+Notes
+-----
+- Events are written by every gunicorn worker, so an in-process hook on
+  `record_event` would miss most of them; each process polls instead. That
+  is one query per `poll_interval` per process while anyone is listening.
+- The poller starts with the first subscriber and stops after the last one
+  leaves. Like `EventWriter`, it is re-created after a fork.
+- Replay is capped at `max_replay` events before the newest one. Older
+  history is available from `/admin/events/recent`.
+- An evicted subscriber gets an `evicted` event and the stream ends; the
+  browser's EventSource reconnects with Last-Event-ID and carries on.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+log = logging.getLogger(__name__)
+
+
+class TooManySubscribers(Exception):
+    def __init__(self, count: int, limit: int) -> None:
+        super().__init__(f"{count} event streams already open (limit {limit})")
+        self.count = count
+        self.limit = limit
+
+
+class Subscription:
+    """One stream's view of the broadcast: a bounded queue plus a cursor."""
+
+    def __init__(self, broadcaster: "EventBroadcaster", last_id: int, max_queue: int) -> None:
+        self._broadcaster = broadcaster
+        self.last_id = int(last_id)  # highest id queued for this subscriber
+        self.max_queue = max_queue
+        self.evicted = False
+        self.closed = False
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+
+    def _prime(self, events: list[dict[str, Any]]) -> None:
+        """Load replayed events; these may exceed `max_queue` once."""
+        if events:
+            self._queue.extend(events)
+            self.last_id = events[-1]["id"]
+
+    def _offer(self, events: list[dict[str, Any]]) -> bool:
+        """Queue events newer than the cursor; False if that would overflow."""
+        fresh = [e for e in events if e["id"] > self.last_id]
+        if not fresh:
+            return True
+        with self._cond:
+            if len(self._queue) + len(fresh) > self.max_queue:
+                self.evicted = True
+                self._cond.notify_all()
+                return False
+            self._queue.extend(fresh)
+            self.last_id = fresh[-1]["id"]
+            self._cond.notify_all()
+        return True
+
+    def get(self, timeout: float) -> list[dict[str, Any]]:
+        """Everything queued, waiting up to `timeout`; [] means send a heartbeat."""
+        with self._cond:
+            if not self._queue and not self.evicted and not self.closed:
+                self._cond.wait(timeout)
+            events = list(self._queue)
+            self._queue.clear()
+        return events
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def close(self) -> None:
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        self._broadcaster.unsubscribe(self)
+
+
+class EventBroadcaster:
+    """One DB poller fanning events out to many bounded subscriber queues."""
+
+    def __init__(
+        self,
+        fetch_since: Callable[[int, int], list[dict[str, Any]]],
+        latest_id: Callable[[], int],
+        *,
+        poll_interval: float = 0.5,
+        batch_size: int = 200,
+        max_queue: int = 1000,
+        max_replay: int = 1000,
+        max_subscribers: int = 0,
+    ) -> None:
+        self._fetch_since = fetch_since
+        self._latest_id = latest_id
+        self.poll_interval = float(poll_interval)
+        self.batch_size = max(1, int(batch_size))
+        self.max_queue = max(1, int(max_queue))
+        self.max_replay = max(0, int(max_replay))
+        self.max_subscribers = max(0, int(max_subscribers))  # 0 = unlimited
+
+        self._lock = threading.Lock()
+        self._subs: set[Subscription] = set()
+        self._ring: deque = deque(maxlen=max(self.max_replay, 1))
+        self._head: Optional[int] = None  # highest id the poller has broadcast
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._pid = os.getpid()
+        self._counters = {
+            "subscribed": 0,
+            "rejected": 0,
+            "evicted": 0,
+            "polls": 0,
+            "events": 0,
+            "replayed": 0,
+            "replay_queries": 0,
+        }
+        self._last_poll_ms: Optional[float] = None
+
+    # ---- subscribers ----
+
+    def subscribe(self, last_id: Optional[int] = None, *,
+                  factory: Callable[..., Subscription] = Subscription) -> Subscription:
+        """Register a stream resuming after `last_id` (None = live events only).
+
+        `factory` builds the subscription (the asyncio service passes one that
+        wakes its event loop). Raises `TooManySubscribers` once
+        `max_subscribers` streams are open.
+        """
+        self._check_fork()
+        with self._lock:
+            if self.max_subscribers and len(self._subs) >= self.max_subscribers:
+                self._counters["rejected"] += 1
+                raise TooManySubscribers(len(self._subs), self.max_subscribers)
+            if self._head is None:
+                self._head = self._latest_id()
+            head = self._head
+        cursor = head if last_id is None else max(int(last_id), head - self.max_replay)
+
+        # Page older events in outside the lock, then take the rest from the
+        # ring and register in one step so the poller cannot slip in between.
+        replay: list[dict[str, Any]] = []
+        while True:
+            with self._lock:
+                if self._head is None:  # an exiting poller reset it meanwhile
+                    self._head = head
+                ring_low = self._ring[0]["id"] if self._ring else self._head + 1
+                if cursor >= ring_low - 1:
+                    replay.extend(e for e in self._ring if e["id"] > cursor)
+                    sub = factory(self, cursor, self.max_queue)
+                    sub._prime(replay)
+                    self._subs.add(sub)
+                    self._counters["subscribed"] += 1
+                    self._counters["replayed"] += len(replay)
+                    break
+            page = self._fetch_since(cursor, self.batch_size)
+            with self._lock:
+                self._counters["replay_queries"] += 1
+            if not page:
+                cursor = ring_low - 1  # nothing stored in the gap
+                continue
+            replay.extend(page)
+            cursor = page[-1]["id"]
+        self._ensure_thread()
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subs.discard(sub)
+
+    # ---- poller ----
+
+    def poll_once(self) -> int:
+        """Fetch and broadcast one batch of new events; returns how many."""
+        with self._lock:
+            if self._head is None:
+                self._head = self._latest_id()
+            head = self._head
+        started = time.perf_counter()
+        events = self._fetch_since(head, self.batch_size)
+        self._last_poll_ms = round((time.perf_counter() - started) * 1000, 3)
+        with self._lock:
+            self._counters["polls"] += 1
+            if not events:
+                return 0
+            self._ring.extend(events)
+            self._head = events[-1]["id"]
+            self._counters["events"] += len(events)
+            subs = list(self._subs)
+        evicted = [sub for sub in subs if not sub._offer(events)]
+        if evicted:
+            with self._lock:
+                for sub in evicted:
+                    self._subs.discard(sub)
+                self._counters["evicted"] += len(evicted)
+            log.info("Evicted %d slow event stream subscriber(s)", len(evicted))
+        return len(events)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._subs:
+                    # Forget our position: the next subscriber starts from
+                    # the current head rather than the backlog since now.
+                    self._thread = None
+                    self._head = None
+                    self._ring.clear()
+                    return
+            try:
+                # A full batch means we are behind; go again without sleeping.
+                if self.poll_once() >= self.batch_size:
+                    continue
+            except Exception:
+                log.exception("Event broadcast poll failed")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _check_fork(self) -> None:
+        if os.getpid() != self._pid:
+            with self._lock:
+                self._pid = os.getpid()
+                self._subs.clear()
+                self._thread = None
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="event-broadcaster", daemon=True)
+            self._thread.start()
+
+    def notify(self) -> None:
+        """Poll now instead of waiting for the next interval."""
+        self._wake.set()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            subs = list(self._subs)
+            out: dict[str, Any] = dict(self._counters)
+            out["head_id"] = self._head
+            out["ring"] = len(self._ring)
+            out["polling"] = self._thread is not None and self._thread.is_alive()
+        out["subscribers"] = len(subs)
+        out["max_subscribers"] = self.max_subscribers
+        out["max_queued"] = max((s.queued for s in subs), default=0)
+        out["last_poll_ms"] = self._last_poll_ms
+        return out
@@ -0,0 +1,226 @@
+"""Write-behind sink that group-commits `user_events` rows.
+
+High-level responsibilities
+--------------------------
+- Accept events from request threads without touching the database.
+- Drain them from a background thread in batches, one transaction per batch.
+- Keep the queue bounded, with a configurable policy for when it is full.
+- Flush whatever is queued on interpreter shutdown.
+
+Notes
+-----
+- Overflow policies: ``"sync"`` (write the event inline), ``"block"`` (wait up
+  to `block_timeout` for room, then write inline), ``"drop_newest"`` and
+  ``"drop_oldest"`` (discard and count).
+- Every database write (background batch or inline fallback) happens under
+  one lock, and items only leave the queue while that lock is held. Inline
+  writes drain the queue first, so rows are inserted - and get their
+  AUTOINCREMENT ids - in submission order. SQLite serialises writers, so a
+  reader polling ``id > last_id`` never sees a gap filled in later.
+- The background thread starts lazily and is re-created after a fork (e.g. a
+  gunicorn worker started from a preloaded app).
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Sequence
+
+log = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("sync", "block", "drop_newest", "drop_oldest")
+
+
+class EventWriter:
+    """Bounded in-process queue drained by a background group-commit writer."""
+
+    def __init__(
+        self,
+        write_batch: Callable[[Sequence[Any]], None],
+        *,
+        asynchronous: bool = True,
+        max_queue: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 0.2,
+        overflow: str = "sync",
+        block_timeout: float = 1.0,
+        max_retries: int = 3,
+    ) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+        self._write_batch = write_batch
+        self.asynchronous = bool(asynchronous)
+        self.max_queue = max(1, int(max_queue))
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.overflow = overflow
+        self.block_timeout = float(block_timeout)
+        self.max_retries = max(0, int(max_retries))
+
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._queue: deque = deque()
+        self._in_flight = 0
+        self._closed = False
+        self._thread: threading.Thread | None = None
+        self._pid = os.getpid()
+        self._counters = {
+            "submitted": 0,
+            "written": 0,
+            "batches": 0,
+            "sync_writes": 0,
+            "dropped": 0,
+            "write_errors": 0,
+            "max_batch": 0,
+        }
+        atexit.register(self.close)
+
+    # ---- writing ----
+
+    def _write(self, batch: list) -> None:
+        """Write `batch` (caller holds `_write_lock`), retrying transient errors."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._write_batch(batch)
+                break
+            except Exception as e:
+                with self._cond:
+                    self._counters["write_errors"] += 1
+                if attempt == self.max_retries:
+                    log.warning("Dropping %d events after repeated write failures: %s", len(batch), e)
+                    with self._cond:
+                        self._counters["dropped"] += len(batch)
+                    return
+                time.sleep(0.05 * (attempt + 1))
+        with self._cond:
+            self._counters["written"] += len(batch)
+            self._counters["batches"] += 1
+            self._counters["max_batch"] = max(self._counters["max_batch"], len(batch))
+
+    def _write_now(self, item: Any = None, *, include_item: bool = False) -> None:
+        """Drain the queue (and optionally `item`) inline, preserving order."""
+        with self._write_lock:
+            with self._cond:
+                batch = list(self._queue)
+                self._queue.clear()
+                self._in_flight += len(batch)
+            if include_item:
+                batch.append(item)
+            if batch:
+                self._write(batch)
+            with self._cond:
+                self._in_flight -= len(batch) - (1 if include_item else 0)
+                self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue and self._closed:
+                    return
+            # Give concurrent submitters a moment to join this batch.
+            if self.flush_interval > 0:
+                time.sleep(self.flush_interval)
+            with self._write_lock:
+                with self._cond:
+                    n = min(self.batch_size, len(self._queue))
+                    batch = [self._queue.popleft() for _ in range(n)]
+                    self._in_flight += n
+                    self._cond.notify_all()  # wake producers blocked on a full queue
+                if batch:
+                    self._write(batch)
+                with self._cond:
+                    self._in_flight -= len(batch)
+                    self._cond.notify_all()
+
+    def _ensure_thread(self) -> None:
+        # Caller holds self._cond.
+        if os.getpid() != self._pid:
+            # Forked child: the parent's thread and queued items are not ours.
+            self._pid = os.getpid()
+            self._queue.clear()
+            self._in_flight = 0
+            self._thread = None
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+            self._thread.start()
+
+    # ---- public API ----
+
+    def submit(self, item: Any) -> None:
+        """Queue `item` for writing (or write it inline, see `overflow`)."""
+        if not self.asynchronous or self._closed:
+            with self._cond:
+                self._counters["submitted"] += 1
+                self._counters["sync_writes"] += 1
+            self._write_now(item, include_item=True)
+            return
+
+        with self._cond:
+            self._counters["submitted"] += 1
+            self._ensure_thread()
+            if len(self._queue) >= self.max_queue and self.overflow == "block":
+                deadline = time.monotonic() + self.block_timeout
+                while len(self._queue) >= self.max_queue:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        break
+            if len(self._queue) < self.max_queue:
+                self._queue.append(item)
+                self._cond.notify_all()
+                return
+            if self.overflow == "drop_newest":
+                self._counters["dropped"] += 1
+                return
+            if self.overflow == "drop_oldest":
+                self._queue.popleft()
+                self._queue.append(item)
+                self._counters["dropped"] += 1
+                return
+            self._counters["sync_writes"] += 1
+        self._write_now(item, include_item=True)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything submitted so far is written; False on timeout."""
+        with self._cond:
+            running = self._thread is not None and self._thread.is_alive() and os.getpid() == self._pid
+            pending = bool(self._queue) or self._in_flight > 0
+        if not pending:
+            return True
+        if not running:
+            self._write_now()
+            return True
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._in_flight > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self) -> None:
+        """Stop accepting background work and write out anything queued."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread if os.getpid() == self._pid else None
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=5.0)
+        self._write_now()
+
+    def stats(self) -> dict[str, Any]:
+        """Return counters and queue depth for admin dashboards."""
+        with self._cond:
+            out: dict[str, Any] = dict(self._counters)
+            out["queued"] = len(self._queue)
+        out["max_queue"] = self.max_queue
+        out["overflow"] = self.overflow
+        out["asynchronous"] = self.asynchronous
+        return out
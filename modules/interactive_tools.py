@@ -3,9 +3,15 @@ Interactive Educational Tools and Calculators
 Hands-on learning for lithium battery concepts
 """
 
+import json
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
-from modules.lithium_education import CellChemistry, CellSpecifications, CRate, CapacityAndDOD
+from io import BytesIO
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from modules import cell_model
+from modules.battery_concepts import CellChemistry, CellSpecifications, CRate, CapacityAndDOD
 
 
 class CellSimulator:
@@ -52,6 +58,81 @@ class CellSimulator:
             "status": "HEALTHY" if new_voltage > self.spec.min_voltage_v else "CUTOFF"
         }
     
+    def iter_discharge(self, current_a: float, duration_hours: float, steps: int = 120,
+                       ambient_temp_c: float = 25.0) -> Iterator[Dict]:
+        """Yield one frame per time step of an equivalent-circuit discharge.
+
+        Frames have ``"type": "step"``; the last frame has ``"type": "summary"``
+        with the same keys as `simulate_discharge`. Only running totals are kept,
+        so memory does not grow with `steps`. Once the cell reaches min voltage
+        it rests (zero current) for the remaining steps.
+        """
+        steps = max(1, int(steps))
+        dt_s = duration_hours * 3600.0 / steps
+        params = cell_model.params_for_cell(self.spec)
+        state = cell_model.initial_state(params, soc=self.current_soc, temp_c=ambient_temp_c)
+        energy_ws = heat_ws = 0.0
+        peak_temp = float(state.temp_c)
+        cutoff_step = -1
+        voltage = float(params.ocv(state.soc))
+
+        for i in range(steps):
+            current = float(current_a) if cutoff_step < 0 else 0.0
+            current = float(cell_model.limit_current(params, state, current, dt_s))
+            v, heat = cell_model.step(params, state, current, dt_s, ambient_temp_c)
+            voltage, heat = float(v), float(heat)
+            if cutoff_step < 0 and voltage <= params.min_voltage_v:
+                cutoff_step = i
+            energy_ws += voltage * current * dt_s
+            heat_ws += heat * dt_s
+            peak_temp = max(peak_temp, float(state.temp_c))
+            yield {
+                "type": "step",
+                "step": i + 1,
+                "time_s": round((i + 1) * dt_s, 3),
+                "current_a": current,
+                "voltage_v": round(voltage, 4),
+                "soc": round(float(state.soc), 3),
+                "temp_c": round(float(state.temp_c), 3),
+                "heat_w": round(heat, 5),
+            }
+
+        self.current_voltage = voltage
+        self.current_soc = float(state.soc)
+        crate = CRate.calculate_crate(current_a, self.spec.capacity_mah / 1000)
+        yield {
+            "type": "summary",
+            "crate": round(crate, 2),
+            "energy_discharged_wh": round(energy_ws / 3600.0, 2),
+            "new_soc": round(self.current_soc, 1),
+            "new_voltage": round(voltage, 3),
+            "voltage_sag_v": round(max(0.0, float(params.ocv(self.current_soc)) - voltage), 3),
+            "time_remaining_hours": self._estimate_remaining_time(current_a),
+            "status": "HEALTHY" if cutoff_step < 0 else "CUTOFF",
+            "cutoff_after_hours": round((cutoff_step + 1) * dt_s / 3600.0, 3) if cutoff_step >= 0 else None,
+            "peak_temp_c": round(peak_temp, 2),
+            "heat_generated_wh": round(heat_ws / 3600.0, 3),
+        }
+
+    def simulate_discharge(self, current_a: float, duration_hours: float, steps: int = 120,
+                           ambient_temp_c: float = 25.0, include_trace: bool = False) -> Dict:
+        """Time-stepped discharge through the equivalent-circuit model.
+
+        Returns the same summary keys as `discharge`, plus heat/temperature
+        figures and (optionally) the full voltage/SOC/temperature trace.
+        """
+        trace_keys = ("time_s", "voltage_v", "soc", "temp_c", "heat_w")
+        trace = {k: [] for k in trace_keys}
+        for frame in self.iter_discharge(current_a, duration_hours, steps, ambient_temp_c):
+            if frame["type"] == "summary":
+                result = {k: v for k, v in frame.items() if k != "type"}
+            elif include_trace:
+                for k in trace_keys:
+                    trace[k].append(frame[k])
+        if include_trace:
+            result["trace"] = trace
+        return result
+
     def charge(self, current_a: float, duration_hours: float) -> Dict:
         """Simulate charging the cell"""
         energy_charged_wh = current_a * duration_hours
@@ -161,16 +242,219 @@ class PackSimulator:
         }
 
 
+class ArrayPackSimulator:
+    """Array-backed SxP pack model for large packs (10k+ cells).
+
+    Per-cell state lives in contiguous (series, parallel) NumPy arrays and every
+    cell advances in one vectorised step of the shared equivalent-circuit model
+    (`modules.cell_model`). Cells in a parallel group share the group current in
+    proportion to their capacity; the pack voltage is the sum of the series
+    groups' mean voltages.
+    """
+
+    # Per-cell detail is only included in responses for packs up to this size.
+    MAX_CELL_RESULTS = 256
+
+    def __init__(self, series_cells: int, parallel_cells: int, cell_spec: CellSpecifications,
+                 cell_ir_milliohm: float = 50.0, initial_soc: float = 50.0,
+                 ambient_temp_c: float = 25.0):
+        if series_cells < 1 or parallel_cells < 1:
+            raise ValueError("series_cells and parallel_cells must be >= 1")
+        self.series_cells = int(series_cells)
+        self.parallel_cells = int(parallel_cells)
+        self.num_cells = self.series_cells * self.parallel_cells
+        self.cell_spec = cell_spec
+        shape = (self.series_cells, self.parallel_cells)
+        self.soc = np.full(shape, float(initial_soc))
+        self.capacity_mah = np.full(shape, float(cell_spec.capacity_mah))
+        self.ir_milliohm = np.full(shape, float(cell_ir_milliohm))
+        self.temp_c = np.full(shape, float(ambient_temp_c))
+        self.ambient_temp_c = float(ambient_temp_c)
+        params = self._ecm_params()
+        self._ecm_state = cell_model.EcmState(
+            soc=self.soc, temp_c=self.temp_c, v_rc=np.zeros((len(params.rc_r_ohm),) + shape))
+        self.voltage = params.ocv(self.soc)
+        self.imbalance_factor = 0.0
+
+    def _ecm_params(self) -> "cell_model.EcmParameters":
+        return cell_model.params_for_cell(self.cell_spec, r0_ohm=self.ir_milliohm / 1000.0,
+                                          capacity_ah=self.capacity_mah / 1000.0)
+
+    _SNAPSHOT_ARRAYS = ("soc", "capacity_mah", "ir_milliohm", "temp_c", "voltage")
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the per-cell state arrays."""
+        arrays = [getattr(self, name) for name in self._SNAPSHOT_ARRAYS] + [self._ecm_state.v_rc]
+        return int(sum(a.nbytes for a in arrays))
+
+    def to_snapshot(self) -> bytes:
+        """Serialise the full pack state to a compressed NumPy archive."""
+        spec = self.cell_spec
+        meta = {
+            "series_cells": self.series_cells,
+            "parallel_cells": self.parallel_cells,
+            "ambient_temp_c": self.ambient_temp_c,
+            "imbalance_factor": self.imbalance_factor,
+            "cell_spec": {
+                "nominal_voltage_v": spec.nominal_voltage_v,
+                "capacity_mah": spec.capacity_mah,
+                "chemistry": spec.chemistry.name,
+                "min_voltage_v": spec.min_voltage_v,
+                "max_voltage_v": spec.max_voltage_v,
+            },
+        }
+        buf = BytesIO()
+        np.savez_compressed(buf, meta=np.array(json.dumps(meta)), v_rc=self._ecm_state.v_rc,
+                            **{name: getattr(self, name) for name in self._SNAPSHOT_ARRAYS})
+        return buf.getvalue()
+
+    @classmethod
+    def from_snapshot(cls, blob: bytes) -> "ArrayPackSimulator":
+        """Rebuild a simulator from `to_snapshot` output."""
+        with np.load(BytesIO(blob), allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            spec_fields = dict(meta["cell_spec"], chemistry=CellChemistry[meta["cell_spec"]["chemistry"]])
+            pack = cls(meta["series_cells"], meta["parallel_cells"], CellSpecifications(**spec_fields),
+                       ambient_temp_c=meta["ambient_temp_c"])
+            # Copy in place: the ECM state shares the soc/temp_c buffers.
+            for name in cls._SNAPSHOT_ARRAYS:
+                np.copyto(getattr(pack, name), data[name])
+            np.copyto(pack._ecm_state.v_rc, data["v_rc"])
+        pack.imbalance_factor = meta["imbalance_factor"]
+        return pack
+
+    def introduce_imbalance(self, capacity_spread: float = 0.0, ir_spread: float = 0.0,
+                            seed: Optional[int] = None):
+        """Weaken the middle cell (85% capacity) and optionally scatter every cell.
+
+        `capacity_spread` / `ir_spread` are relative standard deviations applied
+        to all cells, e.g. 0.02 for a +/-2% manufacturing spread.
+        """
+        if capacity_spread or ir_spread:
+            rng = np.random.default_rng(seed)
+            shape = self.capacity_mah.shape
+            self.capacity_mah *= np.clip(rng.normal(1.0, capacity_spread, shape), 0.5, 1.5)
+            self.ir_milliohm *= np.clip(rng.normal(1.0, ir_spread, shape), 0.5, 2.0)
+        if self.num_cells > 1:
+            self.capacity_mah.flat[self.num_cells // 2] *= 0.85
+            self.imbalance_factor = max(0.15, capacity_spread)
+
+    def cell_currents(self, pack_current_a: float) -> np.ndarray:
+        """Split the pack current across each parallel group by cell capacity."""
+        group_capacity = self.capacity_mah.sum(axis=1, keepdims=True)
+        return pack_current_a * self.capacity_mah / group_capacity
+
+    def step(self, pack_current_a: float, dt_hours: float) -> np.ndarray:
+        """Advance every cell by `dt_hours`; returns the per-cell currents used."""
+        params = self._ecm_params()
+        dt_s = dt_hours * 3600.0
+        current = cell_model.limit_current(params, self._ecm_state, self.cell_currents(pack_current_a), dt_s)
+        voltage, _heat = cell_model.step(params, self._ecm_state, current, dt_s, self.ambient_temp_c)
+        self.voltage = np.clip(voltage, self.cell_spec.min_voltage_v, self.cell_spec.max_voltage_v)
+        return current
+
+    def pack_voltage(self) -> float:
+        return float(self.voltage.mean(axis=1).sum())
+
+    def discharge_pack(self, pack_current_a: float, duration_hours: float, steps: int = 1) -> Dict:
+        """Discharge the pack at constant current in `steps` equal time steps."""
+        steps = max(1, int(steps))
+        for _ in range(steps):
+            current = self.step(pack_current_a, duration_hours / steps)
+        return self._discharge_summary(pack_current_a, current)
+
+    def iter_discharge(self, pack_current_a: float, duration_hours: float, steps: int = 1) -> Iterator[Dict]:
+        """Yield a pack-level frame per time step, then a ``"summary"`` frame.
+
+        Step frames carry pack aggregates only (never per-cell arrays), so a
+        consumer can stream any number of steps with flat memory.
+        """
+        steps = max(1, int(steps))
+        dt_hours = duration_hours / steps
+        for i in range(steps):
+            current = self.step(pack_current_a, dt_hours)
+            yield {
+                "type": "step",
+                "step": i + 1,
+                "time_s": round((i + 1) * dt_hours * 3600.0, 3),
+                "pack_voltage_v": round(self.pack_voltage(), 3),
+                "avg_soc": round(float(self.soc.mean()), 3),
+                "min_cell_voltage_v": round(float(self.voltage.min()), 4),
+                "max_cell_voltage_v": round(float(self.voltage.max()), 4),
+                "max_cell_temp_c": round(float(self.temp_c.max()), 3),
+            }
+        yield {"type": "summary", **self._discharge_summary(pack_current_a, current)}
+
+    def _discharge_summary(self, pack_current_a: float, current: np.ndarray) -> Dict:
+        flat_v = self.voltage.ravel()
+        lowest, highest = int(flat_v.argmin()), int(flat_v.argmax())
+        spread = float(flat_v[highest] - flat_v[lowest])
+        result = {
+            "pack_current_a": pack_current_a,
+            "topology": f"{self.series_cells}S{self.parallel_cells}P",
+            "num_cells": self.num_cells,
+            "pack_voltage_v": round(self.pack_voltage(), 2),
+            "avg_soc": round(float(self.soc.mean()), 1),
+            "min_voltage_v": round(float(flat_v[lowest]), 3),
+            "max_voltage_v": round(float(flat_v[highest]), 3),
+            "voltage_imbalance_v": round(spread, 3),
+            "imbalance_detected": spread > 0.1,
+            "lowest_cell": lowest + 1,
+            "highest_cell": highest + 1,
+            "max_cell_temp_c": round(float(self.temp_c.max()), 2),
+        }
+        if self.num_cells <= self.MAX_CELL_RESULTS:
+            flat_i = current.ravel()
+            flat_soc = self.soc.ravel()
+            result["cell_results"] = [
+                {
+                    "cell_id": i + 1,
+                    "current_a": round(float(flat_i[i]), 3),
+                    "new_soc": round(float(flat_soc[i]), 1),
+                    "new_voltage": round(float(flat_v[i]), 3),
+                    "status": "HEALTHY" if flat_v[i] > self.cell_spec.min_voltage_v else "CUTOFF",
+                }
+                for i in range(self.num_cells)
+            ]
+        return result
+
+    def get_pack_health(self) -> Dict:
+        """Assess overall pack health"""
+        rated = self.cell_spec.capacity_mah
+        capacity_retention = float(self.capacity_mah.sum()) / (self.num_cells * rated) * 100
+        voltage_imbalance = float(self.voltage.max() - self.voltage.min())
+
+        health_status = "HEALTHY"
+        if voltage_imbalance > 0.2:
+            health_status = "IMBALANCED - NEEDS BALANCING"
+        if capacity_retention < 80:
+            health_status = "DEGRADED - REPLACE PACK"
+
+        weak = np.flatnonzero(self.capacity_mah.ravel() < rated * 0.90) + 1
+        return {
+            "num_cells": self.num_cells,
+            "topology": f"{self.series_cells}S{self.parallel_cells}P",
+            "pack_voltage_v": round(self.pack_voltage(), 2),
+            "avg_cell_voltage": round(float(self.voltage.mean()), 3),
+            "voltage_imbalance_v": round(voltage_imbalance, 3),
+            "capacity_retention_percent": round(capacity_retention, 1),
+            "health_status": health_status,
+            "weak_cell_count": int(weak.size),
+            "weak_cells": weak[:self.MAX_CELL_RESULTS].tolist(),
+        }
+
+
 class EducationalQuizzes:
     """Interactive quizzes to test understanding"""
     
     @staticmethod
     def quiz_capacity_dod() -> List[Dict]:
         """Module 1 assessment: Introduction to Energy Storage & Modern Energy Systems."""
-        from modules.lithium_education import LithiumBatteryFundamentals
-        
+        from modules.content_store import lesson_content
+
         questions = []
-        for q in LithiumBatteryFundamentals.MODULE_1_ASSESSMENT["questions"]:
+        for q in lesson_content.module("MODULE_1_ASSESSMENT")["questions"]:
             # Convert answer letter to index (A=0, B=1, C=2, D=3)
             answer_map = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
             correct_index = answer_map.get(q["answer"], 0)
@@ -187,8 +471,9 @@ class EducationalQuizzes:
     @staticmethod
     def quiz_module_3_assessment() -> List[Dict]:
         """Module 3 assessment: Battery Fundamentals."""
-        from modules.lithium_education import MODULE_3_ASSESSMENT
+        from modules.content_store import lesson_content
 
+        MODULE_3_ASSESSMENT = lesson_content.module("MODULE_3_ASSESSMENT")
         questions = []
         for q in MODULE_3_ASSESSMENT.get("questions", []):
             answer_map = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
@@ -205,8 +490,9 @@ class EducationalQuizzes:
     @staticmethod
     def quiz_module_4_assessment() -> List[Dict]:
         """Module 4 assessment: The Battery Management System (BMS)."""
-        from modules.lithium_education import MODULE_4_ASSESSMENT
+        from modules.content_store import lesson_content
 
+        MODULE_4_ASSESSMENT = lesson_content.module("MODULE_4_ASSESSMENT")
         questions = []
         for q in MODULE_4_ASSESSMENT.get("questions", []):
             answer_map = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
@@ -223,8 +509,9 @@ class EducationalQuizzes:
     @staticmethod
     def quiz_module_5_assessment() -> List[Dict]:
         """Module 5 assessment: Energy System Design & Sizing."""
-        from modules.lithium_education import MODULE_5_ASSESSMENT
+        from modules.content_store import lesson_content
 
+        MODULE_5_ASSESSMENT = lesson_content.module("MODULE_5_ASSESSMENT")
         questions = []
         answer_map = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
         for q in MODULE_5_ASSESSMENT.get("questions", []):
@@ -241,8 +528,9 @@ class EducationalQuizzes:
     @staticmethod
     def quiz_module_6_assessment() -> List[Dict]:
         """Module 6 assessment: System Installation, Wiring & Integration."""
-        from modules.lithium_education import MODULE_6_ASSESSMENT
+        from modules.content_store import lesson_content
 
+        MODULE_6_ASSESSMENT = lesson_content.module("MODULE_6_ASSESSMENT")
         questions = []
         answer_map = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
         for q in MODULE_6_ASSESSMENT.get("questions", []):
@@ -259,8 +547,9 @@ class EducationalQuizzes:
     @staticmethod
     def quiz_module_7_assessment() -> List[Dict]:
         """Module 7 assessment: System Configuration, Communication & Firmware."""
-        from modules.lithium_education import MODULE_7_ASSESSMENT
+        from modules.content_store import lesson_content
 
+        MODULE_7_ASSESSMENT = lesson_content.module("MODULE_7_ASSESSMENT")
         questions = []
         answer_map = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
         for q in MODULE_7_ASSESSMENT.get("questions", []):
@@ -277,8 +566,9 @@ class EducationalQuizzes:
     @staticmethod
     def quiz_module_8_assessment() -> List[Dict]:
         """Module 8 assessment: Monitoring, Optimisation, Troubleshooting & Fault Finding."""
-        from modules.lithium_education import MODULE_8_ASSESSMENT
+        from modules.content_store import lesson_content
 
+        MODULE_8_ASSESSMENT = lesson_content.module("MODULE_8_ASSESSMENT")
         questions = []
         answer_map = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
         for q in MODULE_8_ASSESSMENT.get("questions", []):
@@ -0,0 +1,654 @@
+"""Cross-worker PDF render queue backed by SQLite.
+
+High-level responsibilities
+--------------------------
+- Persist PDF export jobs (payload, status, output path, timings) in one
+  SQLite file so any gunicorn worker can answer status and download polls.
+- Admit jobs with a priority and a maximum queue depth; `QueueFull` lets the
+  route answer 429 instead of piling up work.
+- Run one render pool per host: every web worker runs a dispatcher thread,
+  but only the holder of the `pdf-render` lease claims jobs and feeds them to
+  its `ProcessPoolExecutor`.
+
+Notes
+-----
+- Jobs are claimed atomically (`UPDATE ... RETURNING`), highest priority
+  first, then oldest.
+- A worker that takes over the lease requeues jobs the previous holder left
+  in `running`; re-rendering a PDF is harmless.
+- The render function runs in a child process, so it must be a top-level
+  callable taking the payload fields plus `out_path`.
+- `scripts/pdf_worker.py` runs the same dispatcher outside the web process
+  (PDF_RENDER_MODE=external).
+- Rendered PDFs are cached on disk by a hash of the payload and the render
+  version (`pdf_artifacts`, LRU-bounded by total bytes). A repeat export is
+  answered from the cache as an already-done job; one identical to a queued
+  or running job gets that job back (single-flight). Hit/miss/coalesce
+  counters live in SQLite so they cover every worker.
+- If a render child dies, the pool is broken for good: jobs already in it
+  fail, and the dispatcher requeues the job it was submitting and starts a
+  new pool.
+- Renders write to a `.part` file that is renamed into place on success, so
+  a cached artifact is never half-written.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from modules.result_cache import make_key
+
+
+log = logging.getLogger(__name__)
+
+PRIORITIES = {"low": 0, "normal": 5, "high": 9}
+
+_LEASE_NAME = "pdf-render"
+
+
+class QueueFull(Exception):
+    """Raised by `submit` when the queue already holds `max_depth` jobs."""
+
+    def __init__(self, depth: int, max_depth: int) -> None:
+        super().__init__(f"PDF queue is full ({depth}/{max_depth})")
+        self.depth = depth
+        self.max_depth = max_depth
+
+
+@dataclass
+class PdfJob:
+    id: str
+    status: str  # queued | running | done | error
+    priority: int
+    path: str
+    error: Optional[str]
+    enqueued_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+    cache: Optional[str] = None  # hit | miss | coalesced; None when caching is off
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "error")
+
+    def timing(self) -> dict[str, Optional[float]]:
+        """Queue wait, render and total time in milliseconds (None until known)."""
+
+        def _ms(start: Optional[float], end: Optional[float]) -> Optional[float]:
+            if start is None or end is None:
+                return None
+            return round((end - start) * 1000.0, 1)
+
+        return {
+            "queue_wait_ms": _ms(self.enqueued_at, self.started_at),
+            "render_ms": _ms(self.started_at, self.finished_at),
+            "total_ms": _ms(self.enqueued_at, self.finished_at),
+        }
+
+
+_JOB_COLUMNS = "id, status, priority, path, error, enqueued_at, started_at, finished_at, cache"
+
+
+def _job_from_row(row: Any) -> PdfJob:
+    return PdfJob(*row)
+
+
+def _part_path(job: PdfJob) -> str:
+    """Where a render writes before it is renamed to `job.path`."""
+    return f"{job.path}.{job.id}.part"
+
+
+class PdfJobQueue:
+    """SQLite job table plus a lease-guarded dispatcher feeding a process pool."""
+
+    def __init__(
+        self,
+        *,
+        db_path: str,
+        output_dir: str,
+        render_fn: Callable[..., Any],
+        max_workers: int = 2,
+        max_depth: int = 50,
+        lease_ttl_seconds: float = 15.0,
+        poll_interval: float = 0.25,
+        cache_max_bytes: int = 0,
+        render_version: str = "",
+    ) -> None:
+        self.db_path = db_path
+        self.output_dir = output_dir
+        self.render_fn = render_fn
+        self.max_workers = max(1, int(max_workers))
+        self.max_depth = max(0, int(max_depth))
+        self.lease_ttl_seconds = float(lease_ttl_seconds)
+        self.poll_interval = float(poll_interval)
+        self.cache_max_bytes = max(0, int(cache_max_bytes))
+        self.render_version = render_version
+        self.worker_id = f"{os.getpid()}-{secrets.token_hex(4)}"
+
+        self._ready = False
+        self._ready_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight: dict[str, tuple[Future, PdfJob, Optional[str]]] = {}
+        self._is_leader = False
+        self._lease_checked_at = 0.0
+        self._counters = {"submitted": 0, "rejected": 0, "rendered": 0, "failed": 0, "requeued": 0,
+                          "pool_restarts": 0}
+
+    # ---- storage ----
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=10000;")
+        return conn
+
+    def _ensure(self) -> None:
+        if self._ready:
+            return
+        with self._ready_lock:
+            if self._ready:
+                return
+            parent = os.path.dirname(self.db_path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            os.makedirs(self.output_dir, exist_ok=True)
+            conn = self._connect()
+            try:
+                conn.execute("PRAGMA journal_mode=WAL;")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS pdf_jobs (
+                        id TEXT PRIMARY KEY,
+                        status TEXT NOT NULL,
+                        priority INTEGER NOT NULL,
+                        payload TEXT NOT NULL,
+                        path TEXT NOT NULL,
+                        error TEXT,
+                        worker TEXT,
+                        enqueued_at REAL NOT NULL,
+                        started_at REAL,
+                        finished_at REAL
+                    )
+                    """
+                )
+                cols = {r[1] for r in conn.execute("PRAGMA table_info(pdf_jobs)").fetchall()}
+                for col in ("cache_key", "cache"):
+                    if col not in cols:
+                        conn.execute(f"ALTER TABLE pdf_jobs ADD COLUMN {col} TEXT")
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_pdf_jobs_queue ON pdf_jobs(status, priority DESC, enqueued_at)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_pdf_jobs_cache_key ON pdf_jobs(cache_key, status)")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS pdf_artifacts (
+                        key TEXT PRIMARY KEY,
+                        path TEXT NOT NULL,
+                        bytes INTEGER NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_access REAL NOT NULL,
+                        hits INTEGER NOT NULL DEFAULT 0
+                    )
+                    """
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_pdf_artifacts_access ON pdf_artifacts(last_access)")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS pdf_cache_counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+                )
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS pdf_leases (
+                        name TEXT PRIMARY KEY,
+                        holder TEXT NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                    """
+                )
+            finally:
+                conn.close()
+            self._ready = True
+
+    # ---- producer / poller API (any worker) ----
+
+    @property
+    def cache_enabled(self) -> bool:
+        return self.cache_max_bytes > 0
+
+    def cache_key(self, payload: dict[str, Any]) -> str:
+        """Content hash of a render request (payload plus render version)."""
+        return make_key("pdf", {"payload": payload, "render_version": self.render_version}).split(":", 1)[1]
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, name: str, by: int = 1) -> None:
+        conn.execute(
+            "INSERT INTO pdf_cache_counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, by),
+        )
+
+    def _submit_cached(self, conn: sqlite3.Connection, key: str, priority: int, now: float) -> Optional[PdfJob]:
+        """Answer from the artifact cache or an identical in-flight job; None on a miss."""
+        row = conn.execute("SELECT path FROM pdf_artifacts WHERE key = ?", (key,)).fetchone()
+        if row and os.path.exists(row[0]):
+            conn.execute("UPDATE pdf_artifacts SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            try:
+                # The artifact sweeper ages files by atime/mtime; a hit must
+                # count as use or the PDF can expire before it is downloaded.
+                os.utime(row[0], (now, os.stat(row[0]).st_mtime))
+            except OSError:
+                pass
+            job = PdfJob(str(uuid.uuid4()), "done", priority, row[0], None, now, now, now, "hit")
+            conn.execute(
+                "INSERT INTO pdf_jobs (id, status, priority, payload, path, enqueued_at, started_at, finished_at, "
+                "cache_key, cache) VALUES (?, 'done', ?, '{}', ?, ?, ?, ?, ?, 'hit')",
+                (job.id, priority, job.path, now, now, now, key),
+            )
+            self._bump(conn, "hits")
+            return job
+        if row:
+            # File vanished underneath us (manual cleanup): forget it and render again.
+            conn.execute("DELETE FROM pdf_artifacts WHERE key = ?", (key,))
+
+        row = conn.execute(
+            f"SELECT {_JOB_COLUMNS} FROM pdf_jobs WHERE cache_key = ? AND status IN ('queued', 'running') "
+            "ORDER BY enqueued_at LIMIT 1",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        job = _job_from_row(row)
+        if priority > job.priority:
+            conn.execute("UPDATE pdf_jobs SET priority = ? WHERE id = ?", (priority, job.id))
+            job.priority = priority
+        self._bump(conn, "coalesced")
+        return job
+
+    def submit(self, payload: dict[str, Any], *, priority: int = PRIORITIES["normal"]) -> PdfJob:
+        """Queue a render; raises `QueueFull` when `max_depth` jobs are waiting.
+
+        With the cache on, the returned job may already be done (cache hit) or
+        be an earlier identical job that is still queued or running.
+        """
+        self._ensure()
+        priority = int(priority)
+        key = self.cache_key(payload) if self.cache_enabled else None
+        job_id = str(uuid.uuid4())
+        if key:
+            path = os.path.join(self.output_dir, f"pdf_{key}.pdf")
+        else:
+            path = os.path.join(self.output_dir, f"battery_pdf_{job_id}.pdf")
+        now = time.time()
+        conn = self._connect()
+        try:
+            # IMMEDIATE so the cache lookup, depth check and insert see the same queue.
+            conn.execute("BEGIN IMMEDIATE")
+            if key:
+                cached = self._submit_cached(conn, key, priority, now)
+                if cached is not None:
+                    conn.execute("COMMIT")
+                    return cached
+            depth = conn.execute("SELECT COUNT(*) FROM pdf_jobs WHERE status = 'queued'").fetchone()[0]
+            if depth >= self.max_depth:
+                conn.execute("ROLLBACK")
+                self._counters["rejected"] += 1
+                raise QueueFull(depth, self.max_depth)
+            conn.execute(
+                "INSERT INTO pdf_jobs (id, status, priority, payload, path, enqueued_at, cache_key, cache) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?, ?)",
+                (job_id, priority, json.dumps(payload, ensure_ascii=False), path, now, key, "miss" if key else None),
+            )
+            if key:
+                self._bump(conn, "misses")
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        self._counters["submitted"] += 1
+        self._wake.set()
+        return PdfJob(job_id, "queued", priority, path, None, now, None, None, "miss" if key else None)
+
+    def get(self, job_id: str) -> Optional[PdfJob]:
+        self._ensure()
+        conn = self._connect()
+        try:
+            row = conn.execute(f"SELECT {_JOB_COLUMNS} FROM pdf_jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return _job_from_row(row) if row else None
+
+    def position(self, job: PdfJob) -> int:
+        """1-based place in the queue for a queued job (0 once it has started)."""
+        if job.status != "queued":
+            return 0
+        conn = self._connect()
+        try:
+            ahead = conn.execute(
+                """
+                SELECT COUNT(*) FROM pdf_jobs
+                WHERE status = 'queued'
+                  AND (priority > ? OR (priority = ? AND enqueued_at < ?))
+                """,
+                (job.priority, job.priority, job.enqueued_at),
+            ).fetchone()[0]
+        finally:
+            conn.close()
+        return int(ahead) + 1
+
+    def depth(self) -> int:
+        self._ensure()
+        conn = self._connect()
+        try:
+            return int(conn.execute("SELECT COUNT(*) FROM pdf_jobs WHERE status = 'queued'").fetchone()[0])
+        finally:
+            conn.close()
+
+    def purge_finished(self, max_age_seconds: float) -> int:
+        """Delete finished jobs older than `max_age_seconds`.
+
+        Files of uncached jobs go with them; cached artifacts are shared by
+        every job with the same key and are only removed by LRU eviction.
+        """
+        self._ensure()
+        cutoff = time.time() - max_age_seconds
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT id, path, cache_key FROM pdf_jobs WHERE status IN ('done', 'error') AND finished_at < ?",
+                (cutoff,),
+            ).fetchall()
+            for job_id, path, key in rows:
+                if key is None:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    except OSError:
+                        log.warning("Could not remove PDF %s", path)
+                        continue
+                conn.execute("DELETE FROM pdf_jobs WHERE id = ?", (job_id,))
+        finally:
+            conn.close()
+        return len(rows)
+
+    # ---- dispatcher side ----
+
+    def _acquire_lease(self) -> bool:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR IGNORE INTO pdf_leases (name, holder, expires_at) VALUES (?, ?, 0)",
+                (_LEASE_NAME, self.worker_id),
+            )
+            cur = conn.execute(
+                "UPDATE pdf_leases SET holder = ?, expires_at = ? WHERE name = ? AND (holder = ? OR expires_at < ?)",
+                (self.worker_id, now + self.lease_ttl_seconds, _LEASE_NAME, self.worker_id, now),
+            )
+            return cur.rowcount == 1
+        finally:
+            conn.close()
+
+    def _release_lease(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE pdf_leases SET expires_at = 0 WHERE name = ? AND holder = ?", (_LEASE_NAME, self.worker_id)
+            )
+        finally:
+            conn.close()
+
+    def requeue_orphans(self) -> int:
+        """Put jobs another dispatcher left in `running` back in the queue."""
+        conn = self._connect()
+        try:
+            cur = conn.execute(
+                "UPDATE pdf_jobs SET status = 'queued', started_at = NULL, worker = NULL "
+                "WHERE status = 'running' AND (worker IS NULL OR worker != ?)",
+                (self.worker_id,),
+            )
+            count = cur.rowcount
+        finally:
+            conn.close()
+        self._counters["requeued"] += count
+        return count
+
+    def _requeue(self, job_id: str) -> None:
+        """Return a job this worker claimed but could not start to the queue."""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE pdf_jobs SET status = 'queued', started_at = NULL, worker = NULL "
+                "WHERE id = ? AND status = 'running'",
+                (job_id,),
+            )
+        finally:
+            conn.close()
+        self._counters["requeued"] += 1
+
+    def claim(self) -> Optional[tuple[PdfJob, dict[str, Any]]]:
+        """Mark the next queued job running for this worker; None if the queue is empty."""
+        self._ensure()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                f"""
+                UPDATE pdf_jobs SET status = 'running', started_at = ?, worker = ?
+                WHERE id = (
+                    SELECT id FROM pdf_jobs WHERE status = 'queued'
+                    ORDER BY priority DESC, enqueued_at LIMIT 1
+                )
+                RETURNING {_JOB_COLUMNS}, payload, cache_key
+                """,
+                (time.time(), self.worker_id),
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return _job_from_row(row[:-2]), json.loads(row[-2]), row[-1]
+
+    def complete(self, job_id: str, error: Optional[str] = None, *, cache_key: Optional[str] = None,
+                 path: Optional[str] = None) -> None:
+        """Record a finished render; successful cached renders join the artifact LRU."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "UPDATE pdf_jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                ("error" if error else "done", error, now, job_id),
+            )
+            if cache_key and path and not error:
+                conn.execute(
+                    """
+                    INSERT INTO pdf_artifacts (key, path, bytes, created_at, last_access) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET path = excluded.path, bytes = excluded.bytes,
+                        last_access = excluded.last_access
+                    """,
+                    (cache_key, path, os.path.getsize(path), now, now),
+                )
+                self._evict(conn, keep=cache_key)
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        self._counters["failed" if error else "rendered"] += 1
+
+    def _evict(self, conn: sqlite3.Connection, *, keep: str) -> None:
+        """Drop least-recently-used artifacts until the cache fits `cache_max_bytes`."""
+        total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM pdf_artifacts").fetchone()[0]
+        if total <= self.cache_max_bytes:
+            return
+        for key, path, size in conn.execute(
+            "SELECT key, path, bytes FROM pdf_artifacts WHERE key != ? ORDER BY last_access", (keep,)
+        ).fetchall():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                log.warning("Could not evict cached PDF %s", path)
+                continue
+            conn.execute("DELETE FROM pdf_artifacts WHERE key = ?", (key,))
+            self._bump(conn, "evictions")
+            total -= size
+            if total <= self.cache_max_bytes:
+                break
+
+    def forget_artifact(self, path: str) -> None:
+        """Drop the cache entry for a file someone else deleted (artifact sweeper)."""
+        self._ensure()
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM pdf_artifacts WHERE path = ?", (path,))
+        finally:
+            conn.close()
+
+    def _on_done(self, job_id: str, future: Future) -> None:
+        _, job, cache_key = self._inflight.pop(job_id)
+        exc = future.exception()
+        error = str(exc) if exc else None
+        part = _part_path(job)
+        try:
+            if error is None:
+                os.replace(part, job.path)
+            self.complete(job_id, error=error, cache_key=cache_key, path=job.path)
+        except (OSError, sqlite3.Error):
+            log.exception("Could not record PDF job %s", job_id)
+        self._wake.set()
+
+    def dispatch_once(self) -> int:
+        """Lease check plus as many claims as there are free pool slots."""
+        now = time.monotonic()
+        if now - self._lease_checked_at >= self.lease_ttl_seconds / 3 or not self._is_leader:
+            was_leader = self._is_leader
+            self._is_leader = self._acquire_lease()
+            self._lease_checked_at = now
+            if self._is_leader and not was_leader:
+                self.requeue_orphans()
+        if not self._is_leader:
+            return 0
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        started = 0
+        while len(self._inflight) < self.max_workers:
+            claimed = self.claim()
+            if claimed is None:
+                break
+            job, payload, cache_key = claimed
+            try:
+                future = self._executor.submit(self.render_fn, **payload, out_path=_part_path(job))
+            except BrokenProcessPool:
+                # A render child died (e.g. OOM-killed) and took the pool with
+                # it; put the job back and start a fresh pool next pass.
+                log.warning("PDF render pool is broken; restarting it")
+                self._requeue(job.id)
+                self._executor.shutdown(wait=False)
+                self._executor = None
+                self._counters["pool_restarts"] += 1
+                self._wake.set()
+                break
+            self._inflight[job.id] = (future, job, cache_key)
+            future.add_done_callback(lambda f, job_id=job.id: self._on_done(job_id, f))
+            started += 1
+        return started
+
+    def start(self) -> threading.Thread:
+        """Start (once) the dispatcher thread for this process."""
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._ensure()
+        self._stop.clear()
+
+        def _loop() -> None:
+            while not self._stop.is_set():
+                try:
+                    self.dispatch_once()
+                except Exception:
+                    log.exception("PDF dispatcher iteration failed")
+                # Non-leaders only need to notice when the lease frees up.
+                wait = self.poll_interval if self._is_leader else self.lease_ttl_seconds / 3
+                self._wake.wait(wait)
+                self._wake.clear()
+
+        self._thread = threading.Thread(target=_loop, name="pdf-dispatcher", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._is_leader:
+            self._release_lease()
+            self._is_leader = False
+
+    def stats(self) -> dict[str, Any]:
+        self._ensure()
+        conn = self._connect()
+        try:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM pdf_jobs GROUP BY status").fetchall())
+            timing = conn.execute(
+                """
+                SELECT AVG(started_at - enqueued_at), AVG(finished_at - started_at), MAX(finished_at - started_at)
+                FROM pdf_jobs WHERE status = 'done' AND finished_at >= ?
+                """,
+                (time.time() - 3600,),
+            ).fetchone()
+            cache_entries, cache_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM pdf_artifacts"
+            ).fetchone()
+            cache_counters = dict(conn.execute("SELECT name, value FROM pdf_cache_counters").fetchall())
+        finally:
+            conn.close()
+
+        hits = cache_counters.get("hits", 0)
+        coalesced = cache_counters.get("coalesced", 0)
+        lookups = hits + coalesced + cache_counters.get("misses", 0)
+
+        def _ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value * 1000.0, 1)
+
+        return {
+            "leader": self._is_leader,
+            "worker_id": self.worker_id,
+            "inflight": len(self._inflight),
+            "max_workers": self.max_workers,
+            "max_depth": self.max_depth,
+            "jobs": {status: counts.get(status, 0) for status in ("queued", "running", "done", "error")},
+            "last_hour": {
+                "avg_queue_wait_ms": _ms(timing[0]),
+                "avg_render_ms": _ms(timing[1]),
+                "max_render_ms": _ms(timing[2]),
+            },
+            "cache": {
+                "enabled": self.cache_enabled,
+                "entries": cache_entries,
+                "bytes": cache_bytes,
+                "max_bytes": self.cache_max_bytes,
+                "hits": hits,
+                "misses": cache_counters.get("misses", 0),
+                "coalesced": coalesced,
+                "evictions": cache_counters.get("evictions", 0),
+                # Share of exports that did not need a render of their own.
+                "hit_rate": round((hits + coalesced) / lookups, 4) if lookups else None,
+            },
+            **self._counters,
+        }
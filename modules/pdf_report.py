@@ -0,0 +1,138 @@
+"""Calculator result PDF rendering.
+
+High-level responsibilities
+--------------------------
+- Turn the calculator's result text into a formatted ReportLab PDF on disk.
+
+Notes
+-----
+- `build_pdf_to_file` runs inside the PDF render pool's child processes, so it
+  stays a self-contained top-level function (imports happen inside it).
+- `RENDER_VERSION` hashes this file, so editing the layout invalidates every
+  cached PDF without a manual flush.
+"""
+
+import hashlib
+import os
+
+with open(__file__, "rb") as _src:
+    RENDER_VERSION = hashlib.sha256(_src.read()).hexdigest()[:16]
+
+
+def build_pdf_to_file(result_text, title, chemistry, dod, out_path):
+    """Builds the PDF using ReportLab and writes it to out_path (path string).
+    This function is executed in a separate process so it must be self-contained.
+    """
+    try:
+        # Strip HTML tags and convert <br> to newlines
+        plain_text = result_text.replace('<br>', '\n')
+        import re
+        plain_text = re.sub('<[^<]+?>', '', plain_text)
+
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.units import inch
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+        from reportlab.lib import colors
+        from datetime import datetime
+
+        doc = SimpleDocTemplate(
+            out_path,
+            pagesize=letter,
+            rightMargin=0.75*inch,
+            leftMargin=0.75*inch,
+            topMargin=1*inch,
+            bottomMargin=0.75*inch
+        )
+
+        story = []
+        styles = getSampleStyleSheet()
+        title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#667eea'),
+            spaceAfter=6,
+            alignment=1
+        )
+        heading_style = ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=14,
+            textColor=colors.HexColor('#667eea'),
+            spaceAfter=12,
+            spaceBefore=6
+        )
+        normal_style = ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=11,
+            textColor=colors.HexColor('#333333'),
+            spaceAfter=6
+        )
+        cell_style = ParagraphStyle(
+            'CellText',
+            parent=styles['Normal'],
+            fontSize=10,
+            textColor=colors.HexColor('#333333')
+        )
+
+        story.append(Paragraph("Battery Design Report", title_style))
+        story.append(Spacer(1, 0.3*inch))
+
+        metadata = f"<b>Generated:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}<br/>"
+        metadata += f"<b>Report Type:</b> {title}<br/>"
+        metadata += f"<b>Chemistry:</b> {chemistry}<br/>"
+        metadata += f"<b>DOD:</b> {dod}%"
+        story.append(Paragraph(metadata, normal_style))
+        story.append(Spacer(1, 0.2*inch))
+
+        story.append(Paragraph("_" * 80, normal_style))
+        story.append(Spacer(1, 0.1*inch))
+
+        story.append(Paragraph("Configuration Details", heading_style))
+
+        lines = [line.strip() for line in plain_text.split('\n') if line.strip() and ':' in line]
+        table_data = [["Parameter", "Value"]]
+        for line in lines:
+            if ':' in line:
+                parts = line.split(':', 1)
+                param = parts[0].strip()
+                value = parts[1].strip()
+                table_data.append([
+                    Paragraph(param, cell_style),
+                    Paragraph(value, cell_style)
+                ])
+
+        if len(table_data) > 1:
+            table = Table(table_data, colWidths=[2.2*inch, 4.3*inch])
+            table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#667eea')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 12),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f9f9f9')),
+                ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#ddd')),
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')]),
+                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 1), (-1, -1), 10),
+                ('TOPPADDING', (0, 1), (-1, -1), 8),
+                ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+                ('LEFTPADDING', (0, 1), (-1, -1), 6),
+                ('RIGHTPADDING', (0, 1), (-1, -1), 6),
+            ]))
+            story.append(table)
+
+        doc.build(story)
+        return out_path
+    except Exception:
+        # ensure any partial file is removed on error
+        try:
+            if os.path.exists(out_path):
+                os.remove(out_path)
+        except Exception:
+            pass
+        raise
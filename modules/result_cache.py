@@ -0,0 +1,250 @@
+"""Bounded, TTL-aware memoisation for calculator results.
+
+High-level responsibilities
+--------------------------
+- Build stable cache keys from already-normalised calculator inputs.
+- Keep a per-process LRU of recent results with a time-to-live.
+- Optionally share results across gunicorn workers through a small SQLite
+  table (the "shared tier").
+- Count hits / misses / evictions so the admin side can see whether the cache
+  is pulling its weight.
+
+Notes
+-----
+- Values must be JSON-serialisable; the shared tier stores them as JSON text.
+- The shared tier is best-effort: any SQLite error is counted and the cache
+  carries on with the in-process tier only.
+- Expiry uses wall-clock time so entries written by one worker expire at the
+  same moment for every other worker.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+def make_key(namespace: str, params: dict[str, Any]) -> str:
+    """Return a content-addressed key for `params` under `namespace`."""
+    payload = json.dumps(params, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return f"{namespace}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class ResultCache:
+    """In-process LRU with TTL and an optional SQLite tier shared by workers."""
+
+    # Prune the shared table every N writes rather than on every insert.
+    _SHARED_PRUNE_EVERY = 50
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 256,
+        ttl_seconds: float = 600.0,
+        sqlite_path: Optional[str] = None,
+        sqlite_max_entries: int = 5000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.sqlite_path = sqlite_path or None
+        self.sqlite_max_entries = max(1, int(sqlite_max_entries))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._writes_since_prune = 0
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "shared_hits": 0,
+            "shared_evictions": 0,
+            "shared_errors": 0,
+        }
+        if self.sqlite_path:
+            self._init_shared()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    # ---- shared (SQLite) tier ----
+
+    def _shared_connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.sqlite_path, timeout=5)
+        conn.execute("PRAGMA busy_timeout=5000;")
+        return conn
+
+    def _init_shared(self) -> None:
+        try:
+            parent = os.path.dirname(self.sqlite_path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            conn = self._shared_connect()
+            try:
+                conn.execute("PRAGMA journal_mode=WAL;")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS result_cache (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        expires_at REAL NOT NULL,
+                        last_access REAL NOT NULL
+                    )
+                    """
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_result_cache_access ON result_cache(last_access)")
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            self._counters["shared_errors"] += 1
+            self.sqlite_path = None
+
+    def _shared_get(self, key: str, now: float) -> tuple[bool, Any, float]:
+        conn = self._shared_connect()
+        try:
+            row = conn.execute(
+                "SELECT value, expires_at FROM result_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if not row or float(row[1]) <= now:
+                return False, None, 0.0
+            conn.execute("UPDATE result_cache SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return True, json.loads(row[0]), float(row[1])
+        finally:
+            conn.close()
+
+    def _shared_set(self, key: str, value: Any, expires_at: float, now: float, prune: bool) -> int:
+        conn = self._shared_connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO result_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, separators=(",", ":"), ensure_ascii=False), expires_at, now),
+            )
+            removed = 0
+            if prune:
+                removed += conn.execute("DELETE FROM result_cache WHERE expires_at <= ?", (now,)).rowcount
+                removed += conn.execute(
+                    """
+                    DELETE FROM result_cache WHERE key IN (
+                        SELECT key FROM result_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.sqlite_max_entries,),
+                ).rowcount
+            conn.commit()
+            return max(0, removed)
+        finally:
+            conn.close()
+
+    # ---- public API ----
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for `key`, or None on a miss."""
+        if not self.enabled:
+            return None
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                self._counters["expirations"] += 1
+
+        if self.sqlite_path:
+            try:
+                found, value, expires_at = self._shared_get(key, now)
+            except (sqlite3.Error, ValueError):
+                found = False
+                with self._lock:
+                    self._counters["shared_errors"] += 1
+            if found:
+                with self._lock:
+                    self._store_local(key, value, expires_at)
+                    self._counters["hits"] += 1
+                    self._counters["shared_hits"] += 1
+                return value
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store `value` under `key` in every enabled tier."""
+        if not self.enabled:
+            return
+        now = self._clock()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._store_local(key, value, expires_at)
+            self._writes_since_prune += 1
+            prune = self._writes_since_prune >= self._SHARED_PRUNE_EVERY
+            if prune:
+                self._writes_since_prune = 0
+
+        if self.sqlite_path:
+            try:
+                removed = self._shared_set(key, value, expires_at, now, prune)
+            except (sqlite3.Error, TypeError, ValueError):
+                with self._lock:
+                    self._counters["shared_errors"] += 1
+                return
+            if removed:
+                with self._lock:
+                    self._counters["shared_evictions"] += removed
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for `key`, computing and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def _store_local(self, key: str, value: Any, expires_at: float) -> None:
+        # Caller holds self._lock.
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop every local entry (and the shared table, if configured)."""
+        with self._lock:
+            self._entries.clear()
+        if self.sqlite_path:
+            try:
+                conn = self._shared_connect()
+                try:
+                    conn.execute("DELETE FROM result_cache")
+                    conn.commit()
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                with self._lock:
+                    self._counters["shared_errors"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Return counters and sizing info for admin dashboards."""
+        with self._lock:
+            out: dict[str, Any] = dict(self._counters)
+            out["size"] = len(self._entries)
+        lookups = out["hits"] + out["misses"]
+        out["hit_rate"] = round(out["hits"] / lookups, 4) if lookups else 0.0
+        out["max_entries"] = self.max_entries
+        out["ttl_seconds"] = self.ttl_seconds
+        out["shared"] = bool(self.sqlite_path)
+        out["enabled"] = self.enabled
+        return out
@@ -0,0 +1,284 @@
+"""Server-side simulation sessions for the interactive pack simulator.
+
+High-level responsibilities
+--------------------------
+- Map a session id to a live `ArrayPackSimulator` so a learner can keep
+  discharging the same pack across requests.
+- Bound memory per worker: sessions are evicted least-recently-used once the
+  session count or the summed size of their state arrays exceeds the caps,
+  and idle sessions expire after a TTL.
+- Optionally persist a compressed snapshot of every session to SQLite so a
+  session survives a worker restart (or lands on a different worker).
+
+Notes
+-----
+- Sessions are owned by a user id; other users get "not found".
+- Callers mutate a session inside `checkout`, which holds a per-session lock
+  and re-measures / re-snapshots the session on exit.
+- Snapshot I/O is best-effort: SQLite errors are counted and the in-process
+  tier keeps working.
+"""
+
+from __future__ import annotations
+
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+
+from modules.interactive_tools import ArrayPackSimulator
+
+
+@dataclass
+class _Session:
+    user_id: int
+    simulator: ArrayPackSimulator
+    last_used: float
+    nbytes: int
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class SimulationSessionStore:
+    """Bounded LRU of live simulators with idle TTL and optional SQLite snapshots."""
+
+    def __init__(
+        self,
+        *,
+        max_sessions: int = 64,
+        max_bytes: int = 64 * 1024 * 1024,
+        idle_ttl_seconds: float = 1800.0,
+        sqlite_path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_sessions = max(1, int(max_sessions))
+        self.max_bytes = max(1, int(max_bytes))
+        self.idle_ttl_seconds = float(idle_ttl_seconds)
+        self.sqlite_path = sqlite_path or None
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sessions: OrderedDict[str, _Session] = OrderedDict()
+        self._bytes = 0
+        self._counters = {
+            "created": 0,
+            "hits": 0,
+            "misses": 0,
+            "restored": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "rejected": 0,
+            "snapshot_errors": 0,
+        }
+        if self.sqlite_path:
+            self._init_snapshots()
+
+    # ---- snapshot (SQLite) tier ----
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.sqlite_path, timeout=5)
+        conn.execute("PRAGMA busy_timeout=5000;")
+        return conn
+
+    def _init_snapshots(self) -> None:
+        try:
+            parent = os.path.dirname(self.sqlite_path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            conn = self._connect()
+            try:
+                conn.execute("PRAGMA journal_mode=WAL;")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS sim_sessions (
+                        session_id TEXT PRIMARY KEY,
+                        user_id INTEGER NOT NULL,
+                        snapshot BLOB NOT NULL,
+                        updated_at REAL NOT NULL
+                    )
+                    """
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_sim_sessions_updated ON sim_sessions(updated_at)")
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            self._counters["snapshot_errors"] += 1
+            self.sqlite_path = None
+
+    def _snapshot_write(self, session_id: str, sess: _Session) -> None:
+        if not self.sqlite_path:
+            return
+        try:
+            blob = sess.simulator.to_snapshot()
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sim_sessions (session_id, user_id, snapshot, updated_at) VALUES (?, ?, ?, ?)",
+                    (session_id, sess.user_id, sqlite3.Binary(blob), sess.last_used),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            with self._lock:
+                self._counters["snapshot_errors"] += 1
+
+    def _snapshot_read(self, session_id: str, now: float) -> Optional[_Session]:
+        if not self.sqlite_path:
+            return None
+        try:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM sim_sessions WHERE updated_at <= ?", (now - self.idle_ttl_seconds,))
+                conn.commit()
+                row = conn.execute(
+                    "SELECT user_id, snapshot FROM sim_sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+            finally:
+                conn.close()
+            if not row:
+                return None
+            sim = ArrayPackSimulator.from_snapshot(bytes(row[1]))
+        except (sqlite3.Error, ValueError, KeyError, OSError):
+            with self._lock:
+                self._counters["snapshot_errors"] += 1
+            return None
+        return _Session(user_id=int(row[0]), simulator=sim, last_used=now, nbytes=sim.nbytes)
+
+    def _snapshot_delete(self, session_id: str) -> None:
+        if not self.sqlite_path:
+            return
+        try:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM sim_sessions WHERE session_id = ?", (session_id,))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            with self._lock:
+                self._counters["snapshot_errors"] += 1
+
+    # ---- in-process tier ----
+
+    def _expire_idle(self, now: float) -> None:
+        # Caller holds self._lock. Oldest entries sit at the front.
+        while self._sessions:
+            sid, sess = next(iter(self._sessions.items()))
+            if now - sess.last_used < self.idle_ttl_seconds:
+                break
+            self._drop(sid)
+            self._counters["expirations"] += 1
+
+    def _drop(self, session_id: str) -> None:
+        # Caller holds self._lock.
+        sess = self._sessions.pop(session_id, None)
+        if sess is not None:
+            self._bytes -= sess.nbytes
+
+    def _admit(self, session_id: str, sess: _Session) -> None:
+        # Caller holds self._lock. Evicts LRU sessions until the new one fits.
+        self._sessions[session_id] = sess
+        self._sessions.move_to_end(session_id)
+        self._bytes += sess.nbytes
+        self._enforce_caps(keep=session_id)
+
+    def _enforce_caps(self, keep: str) -> None:
+        # Caller holds self._lock.
+        while len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes:
+            sid = next(iter(self._sessions))
+            if sid == keep:
+                break
+            self._drop(sid)
+            self._counters["evictions"] += 1
+
+    # ---- public API ----
+
+    def create(self, user_id: int, simulator: ArrayPackSimulator) -> str:
+        """Register `simulator` for `user_id` and return its new session id.
+
+        Raises ValueError if the simulator alone exceeds the memory cap.
+        """
+        nbytes = simulator.nbytes
+        if nbytes > self.max_bytes:
+            with self._lock:
+                self._counters["rejected"] += 1
+            raise ValueError("Pack is too large for a simulation session")
+        session_id = secrets.token_urlsafe(16)
+        now = self._clock()
+        sess = _Session(user_id=int(user_id), simulator=simulator, last_used=now, nbytes=nbytes)
+        with self._lock:
+            self._expire_idle(now)
+            self._admit(session_id, sess)
+            self._counters["created"] += 1
+        self._snapshot_write(session_id, sess)
+        return session_id
+
+    @contextmanager
+    def checkout(self, session_id: str, user_id: int) -> Iterator[Optional[ArrayPackSimulator]]:
+        """Yield the session's simulator (None if unknown/expired/not owned).
+
+        The simulator may be mutated inside the block; its size and snapshot are
+        refreshed on exit.
+        """
+        now = self._clock()
+        with self._lock:
+            self._expire_idle(now)
+            sess = self._sessions.get(session_id)
+            if sess is not None:
+                self._sessions.move_to_end(session_id)
+                self._counters["hits"] += 1
+        if sess is None:
+            sess = self._snapshot_read(session_id, now)
+            with self._lock:
+                if sess is None:
+                    self._counters["misses"] += 1
+                elif session_id in self._sessions:
+                    # Another request restored it first; use that copy.
+                    sess = self._sessions[session_id]
+                    self._counters["hits"] += 1
+                else:
+                    self._admit(session_id, sess)
+                    self._counters["restored"] += 1
+        if sess is None or sess.user_id != int(user_id):
+            yield None
+            return
+
+        with sess.lock:
+            try:
+                yield sess.simulator
+            finally:
+                sess.last_used = self._clock()
+                with self._lock:
+                    if self._sessions.get(session_id) is sess:
+                        self._bytes += sess.simulator.nbytes - sess.nbytes
+                        sess.nbytes = sess.simulator.nbytes
+                        self._enforce_caps(keep=session_id)
+                self._snapshot_write(session_id, sess)
+
+    def delete(self, session_id: str, user_id: int) -> bool:
+        """Drop a session owned by `user_id`; returns False if it was not found."""
+        with self.checkout(session_id, user_id) as sim:
+            if sim is None:
+                return False
+        with self._lock:
+            self._drop(session_id)
+        self._snapshot_delete(session_id)
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        """Return counters and memory usage for admin dashboards."""
+        with self._lock:
+            self._expire_idle(self._clock())
+            out: dict[str, Any] = dict(self._counters)
+            out["sessions"] = len(self._sessions)
+            out["bytes"] = self._bytes
+        out["max_sessions"] = self.max_sessions
+        out["max_bytes"] = self.max_bytes
+        out["idle_ttl_seconds"] = self.idle_ttl_seconds
+        out["snapshots"] = bool(self.sqlite_path)
+        return out
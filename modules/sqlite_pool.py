@@ -0,0 +1,175 @@
+"""Per-thread reusable SQLite connections.
+
+High-level responsibilities
+--------------------------
+- Give each thread one long-lived connection per database file, with the
+  row factory and PRAGMAs applied once when it is opened.
+- Health-check connections that have sat idle, and recycle a connection after
+  a fixed number of uses or whenever a block using it raises a SQLite error.
+- Count opens / reuses / recycles and time spent acquiring a connection so the
+  admin side can see what the pool is doing.
+
+Notes
+-----
+- `connection()` behaves like ``with sqlite3.connect(...) as conn``: the
+  transaction is committed on success and rolled back on error. Unlike the
+  bare sqlite3 context manager, the connection is kept for reuse instead of
+  being left for the garbage collector.
+- Nested `connection()` blocks on the same thread share one connection; only
+  the outermost block decides whether it is recycled.
+- Connections never cross threads, so `check_same_thread` stays on.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+
+class _PooledConnection:
+    __slots__ = ("conn", "path", "uses", "last_used", "depth", "broken", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection, path: str, now: float) -> None:
+        self.conn = conn
+        self.path = path
+        self.uses = 0
+        self.last_used = now
+        self.depth = 0
+        self.broken = False
+
+
+class SQLitePool:
+    """Thread-local connection pool for one SQLite database at a time per thread."""
+
+    def __init__(
+        self,
+        *,
+        max_uses: int = 1000,
+        health_check_after_seconds: float = 30.0,
+        pragmas: tuple[str, ...] = (),
+        row_factory: Optional[Callable[..., Any]] = sqlite3.Row,
+        timeout: float = 5.0,
+    ) -> None:
+        self.max_uses = max(1, int(max_uses))
+        self.health_check_after_seconds = float(health_check_after_seconds)
+        self.pragmas = tuple(pragmas)
+        self.row_factory = row_factory
+        self.timeout = float(timeout)
+        self._local = threading.local()
+        self._live: "weakref.WeakSet[_PooledConnection]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._counters = {
+            "opens": 0,
+            "reuses": 0,
+            "recycled_max_uses": 0,
+            "recycled_error": 0,
+            "health_check_failures": 0,
+            "acquire_wait_ms_total": 0.0,
+            "acquire_wait_ms_max": 0.0,
+        }
+
+    def _bump(self, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self._counters[key] += amount
+
+    def _open(self, path: str) -> _PooledConnection:
+        conn = sqlite3.connect(path, timeout=self.timeout)
+        if self.row_factory is not None:
+            conn.row_factory = self.row_factory
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        entry = _PooledConnection(conn, path, time.monotonic())
+        with self._lock:
+            self._live.add(entry)
+            self._counters["opens"] += 1
+        return entry
+
+    def _close(self, entry: _PooledConnection) -> None:
+        try:
+            entry.conn.close()
+        except sqlite3.Error:
+            pass
+        if getattr(self._local, "entry", None) is entry:
+            self._local.entry = None
+
+    def _healthy(self, entry: _PooledConnection) -> bool:
+        try:
+            entry.conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            self._bump("health_check_failures")
+            return False
+
+    def _acquire(self, path: str) -> _PooledConnection:
+        started = time.perf_counter()
+        entry: Optional[_PooledConnection] = getattr(self._local, "entry", None)
+        if entry is not None and entry.depth == 0:
+            idle = time.monotonic() - entry.last_used
+            if entry.path != path or (idle >= self.health_check_after_seconds and not self._healthy(entry)):
+                self._close(entry)
+                entry = None
+        if entry is None:
+            entry = self._open(path)
+            self._local.entry = entry
+        elif entry.depth == 0:
+            self._bump("reuses")
+        waited_ms = (time.perf_counter() - started) * 1000.0
+        with self._lock:
+            self._counters["acquire_wait_ms_total"] += waited_ms
+            self._counters["acquire_wait_ms_max"] = max(self._counters["acquire_wait_ms_max"], waited_ms)
+        return entry
+
+    @contextmanager
+    def connection(self, path: str) -> Iterator[sqlite3.Connection]:
+        """Yield this thread's connection to `path`, committing on success."""
+        entry = self._acquire(path)
+        if entry.depth and entry.path != path:
+            # A nested block wants a different database: give it its own connection.
+            conn = sqlite3.connect(path, timeout=self.timeout)
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
+            return
+
+        entry.depth += 1
+        try:
+            with entry.conn:
+                yield entry.conn
+        except sqlite3.Error as e:
+            # Constraint violations are normal control flow for callers.
+            if not isinstance(e, sqlite3.IntegrityError):
+                entry.broken = True
+            raise
+        finally:
+            entry.depth -= 1
+            if entry.depth == 0:
+                entry.uses += 1
+                entry.last_used = time.monotonic()
+                if entry.broken:
+                    self._bump("recycled_error")
+                    self._close(entry)
+                elif entry.uses >= self.max_uses:
+                    self._bump("recycled_max_uses")
+                    self._close(entry)
+
+    def close_thread_connection(self) -> None:
+        """Close the calling thread's pooled connection, if any."""
+        entry = getattr(self._local, "entry", None)
+        if entry is not None and entry.depth == 0:
+            self._close(entry)
+
+    def stats(self) -> dict[str, Any]:
+        """Return counters for admin dashboards."""
+        with self._lock:
+            out: dict[str, Any] = dict(self._counters)
+            out["open_connections"] = len(self._live)
+        out["acquire_wait_ms_total"] = round(out["acquire_wait_ms_total"], 3)
+        out["acquire_wait_ms_max"] = round(out["acquire_wait_ms_max"], 3)
+        out["max_uses"] = self.max_uses
+        return out
@@ -9,39 +9,44 @@ from __future__ import annotations
 
 
 from dataclasses import dataclass
-import importlib
 from datetime import datetime,timedelta,timezone
-from functools import wraps
-from io import BytesIO
+from functools import cached_property, wraps
+from io import BytesIO, StringIO
+import base64
 import csv
+import hashlib
+import json
 from email.message import EmailMessage
 import os
 import secrets
 import sqlite3
 import ssl
 import smtplib
+import time
 import uuid
 import traceback
 
 
-from flask import Blueprint, abort, flash, jsonify, redirect, render_template, request, send_file, session, url_for
-from flask import current_app
+from flask import Blueprint, Response, abort, flash, jsonify, redirect, render_template, request, send_file, session, url_for
+from flask import current_app, g, has_app_context, make_response, stream_with_context
+from markupsafe import Markup
 from werkzeug.utils import secure_filename
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.pdfgen import canvas
 
-from modules import education_store
+from modules import education_store, event_archive
 
 from modules.education_store import (
     authenticate_user,
     consume_password_reset,
     create_user,
     create_password_reset,
-    get_completed_items,
-    get_quiz_best,
+    get_learner_state,
     get_total_quiz_attempts,
     get_user,
+    lesson_steps_complete,
+    mark_lesson_step,
     mark_progress,
     record_event,
     record_quiz_attempt,
@@ -52,32 +57,23 @@ from modules.education_store import (
     get_all_users_module_progress,
     get_user_module_progress_summary,
 )
-from modules.lithium_education import (
-    LithiumBatteryFundamentals, 
+from modules.battery_concepts import (
     CellChemistry,
     CapacityAndDOD,
     CRate,
     BatteryLifeAndCycles,
     CellSpecifications,
-    MODULE_3_BATTERY_FUNDAMENTALS,
-    MODULE_4_BMS,
-    MODULE_5_ENERGY_SYSTEM_DESIGN,
-    MODULE_6_INSTALLATION_WIRING,
-    MODULE_6_ASSESSMENT,
-    MODULE_7_SYSTEM_CONFIG,
-    MODULE_7_ASSESSMENT,
-    MODULE_8_MONITORING_TROUBLESHOOTING,
-    MODULE_8_ASSESSMENT,
-    MODULE_9_ECOSYSTEM_AND_PRODUCT_RANGE,
-    MODULE_10_INSTALLER_GUIDES_AND_RESOURCES,
 )
-import modules.lithium_education as lithium_education_module
+from modules.content_store import lesson_content
+from modules.result_cache import ResultCache, make_key
 from modules.interactive_tools import (
+    ArrayPackSimulator,
     CellSimulator,
     PackSimulator,
     EducationalQuizzes,
     InteractiveCalculators
 )
+from modules.sim_sessions import SimulationSessionStore
 
 education_bp = Blueprint('education', __name__, url_prefix='/learn')
 
@@ -199,13 +195,9 @@ def _require_admin_token():
         abort(403)
 
 
-def _connect_education_db() -> sqlite3.Connection:
-    education_store.ensure_db()
-    path = education_store.db_path()
-    conn = sqlite3.connect(path)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA busy_timeout=5000;")
-    return conn
+def _connect_education_db():
+    # Shares education_store's per-thread connection pool.
+    return education_store._connect()
 
 
 def _int_param(name: str, default: int, *, min_value: int | None = None, max_value: int | None = None) -> int:
@@ -323,20 +315,36 @@ _QUIZ_PREREQ_LESSONS: dict[str, str] = {
 }
 
 
-_TRACKED_LESSON_STEP_COUNTS: dict[str, int] = {
-    "lesson:fundamentals": len(LithiumBatteryFundamentals.MODULE_1_FUNDAMENTALS.get("sections", [])) + 1,
-    "lesson:fundamentals-2": len(LithiumBatteryFundamentals.MODULE_2_ELECTRICAL_FUNDAMENTALS.get("sections", [])) + 1,
-    "lesson:fundamentals-3": len(MODULE_3_BATTERY_FUNDAMENTALS.get("sections", [])) + 1,
-    "lesson:fundamentals-4": len(MODULE_4_BMS.get("sections", [])) + 1,
-    "lesson:fundamentals-5": len(MODULE_5_ENERGY_SYSTEM_DESIGN.get("sections", [])) + 1,
-    "lesson:fundamentals-6": len(MODULE_6_INSTALLATION_WIRING.get("sections", [])) + 1,
-    "lesson:fundamentals-7": len(MODULE_7_SYSTEM_CONFIG.get("sections", [])) + 1,
-    "lesson:fundamentals-8": len(MODULE_8_MONITORING_TROUBLESHOOTING.get("sections", [])) + 1,
-    "lesson:fundamentals-9": len(MODULE_9_ECOSYSTEM_AND_PRODUCT_RANGE.get("sections", [])) + 1,
-    "lesson:fundamentals-10": len(MODULE_10_INSTALLER_GUIDES_AND_RESOURCES.get("sections", [])) + 1,
+# Lesson key -> compiled content name in `lesson_content`.
+_LESSON_CONTENT_NAMES: dict[str, str] = {
+    "lesson:fundamentals": "MODULE_1_FUNDAMENTALS",
+    "lesson:fundamentals-2": "MODULE_2_ELECTRICAL_FUNDAMENTALS",
+    "lesson:fundamentals-3": "MODULE_3_BATTERY_FUNDAMENTALS",
+    "lesson:fundamentals-4": "MODULE_4_BMS",
+    "lesson:fundamentals-5": "MODULE_5_ENERGY_SYSTEM_DESIGN",
+    "lesson:fundamentals-6": "MODULE_6_INSTALLATION_WIRING",
+    "lesson:fundamentals-7": "MODULE_7_SYSTEM_CONFIG",
+    "lesson:fundamentals-8": "MODULE_8_MONITORING_TROUBLESHOOTING",
+    "lesson:fundamentals-9": "MODULE_9_ECOSYSTEM_AND_PRODUCT_RANGE",
+    "lesson:fundamentals-10": "MODULE_10_INSTALLER_GUIDES_AND_RESOURCES",
 }
 
 
+# Section counts come from the content manifest, so this does not decode any lesson.
+_TRACKED_LESSON_STEP_COUNTS: dict[str, int] = {}
+
+
+def _refresh_lesson_step_counts() -> None:
+    _TRACKED_LESSON_STEP_COUNTS.update(
+        {lesson_key: lesson_content.section_count(name) + 1 for lesson_key, name in _LESSON_CONTENT_NAMES.items()}
+    )
+
+
+_refresh_lesson_step_counts()
+# Hot-reloaded content may add or remove sections.
+lesson_content.on_reload(_refresh_lesson_step_counts)
+
+
 _QUIZ_PASS_MARKS: dict[str, int] = {
     # Module 1 assessment
     "capacity-dod": 75,
@@ -382,11 +390,7 @@ def _quiz_id_to_module_id(quiz_id: str) -> str | None:
     return None
 
 
-def _lesson_step_progress_key(lesson_key: str, step_number: int) -> str:
-    return f"{lesson_key}:step:{int(step_number)}"
-
-
-def _is_lesson_complete(completed_items: set[str], lesson_key: str) -> bool:
+def _is_lesson_complete(completed_items: set[str], lesson_key: str, step_masks: dict[str, int]) -> bool:
     lesson_key = str(lesson_key or "").strip()
     if not lesson_key:
         return False
@@ -395,11 +399,131 @@ def _is_lesson_complete(completed_items: set[str], lesson_key: str) -> bool:
     if not required_steps:
         return lesson_key in completed_items
 
-    return all(_lesson_step_progress_key(lesson_key, step_number) in completed_items for step_number in range(1, required_steps + 1))
+    return lesson_steps_complete(step_masks.get(lesson_key, 0), required_steps)
+
 
+def _completed_active_lessons(completed_items: set[str], step_masks: dict[str, int]) -> set[str]:
+    return {item.key for item in _LESSON_ITEMS if _is_lesson_complete(completed_items, item.key, step_masks)}
+
+
+@dataclass
+class ProgressSnapshot:
+    """A learner's persisted progress plus the views derived from it.
+
+    Loaded with one DB round-trip and memoized on `flask.g` for the rest of the
+    request (see `_progress_snapshot`). Anything that writes progress must call
+    `_invalidate_progress_snapshot` afterwards.
+    """
+
+    user_id: int
+    completed_items: set[str]
+    step_masks: dict[str, int]
+    quiz_best: dict[str, dict[str, int]]
+
+    @classmethod
+    def load(cls, user_id: int) -> "ProgressSnapshot":
+        return cls(user_id=int(user_id), **get_learner_state(int(user_id)))
+
+    @property
+    def has_progress(self) -> bool:
+        return bool(self.completed_items or self.step_masks or self.quiz_best)
+
+    @cached_property
+    def completed_lessons(self) -> set[str]:
+        return _completed_active_lessons(self.completed_items, self.step_masks)
+
+    @cached_property
+    def unlock_state(self) -> dict[str, object]:
+        """Lesson-based quiz unlock state."""
+        order = _quiz_order_ids()
+        completed_quizzes = {k.split("quiz:", 1)[1] for k in self.completed_items if str(k).startswith("quiz:")}
+        unlocked = [
+            quiz_id
+            for quiz_id in order
+            if _QUIZ_PREREQ_LESSONS.get(quiz_id) in self.completed_lessons
+        ]
+        return {
+            "order": order,
+            "unlocked": unlocked,
+            "completed": sorted([qid for qid in completed_quizzes if qid in order]),
+        }
+
+    @cached_property
+    def overall_pct(self) -> float:
+        """Average best percentage across attempted quizzes (unattempted ones excluded)."""
+        if not self.quiz_best:
+            return 0.0
+
+        pct_sum = 0.0
+        attempted = 0
+        for q in _QUIZZES:
+            qid = q["id"]
+            if qid not in self.quiz_best:
+                continue
+            best_score = int(self.quiz_best[qid].get("best_score", 0))
+            total = int(self.quiz_best[qid].get("total", 0))
+            pct_sum += (best_score / total) if total else 0.0
+            attempted += 1
+
+        if attempted <= 0:
+            return 0.0
+        return (pct_sum / float(attempted)) * 100.0
+
+    @cached_property
+    def eligible(self) -> bool:
+        # Eligibility rule:
+        # - User must have attempted at least two quizzes
+        # - Average across attempted quizzes must be >= 75%
+        # - Each attempted quiz should have its prerequisite lesson completed
+        if len(self.quiz_best) < 2:
+            return False
 
-def _completed_active_lessons(completed_items: set[str]) -> set[str]:
-    return {item.key for item in _LESSON_ITEMS if _is_lesson_complete(completed_items, item.key)}
+        for qid in self.quiz_best.keys():
+            prereq = _QUIZ_PREREQ_LESSONS.get(str(qid))
+            if prereq and prereq not in self.completed_lessons:
+                return False
+
+        return self.overall_pct >= 75.0
+
+    def lesson_steps_done(self, lesson_key: str) -> int:
+        required_steps = _TRACKED_LESSON_STEP_COUNTS.get(lesson_key, 0)
+        return (self.step_masks.get(lesson_key, 0) & ((1 << required_steps) - 1)).bit_count()
+
+    def continue_url(self) -> str:
+        """Next uncompleted lesson, opened at its last visited step."""
+        try:
+            for item in _LESSON_ITEMS:
+                if item.key in self.completed_lessons:
+                    continue
+
+                expected_steps = _TRACKED_LESSON_STEP_COUNTS.get(item.key)
+                last_step = 0
+                if expected_steps:
+                    # highest visited step for this lesson
+                    last_step = min(self.step_masks.get(item.key, 0).bit_length(), expected_steps)
+
+                step_to_open = last_step if last_step > 0 else 1
+                return url_for(item.endpoint, step=step_to_open)
+
+            return url_for("education.progress")
+        except Exception:
+            return url_for("education.fundamentals")
+
+
+def _progress_snapshot(user_id: int) -> ProgressSnapshot:
+    """Return the request's memoized `ProgressSnapshot` for `user_id`."""
+    if not has_app_context():
+        return ProgressSnapshot.load(user_id)
+    snapshots = g.setdefault("_progress_snapshots", {})
+    snap = snapshots.get(int(user_id))
+    if snap is None:
+        snap = snapshots[int(user_id)] = ProgressSnapshot.load(user_id)
+    return snap
+
+
+def _invalidate_progress_snapshot(user_id: int) -> None:
+    if has_app_context():
+        g.get("_progress_snapshots", {}).pop(int(user_id), None)
 
 
 def _quiz_order_ids() -> list[str]:
@@ -408,21 +532,7 @@ def _quiz_order_ids() -> list[str]:
 
 def _quiz_unlock_state(user_id: int) -> dict[str, object]:
     """Return lesson-based quiz unlock state derived from persisted progress."""
-
-    order = _quiz_order_ids()
-    completed_items = get_completed_items(int(user_id))
-    completed_quizzes = {k.split("quiz:", 1)[1] for k in completed_items if str(k).startswith("quiz:")}
-    completed_lessons = _completed_active_lessons(completed_items)
-    unlocked = [
-        quiz_id
-        for quiz_id in order
-        if _QUIZ_PREREQ_LESSONS.get(quiz_id) in completed_lessons
-    ]
-    return {
-        "order": order,
-        "unlocked": unlocked,
-        "completed": sorted([qid for qid in completed_quizzes if qid in order]),
-    }
+    return _progress_snapshot(user_id).unlock_state
 
 
 def _randomize_quiz_questions(questions: list[dict]) -> list[dict]:
@@ -592,11 +702,7 @@ def _enforce_inactivity_timeout():
 def _user_has_progress(user_id: int) -> bool:
     """Return True if the user has any saved learning/quiz activity."""
     try:
-        completed = get_completed_items(int(user_id))
-        if completed:
-            return True
-        quiz_best = get_quiz_best(int(user_id))
-        return bool(quiz_best)
+        return _progress_snapshot(int(user_id)).has_progress
     except Exception:
         # If the DB is unavailable or schema is missing, fail open
         # (treat as no progress) rather than breaking auth flows.
@@ -623,6 +729,7 @@ def _track(item_key: str) -> None:
     if not user:
         return
     mark_progress(user.id, item_key)
+    _invalidate_progress_snapshot(user.id)
 
 
 def login_required(fn=None, *, message: str = "Please log in to access this content."):
@@ -670,53 +777,14 @@ def api_login_required(fn=None, *, message: str = "login_required"):
 
 
 def _is_certificate_eligible(user_id: int) -> bool:
-    completed_items = get_completed_items(user_id)
-    completed_lessons = _completed_active_lessons(completed_items)
-    has_required_lessons = all(item.key in completed_lessons for item in _LESSON_ITEMS)
+    return _progress_snapshot(user_id).eligible
+
 
+def _overall_quiz_percentage(user_id: int) -> float:
     # Overall quiz score is defined as:
     #   overall_pct = (avg of each attempted quiz pct) * 100
     # Unattempted quizzes are excluded from the average.
-    overall_pct = _overall_quiz_percentage(user_id)
-    quiz_best = get_quiz_best(user_id)
-    attempted_count = len(quiz_best)
-
-    # New eligibility rule (per latest requirement):
-    # - User must have attempted at least two quizzes
-    # - Average across attempted quizzes must be >= 75%
-    # - Each attempted quiz should have its prerequisite lesson completed
-    if attempted_count < 2:
-        return False
-
-    # Ensure prerequisites for attempted quizzes are satisfied
-    completed_lessons = _completed_active_lessons(completed_items)
-    for qid in quiz_best.keys():
-        prereq = _QUIZ_PREREQ_LESSONS.get(str(qid))
-        if prereq and prereq not in completed_lessons:
-            return False
-
-    return overall_pct >= 75.0
-
-
-def _overall_quiz_percentage(user_id: int) -> float:
-    quiz_best = get_quiz_best(user_id)
-    if not quiz_best:
-        return 0.0
-
-    pct_sum = 0.0
-    attempted = 0
-    for q in _QUIZZES:
-        qid = q["id"]
-        if qid not in quiz_best:
-            continue
-        best_score = int(quiz_best[qid].get("best_score", 0))
-        total = int(quiz_best[qid].get("total", 0))
-        pct_sum += (best_score / total) if total else 0.0
-        attempted += 1
-
-    if attempted <= 0:
-        return 0.0
-    return (pct_sum / float(attempted)) * 100.0
+    return _progress_snapshot(user_id).overall_pct
 
 
 # ============= AUTH ROUTES =============
@@ -964,12 +1032,9 @@ def progress():
     # until the user has actually navigated to the dashboard at least once.
     session["edu_seen_dashboard"] = True
 
-    completed_items = get_completed_items(user.id)
-    completed_lessons = _completed_active_lessons(completed_items)
-    quiz_best = get_quiz_best(user.id)
-    overall_pct = _overall_quiz_percentage(user.id)
-    eligible = _is_certificate_eligible(user.id)
-    unlock_state = _quiz_unlock_state(user.id)
+    snapshot = _progress_snapshot(user.id)
+    completed_lessons = snapshot.completed_lessons
+    unlock_state = snapshot.unlock_state
 
     lesson_items = [
         {
@@ -983,33 +1048,9 @@ def progress():
     lessons_completed_count = sum(1 for item in _LESSON_ITEMS if item.key in completed_lessons)
     quizzes_completed_count = len(unlock_state.get("completed") or [])
 
-    # Choose continue URL: the next uncompleted lesson in the ordered lesson list.
+    # Continue URL: the next uncompleted lesson in the ordered lesson list.
     # If no lessons have been completed, this will naturally point to Module 1.
-    try:
-        continue_url = None
-        # Find the next lesson the user hasn't fully completed and resume at the last visited step.
-        for item in _LESSON_ITEMS:
-            if item.key in completed_lessons:
-                continue
-
-            expected_steps = _TRACKED_LESSON_STEP_COUNTS.get(item.key)
-            last_step = 0
-            if expected_steps:
-                # find highest visited step for this lesson
-                for s in range(expected_steps, 0, -1):
-                    if _lesson_step_progress_key(item.key, s) in completed_items:
-                        last_step = s
-                        break
-
-            step_to_open = last_step if last_step > 0 else 1
-            continue_url = url_for(item.endpoint, step=step_to_open)
-            break
-
-        # Fallbacks
-        if not continue_url:
-            continue_url = url_for("education.progress")
-    except Exception:
-        continue_url = url_for("education.fundamentals")
+    continue_url = snapshot.continue_url()
 
     return render_template(
         "education/progress.html",
@@ -1017,9 +1058,9 @@ def progress():
         lesson_items=lesson_items,
         completed=completed_lessons,
         quizzes=_QUIZZES,
-        quiz_best=quiz_best,
-        overall_pct=overall_pct,
-        eligible=eligible,
+        quiz_best=snapshot.quiz_best,
+        overall_pct=snapshot.overall_pct,
+        eligible=snapshot.eligible,
         unlock_state=unlock_state,
         lessons_completed_count=lessons_completed_count,
         lessons_total=len(_LESSON_ITEMS),
@@ -1044,6 +1085,7 @@ def api_quiz_complete():
         return jsonify({"error": "quiz_id_required"}), 400
 
     record_quiz_attempt(user.id, quiz_id, score, total)
+    _invalidate_progress_snapshot(user.id)
 
     required = _quiz_pass_mark(quiz_id)
     passed = True
@@ -1057,7 +1099,8 @@ def api_quiz_complete():
 
     if passed:
         mark_progress(user.id, f"quiz:{quiz_id}")
-        
+        _invalidate_progress_snapshot(user.id)
+
         # Record module certificate if quiz is passed (75%+)
         try:
             module_id = _quiz_id_to_module_id(quiz_id)
@@ -1101,16 +1144,13 @@ def api_lesson_step_progress():
     if step_number < 1 or step_number > expected_steps:
         return jsonify({"error": "invalid_step"}), 400
 
-    mark_progress(user.id, _lesson_step_progress_key(lesson_key, step_number))
-    completed_items = get_completed_items(user.id)
-    lesson_complete = _is_lesson_complete(completed_items, lesson_key)
+    steps_mask = mark_lesson_step(user.id, lesson_key, step_number)
+    lesson_complete = lesson_steps_complete(steps_mask, expected_steps)
     if lesson_complete:
         mark_progress(user.id, lesson_key)
+    _invalidate_progress_snapshot(user.id)
 
-    visited_steps = sum(
-        1 for current_step in range(1, expected_steps + 1)
-        if _lesson_step_progress_key(lesson_key, current_step) in completed_items
-    )
+    visited_steps = (steps_mask & ((1 << expected_steps) - 1)).bit_count()
 
     return jsonify({
         "ok": True,
@@ -1128,13 +1168,14 @@ def certificate():
     if not user:
         abort(401)
 
-    if not _is_certificate_eligible(user.id):
+    snapshot = _progress_snapshot(user.id)
+    if not snapshot.eligible:
         flash("Complete the required lessons and at least one quiz to unlock your certificate.", "warning")
         return redirect(url_for("education.progress"))
 
-    completed = get_completed_items(user.id)
-    quiz_best = get_quiz_best(user.id)
-    overall_pct = _overall_quiz_percentage(user.id)
+    completed = snapshot.completed_items
+    quiz_best = snapshot.quiz_best
+    overall_pct = snapshot.overall_pct
     issued_date = datetime.now().strftime("%Y-%m-%d")
     certificate_id = f"EDU-{user.id}-{datetime.now().strftime('%Y%m%d')}"
 
@@ -1172,14 +1213,15 @@ def certificate_pdf():
     if not user:
         abort(401)
 
-    if not _is_certificate_eligible(user.id):
+    snapshot = _progress_snapshot(user.id)
+    if not snapshot.eligible:
         flash("Complete the required lessons and at least one quiz to unlock your certificate.", "warning")
         return redirect(url_for("education.progress"))
 
     issued_date = datetime.now().strftime("%Y-%m-%d")
     certificate_id = f"EDU-{user.id}-{datetime.now().strftime('%Y%m%d')}"
-    quiz_best = get_quiz_best(user.id)
-    overall_pct = _overall_quiz_percentage(user.id)
+    quiz_best = snapshot.quiz_best
+    overall_pct = snapshot.overall_pct
 
     if overall_pct >= 90.0:
         grade = "A"
@@ -1434,150 +1476,267 @@ def admin_module_progress_page():
     return render_template("education/admin_module_progress.html", token=token)
 
 
-@education_bp.get("/admin/db")
+@dataclass(frozen=True)
+class _AdminTable:
+    """A keyset-pageable admin table: `select_sql` plus a unique, ordered key."""
 
+    select_sql: str
+    # Qualified columns forming a unique sort key, and their names in the output rows.
+    key_columns: tuple[str, ...]
+    key_fields: tuple[str, ...]
+    columns: tuple[str, ...]
+    descending: bool = True
+    user_column: str | None = None
 
-@education_bp.get("/admin/db/api/users")
-def admin_db_users():
-    _require_admin_token()
-    limit = _int_param("limit", 50, min_value=1, max_value=500)
-    with _connect_education_db() as conn:
-        rows = conn.execute(
-            """
+
+_ADMIN_TABLES: dict[str, _AdminTable] = {
+    "users": _AdminTable(
+        select_sql="""
             SELECT
                 u.id,
                 u.username,
                 u.email,
                 u.created_at,
                 u.avatar_filename,
-                CASE WHEN lt_active.user_id IS NOT NULL THEN 1 ELSE 0 END AS is_active,
-                lt_last.last_login_at,
-                lt_last.last_logout_at
+                EXISTS (
+                    SELECT 1 FROM login_tracking lt WHERE lt.user_id = u.id AND lt.logout_at IS NULL
+                ) AS is_active,
+                (SELECT MAX(login_at) FROM login_tracking lt WHERE lt.user_id = u.id) AS last_login_at,
+                (SELECT MAX(logout_at) FROM login_tracking lt WHERE lt.user_id = u.id) AS last_logout_at
             FROM users u
-            LEFT JOIN (
-                SELECT DISTINCT user_id
-                FROM login_tracking
-                WHERE logout_at IS NULL
-            ) lt_active ON lt_active.user_id = u.id
-            LEFT JOIN (
-                SELECT
-                    user_id,
-                    MAX(login_at) AS last_login_at,
-                    MAX(logout_at) AS last_logout_at
-                FROM login_tracking
-                GROUP BY user_id
-            ) lt_last ON lt_last.user_id = u.id
-            ORDER BY u.id DESC
-            LIMIT ?
-            """,
-            (limit,),
-        ).fetchall()
-    return jsonify({"rows": [dict(r) for r in rows]})
+        """,
+        key_columns=("u.id",),
+        key_fields=("id",),
+        columns=("id", "username", "email", "created_at", "avatar_filename", "is_active", "last_login_at", "last_logout_at"),
+    ),
+    "progress": _AdminTable(
+        select_sql="""
+            SELECT p.user_id, u.username, p.item_key, p.completed_at
+            FROM progress p
+            LEFT JOIN users u ON u.id = p.user_id
+        """,
+        key_columns=("p.completed_at", "p.user_id", "p.item_key"),
+        key_fields=("completed_at", "user_id", "item_key"),
+        columns=("user_id", "username", "item_key", "completed_at"),
+        user_column="p.user_id",
+    ),
+    "quiz_attempts": _AdminTable(
+        select_sql="""
+            SELECT q.user_id, u.username, q.quiz_id, q.best_score, q.total, q.completed_at
+            FROM quiz_attempts q
+            LEFT JOIN users u ON u.id = q.user_id
+        """,
+        key_columns=("q.completed_at", "q.user_id", "q.quiz_id"),
+        key_fields=("completed_at", "user_id", "quiz_id"),
+        columns=("user_id", "username", "quiz_id", "best_score", "total", "completed_at"),
+        user_column="q.user_id",
+    ),
+    "events": _AdminTable(
+        select_sql="""
+            SELECT e.id, e.user_id, u.username, e.type, e.payload, e.created_at
+            FROM user_events e
+            LEFT JOIN users u ON u.id = e.user_id
+        """,
+        key_columns=("e.id",),
+        key_fields=("id",),
+        columns=("id", "user_id", "username", "type", "payload", "created_at"),
+        descending=False,
+        user_column="e.user_id",
+    ),
+}
+
+_ADMIN_EXPORT_PAGE_SIZE = 1000
+
+
+def _encode_cursor(key: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode("utf-8")).decode("ascii")
 
 
+def _decode_cursor(raw: str | None, expected_len: int) -> list | None:
+    """Decode an opaque `?cursor=` value; aborts with 400 if it is malformed."""
+    if not raw:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(raw.encode("ascii")))
+    except Exception:
+        key = None
+    if not isinstance(key, list) or len(key) != expected_len:
+        abort(400, description="Invalid cursor")
+    return key
+
+
+def _admin_table_page(table: str, *, after: list | None, user_id: int, limit: int) -> tuple[list[dict], list | None]:
+    """One keyset page of `table`; returns (rows, key of the last row or None at the end)."""
+    spec = _ADMIN_TABLES[table]
+    where: list[str] = []
+    params: list[object] = []
+    if user_id and spec.user_column:
+        where.append(f"{spec.user_column} = ?")
+        params.append(int(user_id))
+    if after is not None:
+        op = "<" if spec.descending else ">"
+        placeholders = ", ".join("?" for _ in spec.key_columns)
+        where.append(f"({', '.join(spec.key_columns)}) {op} ({placeholders})")
+        params.extend(after)
+    direction = "DESC" if spec.descending else "ASC"
+    sql = spec.select_sql
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY " + ", ".join(f"{c} {direction}" for c in spec.key_columns) + " LIMIT ?"
+    params.append(int(limit))
+
+    with _connect_education_db() as conn:
+        rows = [dict(r) for r in conn.execute(sql, tuple(params)).fetchall()]
+    last_key = [rows[-1][f] for f in spec.key_fields] if len(rows) == limit else None
+    return rows, last_key
+
+
+def _admin_table_response(table: str, *, default_limit: int, max_limit: int):
+    spec = _ADMIN_TABLES[table]
+    limit = _int_param("limit", default_limit, min_value=1, max_value=max_limit)
+    user_id = _int_param("user_id", 0, min_value=0)
+    after = _decode_cursor(request.args.get("cursor"), len(spec.key_fields))
+    rows, last_key = _admin_table_page(table, after=after, user_id=user_id, limit=limit)
+    return rows, (_encode_cursor(last_key) if last_key is not None else None)
+
+
+@education_bp.get("/admin/db")
+@education_bp.get("/admin/db/api/users")
+def admin_db_users():
+    _require_admin_token()
+    rows, next_cursor = _admin_table_response("users", default_limit=50, max_limit=500)
+    return jsonify({"rows": rows, "next_cursor": next_cursor})
+
 
 @education_bp.get("/admin/db/api/progress")
 def admin_db_progress():
     _require_admin_token()
-    user_id = _int_param("user_id", 0, min_value=0)
-    limit = _int_param("limit", 200, min_value=1, max_value=2000)
-    with _connect_education_db() as conn:
-        if user_id:
-            rows = conn.execute(
-                """
-                SELECT p.user_id, u.username, p.item_key, p.completed_at
-                FROM progress p
-                LEFT JOIN users u ON u.id = p.user_id
-                WHERE p.user_id = ?
-                ORDER BY p.completed_at DESC
-                LIMIT ?
-                """,
-                (user_id, limit),
-            ).fetchall()
-        else:
-            rows = conn.execute(
-                """
-                SELECT p.user_id, u.username, p.item_key, p.completed_at
-                FROM progress p
-                LEFT JOIN users u ON u.id = p.user_id
-                ORDER BY p.completed_at DESC
-                LIMIT ?
-                """,
-                (limit,),
-            ).fetchall()
-    return jsonify({"rows": [dict(r) for r in rows]})
+    rows, next_cursor = _admin_table_response("progress", default_limit=200, max_limit=2000)
+    return jsonify({"rows": rows, "next_cursor": next_cursor})
 
 
 @education_bp.get("/admin/db/api/quiz_attempts")
 def admin_db_quiz_attempts():
     _require_admin_token()
-    user_id = _int_param("user_id", 0, min_value=0)
-    limit = _int_param("limit", 200, min_value=1, max_value=2000)
-    with _connect_education_db() as conn:
-        if user_id:
-            rows = conn.execute(
-                """
-                SELECT q.user_id, u.username, q.quiz_id, q.best_score, q.total, q.completed_at
-                FROM quiz_attempts q
-                LEFT JOIN users u ON u.id = q.user_id
-                WHERE q.user_id = ?
-                ORDER BY q.completed_at DESC
-                LIMIT ?
-                """,
-                (user_id, limit),
-            ).fetchall()
-        else:
-            rows = conn.execute(
-                """
-                SELECT q.user_id, u.username, q.quiz_id, q.best_score, q.total, q.completed_at
-                FROM quiz_attempts q
-                LEFT JOIN users u ON u.id = q.user_id
-                ORDER BY q.completed_at DESC
-                LIMIT ?
-                """,
-                (limit,),
-            ).fetchall()
-    return jsonify({"rows": [dict(r) for r in rows]})
+    rows, next_cursor = _admin_table_response("quiz_attempts", default_limit=200, max_limit=2000)
+    return jsonify({"rows": rows, "next_cursor": next_cursor})
 
 
 @education_bp.get("/admin/db/api/events")
 def admin_db_events():
+    """Events in id order. `?since=<id>` is kept for the live monitor; `?cursor=` also works."""
     _require_admin_token()
     since_id = _int_param("since", 0, min_value=0)
     limit = _int_param("limit", 200, min_value=1, max_value=2000)
     user_id = _int_param("user_id", 0, min_value=0)
-    with _connect_education_db() as conn:
-        if user_id:
-            rows = conn.execute(
-                """
-                SELECT e.id, e.user_id, u.username, e.type, e.payload, e.created_at
-                FROM user_events e
-                LEFT JOIN users u ON u.id = e.user_id
-                WHERE e.id > ? AND (e.user_id = ?)
-                ORDER BY e.id ASC
-                LIMIT ?
-                """,
-                (since_id, user_id, limit),
-            ).fetchall()
-        else:
-            rows = conn.execute(
-                """
-                SELECT e.id, e.user_id, u.username, e.type, e.payload, e.created_at
-                FROM user_events e
-                LEFT JOIN users u ON u.id = e.user_id
-                WHERE e.id > ?
-                ORDER BY e.id ASC
-                LIMIT ?
-                """,
-                (since_id, limit),
-            ).fetchall()
+    cursor = _decode_cursor(request.args.get("cursor"), 1)
+    if cursor is not None:
+        since_id = max(since_id, int(cursor[0]))
+    rows, last_key = _admin_table_page("events", after=[since_id], user_id=user_id, limit=limit)
     last_id = int(rows[-1]["id"]) if rows else since_id
-    return jsonify({"rows": [dict(r) for r in rows], "last_id": last_id})
+    return jsonify({
+        "rows": rows,
+        "last_id": last_id,
+        "next_cursor": _encode_cursor(last_key) if last_key is not None else None,
+    })
+
+
+@education_bp.get("/admin/db/api/<any(users, progress, quiz_attempts, events):table>/export")
+def admin_db_export(table: str):
+    """Stream a whole table as CSV (`?format=csv`) or NDJSON (default).
+
+    Rows are read one keyset page at a time, so memory stays flat however
+    large the table is, and no read transaction is held between pages.
+    """
+    _require_admin_token()
+    fmt = (request.args.get("format") or "ndjson").strip().lower()
+    if fmt not in {"csv", "ndjson"}:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+    spec = _ADMIN_TABLES[table]
+    user_id = _int_param("user_id", 0, min_value=0)
+
+    def _pages():
+        after = None
+        while True:
+            rows, after = _admin_table_page(table, after=after, user_id=user_id, limit=_ADMIN_EXPORT_PAGE_SIZE)
+            if rows:
+                yield rows
+            if after is None:
+                return
+
+    def _generate():
+        if fmt == "csv":
+            buf = StringIO()
+            writer = csv.DictWriter(buf, fieldnames=spec.columns, extrasaction="ignore")
+            writer.writeheader()
+            for rows in _pages():
+                writer.writerows(rows)
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate(0)
+            yield buf.getvalue()
+        else:
+            for rows in _pages():
+                yield "".join(json.dumps(r, separators=(",", ":"), ensure_ascii=False) + "\n" for r in rows)
+
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return Response(
+        stream_with_context(_generate()),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f'attachment; filename="{table}-{stamp}.{fmt}"',
+            "Cache-Control": "no-store",
+        },
+    )
+
+
+@education_bp.get("/admin/db/api/events/archive")
+def admin_db_events_archive():
+    """Query archived (rolled-off) events for a date range: ?start=YYYY-MM-DD&end=YYYY-MM-DD."""
+    _require_admin_token()
+    try:
+        start = datetime.strptime(request.args.get("start", ""), "%Y-%m-%d").date()
+        end = datetime.strptime(request.args.get("end") or start.isoformat(), "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"error": "start/end must be YYYY-MM-DD"}), 400
+    if end < start or (end - start).days > 366:
+        return jsonify({"error": "Date range must be ascending and at most 366 days"}), 400
+    limit = _int_param("limit", 1000, min_value=1, max_value=10000)
+    user_id = _int_param("user_id", 0, min_value=0)
+    event_type = (request.args.get("type") or "").strip() or None
+    rows = list(event_archive.query_archive(
+        start, end, user_id=user_id or None, event_type=event_type, limit=limit,
+    ))
+    return jsonify({"rows": rows, "truncated": len(rows) >= limit})
+
+
+@education_bp.get("/admin/db/api/events/archive/partitions")
+def admin_db_events_archive_partitions():
+    _require_admin_token()
+    return jsonify({"partitions": event_archive.list_partitions(), "job": event_archive.job_status()})
+
+
+@education_bp.post("/admin/db/api/events/archive/run")
+def admin_db_events_archive_run():
+    """Run one retention pass now (older_than_days defaults to EVENT_RETENTION_DAYS)."""
+    _require_admin_token()
+    data = request.get_json(silent=True) or {}
+    try:
+        days = float(data.get("older_than_days", os.getenv("EVENT_RETENTION_DAYS", "90")))
+    except (TypeError, ValueError):
+        return jsonify({"error": "older_than_days must be a number"}), 400
+    if days < 1:
+        return jsonify({"error": "older_than_days must be at least 1"}), 400
+    result = event_archive.run_retention_once(older_than_days=days)
+    if result is None:
+        return jsonify({"error": "A retention run is already in progress"}), 409
+    return jsonify(result)
 
 
 @education_bp.get("/admin/db/api/users_summary")
 def admin_db_users_summary():
-    """Per-user completion + score summary."""
+    """Per-user completion + score summary (read from the `user_summary` table)."""
     _require_admin_token()
     limit = _int_param("limit", 200, min_value=1, max_value=2000)
 
@@ -1589,56 +1748,13 @@ def admin_db_users_summary():
                 u.username,
                 u.email,
                 u.created_at,
-                COALESCE(p.lessons_completed, 0) AS lessons_completed,
-                COALESCE(q.quizzes_attempted, 0) AS quizzes_attempted,
-                ROUND(COALESCE(q.overall_pct, 0), 1) AS overall_pct,
-                COALESCE(a.last_activity, u.created_at) AS last_activity
-            FROM users u
-            LEFT JOIN (
-                -- Count distinct fully-completed lesson keys only (lesson:fundamentals, lesson:fundamentals-2, ...)
-                SELECT user_id, COUNT(DISTINCT item_key) AS lessons_completed
-                FROM progress
-                WHERE item_key LIKE 'lesson:%'
-                  AND item_key NOT LIKE '%:step:%'
-                GROUP BY user_id
-            ) p ON p.user_id = u.id
-            LEFT JOIN (
-                SELECT
-                    user_id,
-                    COUNT(*) AS quizzes_attempted,
-                    AVG(CAST(best_score AS REAL) / NULLIF(total, 0)) * 100.0 AS overall_pct,
-                    MAX(completed_at) AS last_quiz_at
-                FROM quiz_attempts
-                GROUP BY user_id
-            ) q ON q.user_id = u.id
-            LEFT JOIN (
-                SELECT
-                    u2.id AS user_id,
-                    MAX(
-                        COALESCE(q2.last_quiz_at, ''),
-                        COALESCE(p2.last_progress_at, ''),
-                        COALESCE(e2.last_event_at, ''),
-                        COALESCE(u2.created_at, '')
-                    ) AS last_activity
-                FROM users u2
-                LEFT JOIN (
-                    SELECT user_id, MAX(completed_at) AS last_progress_at
-                    FROM progress
-                    GROUP BY user_id
-                ) p2 ON p2.user_id = u2.id
-                LEFT JOIN (
-                    SELECT user_id, MAX(completed_at) AS last_quiz_at
-                    FROM quiz_attempts
-                    GROUP BY user_id
-                ) q2 ON q2.user_id = u2.id
-                LEFT JOIN (
-                    SELECT user_id, MAX(created_at) AS last_event_at
-                    FROM user_events
-                    GROUP BY user_id
-                ) e2 ON e2.user_id = u2.id
-                GROUP BY u2.id
-            ) a ON a.user_id = u.id
-            ORDER BY last_activity DESC
+                s.lessons_completed,
+                s.quizzes_attempted,
+                ROUND(COALESCE(s.overall_pct, 0), 1) AS overall_pct,
+                s.last_activity
+            FROM user_summary s
+            JOIN users u ON u.id = s.user_id
+            ORDER BY s.last_activity DESC
             LIMIT ?
             """,
             (limit,),
@@ -1647,6 +1763,19 @@ def admin_db_users_summary():
     return jsonify({"rows": [dict(r) for r in rows]})
 
 
+@education_bp.get("/admin/db/api/user_summaries/check")
+def admin_db_user_summaries_check():
+    """Compare `user_summary` rows with values recomputed from the source tables."""
+    _require_admin_token()
+    return jsonify(education_store.check_user_summaries(limit=_int_param("limit", 100, min_value=1, max_value=2000)))
+
+
+@education_bp.post("/admin/db/api/user_summaries/rebuild")
+def admin_db_user_summaries_rebuild():
+    _require_admin_token()
+    return jsonify({"rebuilt": education_store.rebuild_user_summaries()})
+
+
 @education_bp.get("/admin/db/api/latest_quiz")
 def admin_db_latest_quiz():
         """Latest quiz attempt per user (based on quiz_attempts.completed_at).
@@ -1704,84 +1833,50 @@ def admin_db_user_reports():
     lessons_total = len(lesson_keys)
     quizzes_total = len(quiz_ids)
 
-    sql = """
+    # Quiz passes at the stored pass mark come straight from `user_summary`;
+    # any other threshold is counted per returned user (quiz_attempts is keyed by user_id).
+    if pass_pct == education_store.SUMMARY_PASS_PCT:
+        passed_sql = "COALESCE(s.quizzes_passed, 0)"
+        passed_params: list[object] = []
+    else:
+        passed_sql = """(
+            SELECT COUNT(*) FROM quiz_attempts q
+            WHERE q.user_id = u.id
+              AND (CASE WHEN q.total > 0 THEN (CAST(q.best_score AS REAL) / q.total) * 100.0 ELSE 0 END) >= ?
+        )"""
+        passed_params = [pass_pct]
+
+    sql = f"""
         SELECT
-            u.id AS user_id,
-            u.username,
-            u.email,
-            u.created_at,
-
-            COALESCE(lc.modules_completed, 0) AS modules_completed,
-            COALESCE(lp.modules_in_progress, 0) AS modules_in_progress,
-
-            COALESCE(qa.quizzes_attempted, 0) AS quizzes_attempted,
-            COALESCE(qp.quizzes_passed, 0) AS quizzes_passed,
-
-            ROUND(COALESCE(qa.overall_pct, 0), 1) AS overall_pct,
-
+            user_id, username, email, created_at,
+            modules_completed, modules_in_progress,
+            quizzes_attempted, quizzes_passed, overall_pct,
             CASE
-                WHEN COALESCE(lc.modules_completed, 0) >= ?
-                 AND COALESCE(qp.quizzes_passed, 0) >= ?
+                WHEN modules_completed >= ? AND quizzes_passed >= ?
                 THEN 1 ELSE 0
             END AS certificate_ready
-
-        FROM users u
-
-        -- Completed modules: explicit final lesson keys only
-        LEFT JOIN (
-            SELECT user_id, COUNT(DISTINCT item_key) AS modules_completed
-            FROM progress
-            WHERE item_key LIKE 'lesson:%'
-              AND item_key NOT LIKE '%:step:%'
-            GROUP BY user_id
-        ) lc ON lc.user_id = u.id
-
-        -- Modules in progress: has step records but no final lesson completion key
-        LEFT JOIN (
-            SELECT t.user_id, COUNT(*) AS modules_in_progress
-            FROM (
-                SELECT DISTINCT
-                    p.user_id,
-                    SUBSTR(p.item_key, 1, INSTR(p.item_key, ':step:') - 1) AS lesson_key
-                FROM progress p
-                WHERE p.item_key LIKE 'lesson:%:step:%'
-                  AND INSTR(p.item_key, ':step:') > 0
-            ) t
-            LEFT JOIN progress done
-              ON done.user_id = t.user_id
-             AND done.item_key = t.lesson_key
-            WHERE done.item_key IS NULL
-            GROUP BY t.user_id
-        ) lp ON lp.user_id = u.id
-
-        -- Quiz attempts and overall avg %
-        LEFT JOIN (
-            SELECT
-                user_id,
-                COUNT(*) AS quizzes_attempted,
-                AVG(CAST(best_score AS REAL) / NULLIF(total, 0)) * 100.0 AS overall_pct
-            FROM quiz_attempts
-            GROUP BY user_id
-        ) qa ON qa.user_id = u.id
-
-        -- Quiz passes using threshold
-        LEFT JOIN (
+        FROM (
             SELECT
-                user_id,
-                COUNT(*) AS quizzes_passed
-            FROM quiz_attempts
-            WHERE (CASE WHEN total > 0 THEN (CAST(best_score AS REAL) / total) * 100.0 ELSE 0 END) >= ?
-            GROUP BY user_id
-        ) qp ON qp.user_id = u.id
+                u.id AS user_id,
+                u.username,
+                u.email,
+                u.created_at,
+                COALESCE(s.lessons_completed, 0) AS modules_completed,
+                COALESCE(s.modules_in_progress, 0) AS modules_in_progress,
+                COALESCE(s.quizzes_attempted, 0) AS quizzes_attempted,
+                {passed_sql} AS quizzes_passed,
+                ROUND(COALESCE(s.overall_pct, 0), 1) AS overall_pct
+            FROM users u
+            LEFT JOIN user_summary s ON s.user_id = u.id
     """
 
-    params: list[object] = [lessons_total, quizzes_total, pass_pct]
+    params: list[object] = [lessons_total, quizzes_total] + passed_params
 
     if user_id:
         sql += " WHERE u.id = ?"
         params.append(user_id)
 
-    sql += " ORDER BY u.id DESC LIMIT ?"
+    sql += " ORDER BY u.id DESC LIMIT ?) ORDER BY user_id DESC"
     params.append(limit)
 
     with _connect_education_db() as conn:
@@ -1912,7 +2007,8 @@ def admin_api_user_full_details(user_id):
     """
     _require_admin_token()
 
-    completed_items = education_store.get_completed_items(int(user_id))
+    snapshot = _progress_snapshot(int(user_id))
+    completed_items = snapshot.completed_items
 
     # --- Lessons ---
     lesson_titles = {item.key: item.title for item in _LESSON_ITEMS}
@@ -1922,10 +2018,7 @@ def admin_api_user_full_details(user_id):
     for item in _LESSON_ITEMS:
         required_steps = _TRACKED_LESSON_STEP_COUNTS.get(item.key)
         if required_steps:
-            steps_done = sum(
-                1 for s in range(1, required_steps + 1)
-                if _lesson_step_progress_key(item.key, s) in completed_items
-            )
+            steps_done = snapshot.lesson_steps_done(item.key)
             if steps_done == required_steps:
                 completed_lessons.append(item.title)
             elif steps_done > 0:
@@ -2029,6 +2122,7 @@ def admin_api_delete_user(user_id):
     """Delete a user and all related data"""
     _require_admin_token()
     success = education_store.delete_user(user_id)
+    _invalidate_progress_snapshot(user_id)
     if success:
         return jsonify({"status": "deleted", "user_id": user_id})
     else:
@@ -2042,6 +2136,7 @@ def admin_api_bulk_delete_users():
     data = request.json
     user_ids = data.get("user_ids", [])
     result = education_store.bulk_delete_users(user_ids)
+    g.pop("_progress_snapshots", None)
     return jsonify(result)
 
 
@@ -2050,6 +2145,7 @@ def admin_api_reset_user_progress(user_id):
     """Reset user progress"""
     _require_admin_token()
     education_store.reset_user_progress(user_id)
+    _invalidate_progress_snapshot(user_id)
     return jsonify({"status": "progress_reset", "user_id": user_id})
 
 
@@ -2155,11 +2251,179 @@ def admin_api_module_progress_statistics():
 
 # ============= FUNDAMENTAL CONCEPTS ROUTES =============
 
+# Rendered lesson step cards and outlines, keyed by content version, lesson key
+# and template version, so entries never go stale; the TTL only bounds memory
+# for lessons nobody visits. LESSON_FRAGMENT_CACHE_MAX=0 disables caching.
+lesson_fragments = ResultCache(
+    max_entries=int(os.getenv("LESSON_FRAGMENT_CACHE_MAX", "256")),
+    ttl_seconds=float(os.getenv("LESSON_FRAGMENT_CACHE_TTL_SECONDS", str(24 * 3600))),
+)
+
+# Every template that contributes bytes to a lesson page.
+_LESSON_PAGE_TEMPLATES = (
+    "education/fundamentals.html",
+    "education/_lesson_step.html",
+    "_favicon.html",
+    "_site_footer.html",
+)
+_lesson_template_versions: dict[tuple, str] = {}
+
+# Lesson pages behind @login_required; the step API applies the same gate.
+_LOGIN_REQUIRED_LESSONS = frozenset(f"lesson:fundamentals-{n}" for n in range(6, 11))
+
+# Step URLs carry the content version, so browsers may keep them for a year.
+_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def _lesson_template_version() -> str:
+    """Hash of the lesson templates' sources, recomputed only when a file's mtime moves."""
+    env = current_app.jinja_env
+    files = [env.get_template(name).filename for name in _LESSON_PAGE_TEMPLATES]
+    stamp = tuple((path, os.stat(path).st_mtime_ns) for path in files)
+    version = _lesson_template_versions.get(stamp)
+    if version is None:
+        h = hashlib.sha256()
+        for path in files:
+            with open(path, "rb") as fh:
+                h.update(fh.read())
+        version = h.hexdigest()[:16]
+        _lesson_template_versions.clear()
+        _lesson_template_versions[stamp] = version
+    return version
+
+
+def _lesson_version() -> str:
+    """Short version id covering lesson content and templates; used in step URLs."""
+    raw = f"{lesson_content.manifest()['source_sha256']}:{_lesson_template_version()}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _lesson_outline(lesson_key: str, version: str) -> dict:
+    """Module header plus the visible steps (sections the page shows) of a lesson."""
+
+    def _build() -> dict:
+        content = lesson_content.module(_LESSON_CONTENT_NAMES[lesson_key])
+        steps = [
+            {"section": i, "title": s["title"], "page_break": bool(s.get("page_break"))}
+            for i, s in enumerate(content.get("sections", []))
+            if s.get("title") and s["title"].strip().lower() != "contents"
+        ]
+        return {
+            "module_title": content.get("module_title"),
+            "module_subtitle": content.get("module_subtitle"),
+            "steps": steps,
+        }
+
+    key = make_key("lesson-fragment", {"version": version, "lesson": lesson_key, "part": "outline"})
+    return lesson_fragments.get_or_compute(key, _build)
+
+
+def _lesson_step_html(lesson_key: str, version: str, step: int) -> str:
+    """Rendered card for 1-based `step` of a lesson."""
+
+    def _build() -> str:
+        section_index = _lesson_outline(lesson_key, version)["steps"][step - 1]["section"]
+        section = lesson_content.section(_LESSON_CONTENT_NAMES[lesson_key], section_index)
+        return render_template("education/_lesson_step.html", section=section)
+
+    key = make_key("lesson-fragment", {"version": version, "lesson": lesson_key, "step": step})
+    return lesson_fragments.get_or_compute(key, _build)
+
+
+def _requested_step_index(step_count: int) -> int:
+    """0-based step from ?step=, clamped the same way lesson_pager.js does."""
+    try:
+        step = int(request.args.get("step", "1"))
+    except ValueError:
+        return 0
+    return max(0, min(step - 1, step_count - 1))
+
+
+def _render_lesson_page(lesson_key: str, continue_card: dict) -> Response:
+    """Render a fundamentals lesson shell with only the requested step inline.
+
+    Other steps are placeholders that lesson_pager.js fills from
+    `api_lesson_step_content` (``?full=1`` inlines every step, e.g. for
+    printing). The strong ETag covers every input to the page (versions, the
+    step shown, the session fields the header shows and the continue card), so
+    a matching If-None-Match is answered with 304 before anything is rendered.
+    """
+    version = _lesson_version()
+    outline = _lesson_outline(lesson_key, version)
+    full = request.args.get("full") == "1"
+    # The continue card is the last step and is always inline.
+    current = _requested_step_index(len(outline["steps"]) + 1)
+    viewer = {
+        "user_id": session.get("edu_user_id"),
+        "username": session.get("edu_username"),
+        "avatar": session.get("edu_avatar"),
+    }
+    etag = make_key("lesson-page", {
+        "version": version,
+        "lesson": lesson_key,
+        "step": None if full else current,
+        "viewer": viewer,
+        "continue_card": continue_card,
+    }).split(":", 1)[1]
+
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        slug = lesson_key.split(":", 1)[1]
+        steps = []
+        for i, step in enumerate(outline["steps"]):
+            inline = full or i == current
+            steps.append({
+                "title": step["title"],
+                "page_break": step["page_break"],
+                "src": url_for("education.api_lesson_step_content", lesson_slug=slug, version=version, step=i + 1),
+                "html": Markup(_lesson_step_html(lesson_key, version, i + 1)) if inline else None,
+            })
+        response = make_response(render_template(
+            "education/fundamentals.html",
+            content={"module_title": outline["module_title"], "module_subtitle": outline["module_subtitle"]},
+            lesson_steps=steps,
+            continue_card=continue_card,
+            lesson_key=lesson_key,
+        ))
+    response.set_etag(etag)
+    # Per-user page: browsers may keep it but must revalidate every time.
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@education_bp.route("/api/lessons/<lesson_slug>/<version>/steps/<int:step>")
+def api_lesson_step_content(lesson_slug: str, version: str, step: int):
+    """One rendered lesson step card, at a URL that is immutable per version."""
+    lesson_key = f"lesson:{lesson_slug}"
+    if lesson_key not in _LESSON_CONTENT_NAMES:
+        return jsonify({"error": "unknown_lesson"}), 404
+    gated = lesson_key in _LOGIN_REQUIRED_LESSONS
+    if gated and not session.get("edu_user_id"):
+        return jsonify({"error": "login_required"}), 401
+
+    current = _lesson_version()
+    if version != current:
+        # Old page after a deploy or content edit: point at today's copy.
+        response = redirect(url_for("education.api_lesson_step_content", lesson_slug=lesson_slug, version=current, step=step))
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    if not 1 <= step <= len(_lesson_outline(lesson_key, version)["steps"]):
+        return jsonify({"error": "invalid_step"}), 404
+
+    response = make_response(_lesson_step_html(lesson_key, version, step))
+    response.mimetype = "text/html"
+    response.set_etag(f"{version}-{step}")
+    response.headers["Cache-Control"] = (
+        f"{'private' if gated else 'public'}, max-age={_IMMUTABLE_MAX_AGE}, immutable"
+    )
+    return response.make_conditional(request)
+
+
 @education_bp.route('/fundamentals')
 def fundamentals():
     """Main fundamentals page"""
-    content = LithiumBatteryFundamentals.MODULE_1_FUNDAMENTALS
-
     continue_card = {
         "step_title": "Continue Learning",
         "title": "📚 Next steps",
@@ -2177,19 +2441,12 @@ def fundamentals():
             },
         ],
     }
-    return render_template(
-        'education/fundamentals.html',
-        content=content,
-        continue_card=continue_card,
-        lesson_key="lesson:fundamentals",
-    )
+    return _render_lesson_page("lesson:fundamentals", continue_card)
 
 
 @education_bp.route('/fundamentals/module-2')
 def fundamentals_module2():
     """Fundamentals Module 2: Electrical Fundamentals"""
-    content = LithiumBatteryFundamentals.MODULE_2_ELECTRICAL_FUNDAMENTALS
-
     continue_card = {
         "step_title": "Continue Learning",
         "title": "📚 Continue to Module 2 Assessment Quiz (Electrical Fundamentals)",
@@ -2207,21 +2464,12 @@ def fundamentals_module2():
             },
         ],
     }
-    return render_template(
-        'education/fundamentals.html',
-        content=content,
-        continue_card=continue_card,
-        lesson_key="lesson:fundamentals-2",
-    )
+    return _render_lesson_page("lesson:fundamentals-2", continue_card)
 
 
 @education_bp.route('/fundamentals/module-3')
 def fundamentals_module3():
     """Fundamentals Module 3: Battery Fundamentals"""
-    # Reload in-process module so template always reflects latest content edits
-    # without requiring a server restart during content authoring.
-    content = importlib.reload(lithium_education_module).MODULE_3_BATTERY_FUNDAMENTALS
-
     continue_card = {
         "step_title": "Continue Learning",
         "title": "📚 Continue to Module 3 Assessment Quiz (Battery Fundamentals)",
@@ -2239,19 +2487,12 @@ def fundamentals_module3():
             },
         ],
     }
-    return render_template(
-        'education/fundamentals.html',
-        content=content,
-        continue_card=continue_card,
-        lesson_key="lesson:fundamentals-3",
-    )
+    return _render_lesson_page("lesson:fundamentals-3", continue_card)
 
 
 @education_bp.route('/fundamentals/module-4')
 def fundamentals_module4():
     """Fundamentals Module 4: Battery Management System (BMS)"""
-    content = MODULE_4_BMS
-
     continue_card = {
         "step_title": "Continue Learning",
         "title": "📚 Continue to Module 4 Assessment Quiz (Battery Management System)",
@@ -2269,19 +2510,12 @@ def fundamentals_module4():
             },
         ],
     }
-    return render_template(
-        'education/fundamentals.html',
-        content=content,
-        continue_card=continue_card,
-        lesson_key="lesson:fundamentals-4",
-    )
+    return _render_lesson_page("lesson:fundamentals-4", continue_card)
 
 
 @education_bp.route('/fundamentals/module-5')
 def fundamentals_module5():
     """Fundamentals Module 5: Energy System Design & Sizing"""
-    content = MODULE_5_ENERGY_SYSTEM_DESIGN
-
     continue_card = {
         "step_title": "Continue Learning",
         "title": "📚 Continue to Module 5 Assessment Quiz (Energy System Design & Sizing)",
@@ -2299,20 +2533,13 @@ def fundamentals_module5():
             },
         ],
     }
-    return render_template(
-        'education/fundamentals.html',
-        content=content,
-        continue_card=continue_card,
-        lesson_key="lesson:fundamentals-5",
-    )
+    return _render_lesson_page("lesson:fundamentals-5", continue_card)
 
 
 @education_bp.route('/fundamentals/module-6')
 @login_required(message="Please log in to access this lesson.")
 def fundamentals_module6():
     """Fundamentals Module 6: Installation, Wiring & Integration"""
-    content = MODULE_6_INSTALLATION_WIRING
-
     continue_card = {
         "step_title": "Continue Learning",
         "title": "📚 Continue to Module 6 Assessment Quiz (Installation, Wiring & Integration)",
@@ -2330,20 +2557,13 @@ def fundamentals_module6():
             },
         ],
     }
-    return render_template(
-        'education/fundamentals.html',
-        content=content,
-        continue_card=continue_card,
-        lesson_key="lesson:fundamentals-6",
-    )
+    return _render_lesson_page("lesson:fundamentals-6", continue_card)
 
 
 @education_bp.route('/fundamentals/module-7')
 @login_required(message="Please log in to access this lesson.")
 def fundamentals_module7():
     """Fundamentals Module 7: System Configuration, Communication & Firmware"""
-    content = MODULE_7_SYSTEM_CONFIG
-
     continue_card = {
         "step_title": "Continue Learning",
         "title": "📚 Continue to Module 7 Assessment Quiz (System Configuration, Communication & Firmware)",
@@ -2361,20 +2581,13 @@ def fundamentals_module7():
             },
         ],
     }
-    return render_template(
-        'education/fundamentals.html',
-        content=content,
-        continue_card=continue_card,
-        lesson_key="lesson:fundamentals-7",
-    )
+    return _render_lesson_page("lesson:fundamentals-7", continue_card)
 
 
 @education_bp.route('/fundamentals/module-8')
 @login_required(message="Please log in to access this lesson.")
 def fundamentals_module8():
     """Fundamentals Module 8: Monitoring, Optimisation, Troubleshooting & Fault Finding"""
-    content = MODULE_8_MONITORING_TROUBLESHOOTING
-
     continue_card = {
         "step_title": "Continue Learning",
         "title": "📚 Continue to Module 8 Assessment Quiz (Monitoring, Troubleshooting & Maintenance)",
@@ -2392,20 +2605,13 @@ def fundamentals_module8():
             },
         ],
     }
-    return render_template(
-        'education/fundamentals.html',
-        content=content,
-        continue_card=continue_card,
-        lesson_key="lesson:fundamentals-8",
-    )
+    return _render_lesson_page("lesson:fundamentals-8", continue_card)
 
 
 @education_bp.route('/fundamentals/module-9')
 @login_required(message="Please log in to access this lesson.")
 def fundamentals_module9():
     """Fundamentals Module 9: REVOV Ecosystem and Product Range"""
-    content = MODULE_9_ECOSYSTEM_AND_PRODUCT_RANGE
-
     continue_card = {
         "step_title": "Continue Learning",
         "title": "📚 Explore REVOV Ecosystem & Product Range",
@@ -2419,20 +2625,13 @@ def fundamentals_module9():
             },
         ],
     }
-    return render_template(
-        'education/fundamentals.html',
-        content=content,
-        continue_card=continue_card,
-        lesson_key="lesson:fundamentals-9",
-    )
+    return _render_lesson_page("lesson:fundamentals-9", continue_card)
 
 
 @education_bp.route('/fundamentals/module-10')
 @login_required(message="Please log in to access this lesson.")
 def fundamentals_module10():
     """Fundamentals Module 10: Installer Guides and Resources"""
-    content = MODULE_10_INSTALLER_GUIDES_AND_RESOURCES
-
     continue_card = {
         "step_title": "Continue Learning",
         "title": "📚 Installer Guides & Best Practices",
@@ -2446,12 +2645,7 @@ def fundamentals_module10():
             },
         ],
     }
-    return render_template(
-        'education/fundamentals.html',
-        content=content,
-        continue_card=continue_card,
-        lesson_key="lesson:fundamentals-10",
-    )
+    return _render_lesson_page("lesson:fundamentals-10", continue_card)
 
 
 @education_bp.route('/chemistry')
@@ -2515,11 +2709,14 @@ def cell_simulator_page():
     return render_template('education/cell_simulator.html')
 
 
+_CELL_SIM_MAX_STEPS = 10_000
+
+
 @education_bp.route('/api/cell-simulator/discharge', methods=['POST'])
 @api_login_required
 def api_cell_discharge():
     """API: Simulate cell discharge"""
-    data = request.json
+    data = request.json or {}
     
     # Create cell
     cell = CellSpecifications(
@@ -2531,9 +2728,12 @@ def api_cell_discharge():
     )
     
     simulator = CellSimulator(cell)
-    result = simulator.discharge(
+    result = simulator.simulate_discharge(
         current_a=float(data.get('current_a', 1.0)),
-        duration_hours=float(data.get('duration_hours', 1.0))
+        duration_hours=float(data.get('duration_hours', 1.0)),
+        steps=min(_CELL_SIM_MAX_STEPS, max(1, int(data.get('steps', 120)))),
+        ambient_temp_c=float(data.get('ambient_temp_c', 25.0)),
+        include_trace=bool(data.get('include_trace', False)),
     )
     
     return jsonify(result)
@@ -2546,12 +2746,26 @@ def pack_simulator_page():
     return render_template('education/pack_simulator.html')
 
 
-@education_bp.route('/api/pack-simulator/discharge', methods=['POST'])
-@api_login_required
-def api_pack_discharge():
-    """API: Simulate pack discharge"""
-    data = request.json
-    
+# Upper bounds for the array-backed pack simulator API.
+_PACK_SIM_MAX_CELLS = 200_000
+_PACK_SIM_MAX_STEPS = 1_000
+
+# Packs kept between requests (`keep_session` / `session_id`). Set
+# SIM_SESSION_SQLITE to snapshot sessions so they survive worker restarts.
+sim_sessions = SimulationSessionStore(
+    max_sessions=int(os.environ.get("SIM_SESSION_MAX", "64")),
+    max_bytes=int(float(os.environ.get("SIM_SESSION_MAX_MB", "64")) * 1024 * 1024),
+    idle_ttl_seconds=float(os.environ.get("SIM_SESSION_IDLE_TTL_SECONDS", "1800")),
+    sqlite_path=(os.environ.get("SIM_SESSION_SQLITE") or "").strip() or None,
+)
+
+
+def _pack_simulator_from_request(data: dict):
+    """Build the pack simulator described by a pack-simulator API payload.
+
+    Payloads with `series_cells`/`parallel_cells` get the array-backed SxP
+    model; legacy payloads with only `num_cells` keep the original simulator.
+    """
     cell = CellSpecifications(
         nominal_voltage_v=float(data.get('nominal_voltage', 3.7)),
         capacity_mah=float(data.get('capacity_mah', 2000)),
@@ -2559,29 +2773,205 @@ def api_pack_discharge():
         min_voltage_v=float(data.get('min_voltage', 2.5)),
         max_voltage_v=float(data.get('max_voltage', 4.2))
     )
-    
-    pack = PackSimulator(
-        num_cells=int(data.get('num_cells', 4)),
-        cell_spec=cell
+
+    if data.get('series_cells') is None and data.get('parallel_cells') is None:
+        return PackSimulator(
+            num_cells=int(data.get('num_cells', 4)),
+            cell_spec=cell
+        )
+
+    series = int(data.get('series_cells') or 1)
+    parallel = int(data.get('parallel_cells') or 1)
+    if series < 1 or parallel < 1 or series * parallel > _PACK_SIM_MAX_CELLS:
+        raise ValueError(f"series_cells x parallel_cells must be between 1 and {_PACK_SIM_MAX_CELLS}")
+    return ArrayPackSimulator(
+        series_cells=series,
+        parallel_cells=parallel,
+        cell_spec=cell,
+        cell_ir_milliohm=float(data.get('cell_ir_milliohm', 50.0)),
+        initial_soc=float(data.get('initial_soc', 50.0)),
     )
-    
+
+
+@education_bp.route('/api/pack-simulator/discharge', methods=['POST'])
+@api_login_required
+def api_pack_discharge():
+    """API: Simulate pack discharge.
+
+    `session_id` continues discharging a pack kept from an earlier call;
+    `keep_session: true` keeps this pack and returns its `session_id`.
+    """
+    data = request.json or {}
+    user_id = int(session.get("edu_user_id") or 0)
+    steps = min(_PACK_SIM_MAX_STEPS, max(1, int(data.get('steps', 60))))
+    pack_current_a = float(data.get('pack_current_a', 4.0))
+    duration_hours = float(data.get('duration_hours', 1.0))
+
+    session_id = str(data.get('session_id') or '').strip()
+    if session_id:
+        with sim_sessions.checkout(session_id, user_id) as pack:
+            if pack is None:
+                return jsonify({"error": "unknown_session"}), 404
+            result = pack.discharge_pack(pack_current_a, duration_hours, steps=steps)
+        result['session_id'] = session_id
+        return jsonify(result)
+
+    keep_session = bool(data.get('keep_session', False))
+    if keep_session and data.get('series_cells') is None and data.get('parallel_cells') is None:
+        data = dict(data, series_cells=data.get('num_cells', 4), parallel_cells=1)
+    try:
+        pack = _pack_simulator_from_request(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     if data.get('introduce_imbalance', False):
-        pack.introduce_imbalance()
-    
+        if isinstance(pack, ArrayPackSimulator):
+            pack.introduce_imbalance(
+                capacity_spread=float(data.get('capacity_spread', 0.0)),
+                ir_spread=float(data.get('ir_spread', 0.0)),
+                seed=(int(data['seed']) if data.get('seed') is not None else None),
+            )
+        else:
+            pack.introduce_imbalance()
+
+    kwargs = {}
+    if isinstance(pack, ArrayPackSimulator):
+        kwargs['steps'] = steps
     result = pack.discharge_pack(
-        pack_current_a=float(data.get('pack_current_a', 4.0)),
-        duration_hours=float(data.get('duration_hours', 1.0))
+        pack_current_a=pack_current_a,
+        duration_hours=duration_hours,
+        **kwargs
     )
-    
+
+    if keep_session:
+        try:
+            result['session_id'] = sim_sessions.create(user_id, pack)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
     return jsonify(result)
 
 
+@education_bp.route('/api/pack-simulator/sessions/<session_id>', methods=['DELETE'])
+@api_login_required
+def api_pack_session_delete(session_id: str):
+    """API: Discard a kept pack simulation"""
+    if not sim_sessions.delete(session_id, int(session.get("edu_user_id") or 0)):
+        return jsonify({"error": "unknown_session"}), 404
+    return jsonify({"ok": True})
+
+
 @education_bp.route('/api/pack-simulator/health', methods=['POST'])
 @api_login_required
 def api_pack_health():
     """API: Get pack health assessment"""
-    data = request.json
+    data = request.json or {}
+
+    session_id = str(data.get('session_id') or '').strip()
+    if session_id:
+        with sim_sessions.checkout(session_id, int(session.get("edu_user_id") or 0)) as pack:
+            if pack is None:
+                return jsonify({"error": "unknown_session"}), 404
+            health = pack.get_pack_health()
+        health['session_id'] = session_id
+        return jsonify(health)
+
+    try:
+        pack = _pack_simulator_from_request(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
+    health = pack.get_pack_health()
+    return jsonify(health)
+
+
+# Streaming variants keep memory flat, so they accept far more steps, but
+# CPU still grows with cells x steps: one stream gets at most
+# _STREAM_MAX_CELL_STEPS of them (a single cell 1M steps, a 200k-cell pack
+# 100). A step skipped by `every` is still reported as a progress frame
+# once _STREAM_PROGRESS_SECONDS pass without output, so the client keeps
+# throttling the simulation and a disconnect is noticed.
+_STREAM_MAX_STEPS = 1_000_000
+_STREAM_MAX_CELL_STEPS = 20_000_000
+_STREAM_PROGRESS_SECONDS = 1.0
+
+
+def _simulator_payload() -> dict:
+    """JSON body for POST, query string for GET (EventSource can only GET)."""
+    if request.method == 'POST':
+        return request.get_json(silent=True) or {}
+    return simulator_query_payload(request.args.to_dict())
+
+
+def simulator_query_payload(data: dict) -> dict:
+    """Coerce the boolean flags of a query-string simulator payload."""
+    for key in ('introduce_imbalance', 'include_trace'):
+        if key in data:
+            data[key] = data[key].strip().lower() in {"1", "true", "yes", "on"}
+    return data
+
+
+def frame_chunks(frames, *, total_steps: int, every: int = 1, sse: bool = False,
+                 progress_seconds: float = _STREAM_PROGRESS_SECONDS):
+    """Encode simulator frames as NDJSON lines or SSE messages, thinning steps.
+
+    A thinned-out step becomes a small ``"progress"`` frame when nothing has
+    been sent for `progress_seconds`.
+    """
+    last_sent = time.monotonic()
+    for frame in frames:
+        if frame['type'] == 'step' and frame['step'] % every and frame['step'] != total_steps:
+            if time.monotonic() - last_sent < progress_seconds:
+                continue
+            frame = {'type': 'progress', 'step': frame['step'], 'total_steps': total_steps}
+        payload = json.dumps(frame, separators=(',', ':'))
+        if sse:
+            yield f"event: {frame['type']}\ndata: {payload}\n\n"
+        else:
+            yield payload + "\n"
+        last_sent = time.monotonic()
+
+
+def _stream_frames(frames, *, total_steps: int, every: int = 1) -> Response:
+    """Stream simulator frames as NDJSON (default) or server-sent events.
+
+    `frames` is consumed lazily: the WSGI server only pulls the next frame
+    after the previous chunk has been written, so a slow client throttles
+    the simulation instead of frames piling up in memory. `every` thins step
+    frames (the final step and the summary are always sent).
+    """
+    fmt = (request.args.get('format') or '').strip().lower()
+    sse = fmt == 'sse' or (not fmt and 'text/event-stream' in (request.headers.get('Accept') or ''))
+    resp = Response(stream_with_context(frame_chunks(frames, total_steps=total_steps, every=every, sse=sse)),
+                    mimetype='text/event-stream' if sse else 'application/x-ndjson')
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+
+def _stream_options(data: dict, default_steps: int, cells: int = 1) -> tuple[int, int]:
+    max_steps = max(1, min(_STREAM_MAX_STEPS, _STREAM_MAX_CELL_STEPS // max(1, cells)))
+    steps = min(max_steps, max(1, int(data.get('steps', default_steps))))
+    every = max(1, int(data.get('every', 1)))
+    return steps, every
+
+
+@education_bp.route('/api/cell-simulator/discharge/stream', methods=['GET', 'POST'])
+@api_login_required
+def api_cell_discharge_stream():
+    """API: Stream a cell discharge one time step at a time"""
+    try:
+        frames, steps, every = cell_discharge_frames(_simulator_payload())
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    return _stream_frames(frames, total_steps=steps, every=every)
+
+
+def cell_discharge_frames(data: dict):
+    """Lazy cell discharge frames for a stream payload: (frames, steps, every).
+
+    Raises ValueError/TypeError for malformed numbers. Shared with the asyncio stream server (`stream_server.py`).
+    """
     cell = CellSpecifications(
         nominal_voltage_v=float(data.get('nominal_voltage', 3.7)),
         capacity_mah=float(data.get('capacity_mah', 2000)),
@@ -2589,14 +2979,55 @@ def api_pack_health():
         min_voltage_v=float(data.get('min_voltage', 2.5)),
         max_voltage_v=float(data.get('max_voltage', 4.2))
     )
-    
-    pack = PackSimulator(
-        num_cells=int(data.get('num_cells', 4)),
-        cell_spec=cell
+    steps, every = _stream_options(data, 120)
+    frames = CellSimulator(cell).iter_discharge(
+        current_a=float(data.get('current_a', 1.0)),
+        duration_hours=float(data.get('duration_hours', 1.0)),
+        steps=steps,
+        ambient_temp_c=float(data.get('ambient_temp_c', 25.0)),
     )
-    
-    health = pack.get_pack_health()
-    return jsonify(health)
+    return frames, steps, every
+
+
+@education_bp.route('/api/pack-simulator/discharge/stream', methods=['GET', 'POST'])
+@api_login_required
+def api_pack_discharge_stream():
+    """API: Stream a pack discharge one time step at a time.
+
+    Always uses the array-backed model; a legacy `num_cells` payload is
+    treated as a single series string.
+    """
+    try:
+        frames, steps, every = pack_discharge_frames(_simulator_payload())
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    return _stream_frames(frames, total_steps=steps, every=every)
+
+
+def pack_discharge_frames(data: dict):
+    """Lazy pack discharge frames for a stream payload: (frames, steps, every).
+
+    Raises ValueError for an invalid pack size or malformed numbers. `steps`
+    is capped so cells x steps stays within _STREAM_MAX_CELL_STEPS. Shared
+    with the asyncio stream server (`stream_server.py`).
+    """
+    if data.get('series_cells') is None and data.get('parallel_cells') is None:
+        data = dict(data, series_cells=data.get('num_cells', 4), parallel_cells=1)
+    pack = _pack_simulator_from_request(data)
+
+    if data.get('introduce_imbalance', False):
+        pack.introduce_imbalance(
+            capacity_spread=float(data.get('capacity_spread', 0.0)),
+            ir_spread=float(data.get('ir_spread', 0.0)),
+            seed=(int(data['seed']) if data.get('seed') is not None else None),
+        )
+    steps, every = _stream_options(data, 60, cells=pack.num_cells)
+    frames = pack.iter_discharge(
+        pack_current_a=float(data.get('pack_current_a', 4.0)),
+        duration_hours=float(data.get('duration_hours', 1.0)),
+        steps=steps,
+    )
+    return frames, steps, every
 
 
 # ============= CALCULATORS ROUTES =============
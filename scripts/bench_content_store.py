@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Benchmark lesson content loading: importing the source module vs the content store.
+
+Usage:
+    python scripts/bench_content_store.py [--repeat 5]
+
+Each measurement runs in a fresh interpreter so import cost and peak RSS are
+not hidden by modules that are already loaded. Both sides pre-import numpy
+and the stdlib modules the app loads anyway, so the numbers isolate lesson
+content.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Add project root to path so we can import modules
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules import content_store
+
+_PROBE = """
+import hashlib, json, os, pathlib, resource, sys, tempfile, time
+sys.path.insert(0, {root!r})
+import numpy
+
+def rss_kb():
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+rss0 = rss_kb()
+t0 = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"seconds": elapsed, "rss_kb": rss_kb() - rss0}}))
+"""
+
+_CASES = {
+    "import lithium_education": (
+        "import modules.lithium_education as m\n"
+        "steps = len(m.MODULE_4_BMS['sections'])"
+    ),
+    "content store: step counts": (
+        "from modules.content_store import lesson_content\n"
+        "steps = [lesson_content.section_count(n) for n in lesson_content.names()]"
+    ),
+    "content store: one module": (
+        "from modules.content_store import lesson_content\n"
+        "steps = lesson_content.module('MODULE_4_BMS')"
+    ),
+}
+
+
+def _run(body: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(root=ROOT, body=body)],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    content_store.build_artifacts()
+    # Warm the bytecode cache so the import case is not charged for compiling.
+    _run(_CASES["import lithium_education"])
+
+    print(f"Fresh-interpreter startup, best of {args.repeat}")
+    for name, body in _CASES.items():
+        runs = [_run(body) for _ in range(args.repeat)]
+        seconds = min(r["seconds"] for r in runs)
+        rss_kb = min(r["rss_kb"] for r in runs)
+        print(f"  {name:<28} {seconds * 1e3:8.1f} ms  +{rss_kb / 1024:6.1f} MB RSS")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
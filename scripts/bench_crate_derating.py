@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Benchmark C-rate derating: legacy dict lookup, per-point scalar calls, one vectorised call.
+
+"legacy loop" is a frozen copy of the dict-lookup get_capacity_derating that
+predates the interpolated curves (it returns a flat 0.95 between 0.2C and 5C,
+so only its timing is comparable). "scalar loop" calls today's np.interp-backed
+wrapper once per point.
+
+Usage:
+    python scripts/bench_crate_derating.py [--points 100000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+# Add project root to path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from modules.battery_concepts import CRate, CellChemistry
+
+
+def legacy_get_capacity_derating(crate: float, chemistry: CellChemistry) -> float:
+    """Frozen copy of the pre-interpolation CRate.get_capacity_derating."""
+    # Higher C-rates result in lower available capacity
+    crate_derating = {
+        CellChemistry.LI_ION: {
+            0.2: 1.0,
+            0.5: 0.98,
+            1.0: 0.95,
+            2.0: 0.90,
+            5.0: 0.75
+        },
+        CellChemistry.LIFEPO4: {
+            0.2: 1.0,
+            0.5: 0.99,
+            1.0: 0.98,
+            2.0: 0.96,
+            5.0: 0.88
+        }
+    }
+
+    rates = crate_derating.get(chemistry, {})
+    if crate <= 0.2:
+        return rates.get(0.2, 1.0)
+    elif crate >= 5.0:
+        return rates.get(5.0, 0.7)
+    else:
+        # Linear interpolation between known points
+        return 0.95
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    crates = np.random.default_rng(0).uniform(0.0, 6.0, args.points)
+    crate_list = crates.tolist()
+    chem = CellChemistry.LI_ION
+
+    def legacy():
+        return [legacy_get_capacity_derating(c, chem) for c in crate_list]
+
+    def scalar():
+        return [CRate.get_capacity_derating(c, chem) for c in crate_list]
+
+    def vectorised():
+        return CRate.capacity_derating(crates, chem)
+
+    assert np.allclose(scalar(), vectorised())
+
+    print(f"{args.points:,} C-rate points, best of {args.repeat}")
+    results = {}
+    for name, fn in (("legacy loop", legacy), ("scalar loop", scalar), ("vectorised", vectorised)):
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        results[name] = best
+        print(f"  {name:<12} {best * 1e3:9.2f} ms  {best / args.points * 1e9:9.1f} ns/point")
+    for name in ("legacy loop", "scalar loop"):
+        print(f"  vectorised vs {name:<12} {results[name] / results['vectorised']:9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
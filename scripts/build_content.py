@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Compile lesson content into per-module JSON artifacts.
+
+Usage:
+    python scripts/build_content.py [--out build/lesson_content]
+
+Run at deploy time so web workers never import the lesson source module.
+"""
+
+import argparse
+import os
+import sys
+
+# Add project root to path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import content_store
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--out",
+        default=os.getenv("CONTENT_ARTIFACT_DIR") or str(content_store.DEFAULT_ARTIFACT_DIR),
+        help="artifact directory (default: CONTENT_ARTIFACT_DIR or build/lesson_content)",
+    )
+    args = parser.parse_args()
+
+    manifest = content_store.build_artifacts(content_store.DEFAULT_SOURCE_PATH, args.out)
+    total = sum(entry["bytes"] for entry in manifest["modules"].values())
+    print(f"Wrote {len(manifest['modules'])} modules ({total / 1024:.0f} KB) to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
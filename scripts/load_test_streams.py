@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Load test: hold thousands of /admin/events/stream connections on stream_server.py.
+
+Usage:
+    python scripts/load_test_streams.py [--streams 2000] [--events 20] [--idle 10]
+
+Starts the asyncio stream server in a subprocess against a throwaway SQLite
+database. It then opens --streams concurrent SSE connections and records
+--events events. It reports how long fan-out took to reach every stream,
+plus the server's memory, thread count and DB polls while all streams sit
+idle. It exits non-zero if any stream misses an event.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import secrets
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add project root to path so we can import modules
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _proc_usage(pid: int) -> dict:
+    usage = {}
+    with open(f"/proc/{pid}/status") as fh:
+        for line in fh:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "Threads"):
+                usage[key] = int(value.split()[0])
+    return {"rss_mb": round(usage.get("VmRSS", 0) / 1024, 1), "threads": usage.get("Threads")}
+
+
+async def _get_json(port: int, path: str, token: str) -> dict:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nX-Admin-Token: {token}\r\n\r\n".encode())
+    body = await reader.read()
+    writer.close()
+    return json.loads(body.partition(b"\r\n\r\n")[2])
+
+
+class Stream:
+    def __init__(self) -> None:
+        self.last_id = 0
+        self.seen_at: dict[int, float] = {}
+        self.heartbeats = 0
+        self.error = None
+
+    async def run(self, port: int, token: str, connected: asyncio.Semaphore, ready: list) -> None:
+        try:
+            async with connected:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(f"GET /admin/events/stream?token={token} HTTP/1.1\r\n\r\n".encode())
+                await writer.drain()
+                head = await reader.readuntil(b"\r\n\r\n")
+                if b" 200 " not in head.split(b"\r\n", 1)[0]:
+                    raise RuntimeError(head.split(b"\r\n", 1)[0].decode())
+            ready.append(self)
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                if line.startswith(b"id: "):
+                    self.last_id = int(line[4:])
+                    self.seen_at[self.last_id] = time.perf_counter()
+                elif line.startswith(b": keepalive"):
+                    self.heartbeats += 1
+        except asyncio.CancelledError:
+            writer.close()
+        except Exception as e:
+            self.error = repr(e)
+
+
+async def run(args: argparse.Namespace) -> int:
+    from modules import education_store
+
+    education_store.ensure_db()
+    education_store.record_event("load_test_start")
+    education_store.flush_events()
+
+    env = dict(os.environ, STREAM_SERVER_HOST="127.0.0.1", STREAM_SERVER_PORT=str(args.port))
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "stream_server.py")], env=env, cwd=ROOT)
+    try:
+        for _ in range(100):
+            try:
+                await _get_json(args.port, "/healthz", args.token)
+                break
+            except OSError:
+                await asyncio.sleep(0.1)
+        before = _proc_usage(server.pid)
+
+        streams = [Stream() for _ in range(args.streams)]
+        ready: list = []
+        gate = asyncio.Semaphore(args.connect_concurrency)
+        t0 = time.perf_counter()
+        tasks = [asyncio.ensure_future(s.run(args.port, args.token, gate, ready)) for s in streams]
+        while len(ready) + sum(1 for s in streams if s.error) < args.streams:
+            await asyncio.sleep(0.05)
+        connect_s = time.perf_counter() - t0
+        held = _proc_usage(server.pid)
+
+        sent_at = {}
+        first_id = education_store.latest_event_id() + 1
+        for i in range(args.events):
+            education_store.record_event("load_test", payload={"n": i})
+            education_store.flush_events()
+            sent_at[first_id + i] = time.perf_counter()
+            await asyncio.sleep(args.event_gap)
+        last_id = first_id + args.events - 1
+        deadline = time.perf_counter() + 30
+        while time.perf_counter() < deadline and any(s.last_id < last_id for s in ready):
+            await asyncio.sleep(0.05)
+
+        polls_before = (await _get_json(args.port, "/stats", args.token))["event_stream"]["polls"]
+        await asyncio.sleep(args.idle)
+        stats = await _get_json(args.port, "/stats", args.token)
+        idle = _proc_usage(server.pid)
+
+        latencies = [
+            (s.seen_at[i] - sent_at[i]) * 1000 for s in ready for i in sent_at if i in s.seen_at
+        ]
+        missed = sum(1 for s in ready if s.last_id < last_id)
+        errors = [s.error for s in streams if s.error]
+        report = {
+            "streams_requested": args.streams,
+            "streams_open": stats["open_streams"]["events"],
+            "connect_seconds": round(connect_s, 2),
+            "errors": len(errors),
+            "first_error": errors[0] if errors else None,
+            "events": args.events,
+            "streams_missing_events": missed,
+            "fanout_latency_ms": {
+                "p50": round(statistics.median(latencies), 1) if latencies else None,
+                "p99": round(statistics.quantiles(latencies, n=100)[98], 1) if len(latencies) > 1 else None,
+                "max": round(max(latencies), 1) if latencies else None,
+            },
+            "server_before": before,
+            "server_with_streams": held,
+            "server_after_idle": idle,
+            "rss_kb_per_stream": round((held["rss_mb"] - before["rss_mb"]) * 1024 / max(1, len(ready)), 2),
+            "db_polls_per_second_idle": round((stats["event_stream"]["polls"] - polls_before) / args.idle, 2),
+            "heartbeats_received": sum(s.heartbeats for s in ready),
+        }
+        print(json.dumps(report, indent=2))
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return 1 if errors or missed or report["streams_open"] < args.streams else 0
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--event-gap", type=float, default=0.05, help="seconds between recorded events")
+    parser.add_argument("--idle", type=float, default=10.0, help="seconds to hold idle streams at the end")
+    parser.add_argument("--connect-concurrency", type=int, default=500)
+    args = parser.parse_args()
+
+    # Client and server each need one descriptor per stream.
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    want = min(hard, max(soft, args.streams * 2 + 256))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (want, hard))
+
+    tmpdir = tempfile.mkdtemp(prefix="stream_load_")
+    args.port = _free_port()
+    args.token = secrets.token_hex(8)
+    os.environ.update({
+        "DATABASE_URL": os.path.join(tmpdir, "education.db"),
+        "ADMIN_STREAM_TOKEN": args.token,
+        "EVENT_WRITER_MODE": "sync",
+        "EVENT_STREAM_HEARTBEAT_SECONDS": os.environ.get("EVENT_STREAM_HEARTBEAT_SECONDS", "5"),
+        "EVENT_STREAM_POLL_SECONDS": os.environ.get("EVENT_STREAM_POLL_SECONDS", "0.25"),
+    })
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Run the PDF render dispatcher outside the web workers.
+
+Usage:
+    PDF_RENDER_MODE=external python scripts/pdf_worker.py
+
+Web workers then only queue jobs and answer status polls; this process holds
+the render lease and owns the process pool. Stop with Ctrl+C / SIGTERM.
+"""
+
+import os
+import signal
+import sys
+import threading
+
+# Add project root to path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["PDF_RENDER_MODE"] = "external"
+
+from app import pdf_queue  # noqa: E402  (configures the queue from env)
+
+
+def main() -> int:
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    pdf_queue.start()
+    print(f"PDF worker {pdf_queue.worker_id} watching {pdf_queue.db_path}")
+    try:
+        while not stop.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        pass
+    pdf_queue.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
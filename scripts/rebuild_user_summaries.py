@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Rebuild or check the materialized `user_summary` table.
+
+Usage:
+    python scripts/rebuild_user_summaries.py          # rebuild every row
+    python scripts/rebuild_user_summaries.py --check  # report drift only
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add project root to path so we can import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import education_store
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="compare against source tables without writing")
+    args = parser.parse_args()
+
+    if args.check:
+        report = education_store.check_user_summaries(limit=50)
+        print(json.dumps(report, indent=2))
+        return 1 if report["mismatch_count"] else 0
+
+    rows = education_store.rebuild_user_summaries()
+    print(f"Rebuilt {rows} user_summary rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
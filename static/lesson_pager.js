@@ -51,6 +51,35 @@
     if (prevBtn) prevBtn.textContent = prevLabel;
 
     var index = parseStepIndex(paramName, steps.length);
+    var pendingLoads = Object.create(null);
+
+    // Steps rendered as placeholders carry data-step-src: fetch the card on
+    // demand. URLs are versioned, so repeat visits come from the HTTP cache.
+    function ensureLoaded(i) {
+      var step = steps[i];
+      if (!step) return;
+      var src = step.getAttribute("data-step-src");
+      if (!src || pendingLoads[i]) return;
+
+      pendingLoads[i] = true;
+      step.setAttribute("aria-busy", "true");
+      fetch(src, { credentials: "same-origin" })
+        .then(function (resp) {
+          if (!resp.ok) throw new Error("HTTP " + resp.status);
+          return resp.text();
+        })
+        .then(function (html) {
+          step.innerHTML = html;
+          step.removeAttribute("data-step-src");
+          step.removeAttribute("aria-busy");
+          step.dispatchEvent(new CustomEvent("lesson:step-loaded", { bubbles: true }));
+        })
+        .catch(function () {
+          // Leave the placeholder (it links to ?step=N) and retry next time.
+          step.removeAttribute("aria-busy");
+          pendingLoads[i] = false;
+        });
+    }
 
     function trackCurrentStep() {
       if (!lessonKey || !progressEndpoint) return;
@@ -105,6 +134,8 @@
         }
       }
 
+      ensureLoaded(index);
+      ensureLoaded(index + 1);
       trackCurrentStep();
 
       if (stageEl) stageEl.scrollTop = 0;
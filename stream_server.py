@@ -0,0 +1,496 @@
+"""asyncio streaming service for the live event feed and simulator streams.
+
+High-level responsibilities
+--------------------------
+- Serve the long-lived endpoints of the Flask app from one event loop, so
+  an open stream costs a coroutine and a socket instead of a gunicorn
+  thread:
+  - ``GET /admin/events/stream``: the `user_events` SSE feed, with
+    Last-Event-ID resume, heartbeats and slow-consumer eviction.
+  - ``GET|POST /learn/api/cell-simulator/discharge/stream`` and
+    ``/learn/api/pack-simulator/discharge/stream``: simulator frames as
+    NDJSON or SSE.
+- Keep blocking work (SQLite reads, numpy simulation steps) on a small
+  thread pool, off the event loop.
+- Expose ``/healthz`` and token-protected ``/stats``.
+
+Notes
+-----
+- The paths and formats match the Flask routes, so a reverse proxy can send
+  these paths here and everything else to gunicorn. Run it standalone with
+  ``python stream_server.py``. Alternatively, set STREAM_SERVER_EMBED=1
+  and every gunicorn worker runs it in a background thread, sharing
+  STREAM_SERVER_PORT via SO_REUSEPORT.
+- Stdlib only: a minimal HTTP/1.1 reader, and every response is sent with
+  ``Connection: close``. No ASGI server is in requirements.txt, and
+  streaming does not need more than that.
+- Event fan-out reuses `EventBroadcaster`: its poller thread does the DB
+  reads, and `AsyncSubscription` wakes the loop when events arrive.
+- Learner streams authenticate with the Flask session cookie (same
+  SECRET_KEY) and honour the 24 h inactivity timeout, read-only.
+- Simulator frames are pulled from the generator `frames_per_hop` at a time
+  (or for at most `_HOP_SECONDS`) in the executor, then written with
+  `drain()`. A slow client still throttles the simulation, as in the WSGI
+  version.
+- Simulations run on their own executor, sized to the global simulator
+  stream cap, so they never hold the threads event subscriptions use.
+  Streams are also capped per user and ended after
+  `max_simulator_seconds`; the frame builders cap cells x steps.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http import HTTPStatus
+from http.cookies import SimpleCookie
+from typing import Any, Callable, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from flask import Flask
+from flask.sessions import SecureCookieSessionInterface
+
+from modules import education_store
+from modules.event_broadcaster import EventBroadcaster, Subscription, TooManySubscribers
+from routes.education_routes import (
+    INACTIVITY_TIMEOUT,
+    _parse_session_ts,
+    _utc_now,
+    cell_discharge_frames,
+    frame_chunks,
+    pack_discharge_frames,
+    simulator_query_payload,
+)
+
+log = logging.getLogger(__name__)
+
+_MAX_HEADER_BYTES = 16 * 1024
+_MAX_BODY_BYTES = 64 * 1024
+_REQUEST_TIMEOUT_SECONDS = 10.0
+
+
+class AsyncSubscription(Subscription):
+    """A broadcaster subscription that wakes an asyncio consumer."""
+
+    def __init__(self, broadcaster: EventBroadcaster, last_id: int, max_queue: int, *,
+                 loop: asyncio.AbstractEventLoop) -> None:
+        super().__init__(broadcaster, last_id, max_queue)
+        self._loop = loop
+        self._ready = asyncio.Event()
+
+    def _offer(self, events: list[dict[str, Any]]) -> bool:
+        ok = super()._offer(events)
+        # Called from the poller thread; the Event belongs to the loop.
+        self._loop.call_soon_threadsafe(self._ready.set)
+        return ok
+
+    async def next(self, timeout: float) -> list[dict[str, Any]]:
+        """Async `get`: everything queued, or [] after `timeout` (heartbeat)."""
+        if not self.queued and not self.evicted:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._ready.clear()
+        return self.get(0)
+
+
+# Upper bound on how long one executor hop pulls frames before handing the
+# batch back, so thinned streams still reach the socket (and notice a
+# disconnect) promptly.
+_HOP_SECONDS = 0.25
+
+
+def _take(chunks: Any, limit: int, max_seconds: float) -> list[str]:
+    """Up to `limit` chunks from `chunks`, stopping early after `max_seconds`."""
+    out: list[str] = []
+    started = time.monotonic()
+    for chunk in chunks:
+        out.append(chunk)
+        if len(out) >= limit or time.monotonic() - started >= max_seconds:
+            break
+    return out
+
+
+class _Request:
+    __slots__ = ("method", "path", "query", "headers", "body")
+
+    def __init__(self, method: str, path: str, query: dict[str, str], headers: dict[str, str], body: bytes):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+
+class _BadRequest(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class StreamService:
+    """Routes and connection handling for the asyncio stream server."""
+
+    def __init__(
+        self,
+        broadcaster: EventBroadcaster,
+        *,
+        secret_key: str,
+        heartbeat_seconds: float = 5.0,
+        max_stream_seconds: float = 0.0,
+        executor_workers: int = 8,
+        frames_per_hop: int = 64,
+        max_simulator_streams: int = 4,
+        max_simulator_streams_per_user: int = 2,
+        max_simulator_seconds: float = 300.0,
+    ) -> None:
+        self.broadcaster = broadcaster
+        self.heartbeat_seconds = float(heartbeat_seconds)
+        self.max_stream_seconds = float(max_stream_seconds)  # 0 = no limit
+        self.frames_per_hop = max(1, int(frames_per_hop))
+        self.max_simulator_streams = max(1, int(max_simulator_streams))
+        self.max_simulator_streams_per_user = max(1, int(max_simulator_streams_per_user))
+        self.max_simulator_seconds = float(max_simulator_seconds)  # 0 = no limit
+        self._executor = ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix="stream-io")
+        # Simulation steps get their own threads (one per allowed stream), so
+        # long simulations cannot starve event-stream subscriptions.
+        self._sim_executor = ThreadPoolExecutor(max_workers=self.max_simulator_streams,
+                                                thread_name_prefix="stream-sim")
+        self._sim_users: dict[int, int] = {}
+        session_app = Flask(__name__)
+        session_app.config["SECRET_KEY"] = secret_key
+        self._session_app = session_app
+        self._sessions = SecureCookieSessionInterface().get_signing_serializer(session_app)
+        self._open = {"events": 0, "simulator": 0}
+        self._counters = {"requests": 0, "rejected": 0, "client_gone": 0, "sim_timeouts": 0}
+        self._routes: dict[str, Callable] = {
+            "/admin/events/stream": self._events_stream,
+            "/learn/api/cell-simulator/discharge/stream": partial(self._simulator_stream, cell_discharge_frames),
+            "/learn/api/pack-simulator/discharge/stream": partial(self._simulator_stream, pack_discharge_frames),
+            "/healthz": self._healthz,
+            "/stats": self._stats,
+        }
+
+    # ---- HTTP plumbing ----
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> _Request:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), _REQUEST_TIMEOUT_SECONDS)
+        except asyncio.LimitOverrunError:
+            raise _BadRequest(431, "headers too large")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise _BadRequest(400, "malformed request line")
+        headers: dict[str, str] = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        url = urlsplit(target)
+        body = b""
+        length = int(headers.get("content-length") or 0)
+        if length > _MAX_BODY_BYTES:
+            raise _BadRequest(413, "body too large")
+        if length:
+            body = await asyncio.wait_for(reader.readexactly(length), _REQUEST_TIMEOUT_SECONDS)
+        return _Request(method.upper(), url.path, dict(parse_qsl(url.query)), headers, body)
+
+    @staticmethod
+    def _head(status: int, content_type: str, extra: Optional[dict[str, str]] = None) -> bytes:
+        lines = [
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            f"Content-Type: {content_type}",
+            "Connection: close",
+        ]
+        lines += [f"{k}: {v}" for k, v in (extra or {}).items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, body: dict[str, Any],
+                         extra: Optional[dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        writer.write(self._head(status, "application/json", {"Content-Length": str(len(payload)), **(extra or {})}))
+        writer.write(payload)
+        await writer.drain()
+
+    async def _start_stream(self, writer: asyncio.StreamWriter, content_type: str) -> None:
+        writer.write(self._head(200, content_type, {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}))
+        await writer.drain()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._counters["requests"] += 1
+        try:
+            try:
+                req = await self._read_request(reader)
+            except _BadRequest as e:
+                await self._send_json(writer, e.status, {"error": str(e)})
+                return
+            except (asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+                return
+            route = self._routes.get(req.path)
+            if route is None:
+                await self._send_json(writer, 404, {"error": "not_found"})
+                return
+            await route(req, writer)
+        except ConnectionError:
+            self._counters["client_gone"] += 1
+        except Exception:
+            log.exception("Stream request failed")
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _deadline(limit_seconds: float) -> float:
+        return time.monotonic() + limit_seconds if limit_seconds else float("inf")
+
+    # ---- auth ----
+
+    @staticmethod
+    def _admin_token_ok(req: _Request) -> bool:
+        expected = os.environ.get("ADMIN_STREAM_TOKEN", "")
+        provided = req.headers.get("x-admin-token") or req.query.get("token", "")
+        return bool(expected) and provided == expected
+
+    def _session_user_id(self, req: _Request) -> tuple[Optional[int], str]:
+        """(user id, error) from the Flask session cookie, read-only."""
+        cookie = SimpleCookie()
+        try:
+            cookie.load(req.headers.get("cookie", ""))
+        except Exception:
+            return None, "login_required"
+        morsel = cookie.get(self._session_app.config["SESSION_COOKIE_NAME"])
+        if morsel is None:
+            return None, "login_required"
+        try:
+            data = self._sessions.loads(
+                morsel.value, max_age=int(self._session_app.permanent_session_lifetime.total_seconds())
+            )
+        except Exception:
+            return None, "login_required"
+        user_id = data.get("edu_user_id")
+        if not user_id:
+            return None, "login_required"
+        last = _parse_session_ts(data.get("edu_last_activity_at"))
+        if last is not None and _utc_now() - last >= INACTIVITY_TIMEOUT:
+            return None, "session_expired_inactive"
+        return int(user_id), ""
+
+    # ---- routes ----
+
+    async def _healthz(self, req: _Request, writer: asyncio.StreamWriter) -> None:
+        await self._send_json(writer, 200, {"status": "ok"})
+
+    async def _stats(self, req: _Request, writer: asyncio.StreamWriter) -> None:
+        if not self._admin_token_ok(req):
+            await self._send_json(writer, 403, {"error": "forbidden"})
+            return
+        await self._send_json(writer, 200, self.stats())
+
+    async def _events_stream(self, req: _Request, writer: asyncio.StreamWriter) -> None:
+        if req.method != "GET":
+            await self._send_json(writer, 405, {"error": "method_not_allowed"})
+            return
+        if not self._admin_token_ok(req):
+            await self._send_json(writer, 403, {"error": "forbidden"})
+            return
+        try:
+            last_id = int(req.headers.get("last-event-id") or req.query.get("since", "0"))
+        except ValueError:
+            await self._send_json(writer, 400, {"error": "Last-Event-ID must be an integer"})
+            return
+
+        loop = asyncio.get_running_loop()
+        factory = partial(AsyncSubscription, loop=loop)
+        try:
+            # Replay may page through SQLite, so subscribe off the loop.
+            sub = await loop.run_in_executor(
+                self._executor, partial(self.broadcaster.subscribe, last_id, factory=factory)
+            )
+        except TooManySubscribers as e:
+            # A 200 with a retry delay, as in the Flask route: EventSource
+            # stops reconnecting after a non-200 response.
+            self._counters["rejected"] += 1
+            retry_ms = max(1000, int(self.heartbeat_seconds * 2000))
+            busy = {"error": "Too many open event streams", "open_streams": e.count, "retry_ms": retry_ms}
+            await self._start_stream(writer, "text/event-stream")
+            writer.write(f"retry: {retry_ms}\nevent: busy\ndata: {json.dumps(busy)}\n\n".encode())
+            await writer.drain()
+            return
+
+        self._open["events"] += 1
+        try:
+            await self._start_stream(writer, "text/event-stream")
+            writer.write(b"retry: 3000\n\n")
+            deadline = self._deadline(self.max_stream_seconds)
+            while time.monotonic() < deadline:
+                events = await sub.next(self.heartbeat_seconds)
+                if events:
+                    writer.write("".join(
+                        f"id: {ev['id']}\nevent: user_event\ndata: {json.dumps(ev, ensure_ascii=False)}\n\n"
+                        for ev in events
+                    ).encode("utf-8"))
+                if sub.evicted:
+                    writer.write(f"event: evicted\ndata: {json.dumps({'last_id': sub.last_id})}\n\n".encode())
+                    await writer.drain()
+                    return
+                if not events:
+                    writer.write(b": keepalive\n\n")
+                await writer.drain()
+        finally:
+            self._open["events"] -= 1
+            sub.close()
+
+    async def _simulator_stream(self, build: Callable, req: _Request, writer: asyncio.StreamWriter) -> None:
+        if req.method not in ("GET", "POST"):
+            await self._send_json(writer, 405, {"error": "method_not_allowed"})
+            return
+        user_id, error = self._session_user_id(req)
+        if not user_id:
+            await self._send_json(writer, 401, {"error": error})
+            return
+        if req.method == "POST":
+            try:
+                data = json.loads(req.body or b"{}") or {}
+            except ValueError:
+                data = {}
+        else:
+            data = simulator_query_payload(dict(req.query))
+
+        # Check and claim the slot with no await in between: the loop is
+        # single-threaded, so two requests cannot both take the last one.
+        if (self._open["simulator"] >= self.max_simulator_streams
+                or self._sim_users.get(user_id, 0) >= self.max_simulator_streams_per_user):
+            self._counters["rejected"] += 1
+            await self._send_json(writer, 429, {"error": "Too many open simulator streams"}, {"Retry-After": "10"})
+            return
+        self._open["simulator"] += 1
+        self._sim_users[user_id] = self._sim_users.get(user_id, 0) + 1
+        chunks = None
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                frames, steps, every = await loop.run_in_executor(self._sim_executor, build, data)
+            except (ValueError, TypeError) as e:
+                await self._send_json(writer, 400, {"error": str(e)})
+                return
+
+            fmt = (req.query.get("format") or "").strip().lower()
+            sse = fmt == "sse" or (not fmt and "text/event-stream" in req.headers.get("accept", ""))
+            chunks = frame_chunks(frames, total_steps=steps, every=every, sse=sse)
+            take = partial(_take, chunks, self.frames_per_hop, _HOP_SECONDS)
+
+            await self._start_stream(writer, "text/event-stream" if sse else "application/x-ndjson")
+            deadline = self._deadline(self.max_simulator_seconds)
+            while True:
+                if time.monotonic() >= deadline:
+                    self._counters["sim_timeouts"] += 1
+                    timeout = json.dumps({"type": "error", "error": "stream_time_limit"})
+                    writer.write((f"event: error\ndata: {timeout}\n\n" if sse else timeout + "\n").encode())
+                    await writer.drain()
+                    return
+                batch = await loop.run_in_executor(self._sim_executor, take)
+                if not batch:
+                    return
+                writer.write("".join(batch).encode("utf-8"))
+                await writer.drain()
+        finally:
+            self._open["simulator"] -= 1
+            left = self._sim_users.pop(user_id, 1) - 1
+            if left:
+                self._sim_users[user_id] = left
+            if chunks is not None:
+                try:
+                    chunks.close()
+                except ValueError:
+                    pass  # still running in the executor (loop shutting down)
+
+    # ---- lifecycle ----
+
+    async def start(self, host: str, port: int, *, reuse_port: bool = False) -> asyncio.AbstractServer:
+        return await asyncio.start_server(
+            self.handle, host, port, limit=_MAX_HEADER_BYTES, reuse_port=reuse_port or None, backlog=4096
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "open_streams": dict(self._open),
+            **self._counters,
+            "threads": threading.active_count(),
+            "event_stream": self.broadcaster.stats(),
+        }
+
+
+def build_service() -> StreamService:
+    """A `StreamService` configured from the same env vars as the Flask app."""
+    broadcaster = EventBroadcaster(
+        lambda after_id, limit: education_store.get_events_since(after_id, limit=limit),
+        education_store.latest_event_id,
+        poll_interval=float(os.getenv("EVENT_STREAM_POLL_SECONDS", "0.5")),
+        max_queue=int(os.getenv("EVENT_STREAM_MAX_QUEUE", "1000")),
+        max_replay=int(os.getenv("EVENT_STREAM_MAX_REPLAY", "1000")),
+        # Streams are cheap here; the WSGI cap does not apply.
+        max_subscribers=int(os.getenv("STREAM_SERVER_MAX_SUBSCRIBERS", "0")),
+    )
+    return StreamService(
+        broadcaster,
+        secret_key=os.environ.get("SECRET_KEY", "dev"),
+        heartbeat_seconds=float(os.getenv("EVENT_STREAM_HEARTBEAT_SECONDS", "5")),
+        executor_workers=int(os.getenv("STREAM_SERVER_THREADS", "8")),
+        max_simulator_streams=int(os.getenv("STREAM_SERVER_MAX_SIM_STREAMS", "4")),
+        max_simulator_streams_per_user=int(os.getenv("STREAM_SERVER_MAX_SIM_STREAMS_PER_USER", "2")),
+        max_simulator_seconds=float(os.getenv("STREAM_SERVER_MAX_SIM_SECONDS", "300")),
+    )
+
+
+def serve_in_thread(service: StreamService, host: str, port: int, *, reuse_port: bool = False
+                    ) -> tuple[threading.Thread, int]:
+    """Run `service` on its own event loop in a daemon thread; returns (thread, bound port)."""
+    ready: dict[str, Any] = {}
+    started = threading.Event()
+
+    def _run() -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            server = loop.run_until_complete(service.start(host, port, reuse_port=reuse_port))
+            ready["port"] = server.sockets[0].getsockname()[1]
+        except Exception as e:
+            ready["error"] = e
+            started.set()
+            return
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=_run, name="stream-server", daemon=True)
+    thread.start()
+    started.wait()
+    if "error" in ready:
+        raise ready["error"]
+    return thread, ready["port"]
+
+
+async def _main(host: str, port: int) -> None:
+    service = build_service()
+    server = await service.start(host, port)
+    log.info("Stream server listening on %s:%d", host, port)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_main(os.environ.get("STREAM_SERVER_HOST", "0.0.0.0"), int(os.environ.get("STREAM_SERVER_PORT", "5002"))))
+    except KeyboardInterrupt:
+        pass
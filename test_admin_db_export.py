@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Automated tests for keyset-paginated admin DB endpoints and exports."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from app import app
+from modules import education_store
+from routes import education_routes
+
+
+class AdminDbExportTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.admin_token = "test-admin-token"
+        os.environ["ADMIN_STREAM_TOKEN"] = self.admin_token
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._test_db = os.path.join(self._tmpdir.name, "education_test.db")
+        self._orig = (education_store.db_path, education_store._DB_READY)
+        education_store.db_path = lambda: self._test_db
+        education_store._DB_READY = False
+        education_store.ensure_db()
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+
+        self.users = [
+            education_store.create_user(f"user{i}", "password123", email=f"user{i}@example.com") for i in range(5)
+        ]
+        # Every progress row shares one timestamp, so only the tie-breaker keeps pages stable.
+        with sqlite3.connect(self._test_db) as conn:
+            conn.executemany(
+                "INSERT INTO progress (user_id, item_key, completed_at) VALUES (?, ?, '2026-01-01T00:00:00+00:00')",
+                [(u.id, f"hub:item-{n}") for u in self.users for n in range(3)],
+            )
+            conn.executemany(
+                "INSERT INTO user_events (user_id, type, payload, created_at) VALUES (?, 'test', '{}', '2026-01-01')",
+                [(self.users[0].id,)] * 25,
+            )
+
+    def tearDown(self) -> None:
+        education_store.db_path, education_store._DB_READY = self._orig
+        self._tmpdir.cleanup()
+
+    def _walk(self, path: str, limit: int) -> list[dict]:
+        rows: list[dict] = []
+        cursor = None
+        while True:
+            url = f"{path}?token={self.admin_token}&limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+            payload = self.client.get(url).get_json()
+            rows.extend(payload["rows"])
+            cursor = payload["next_cursor"]
+            if not cursor:
+                return rows
+
+    def test_cursor_pages_cover_every_row_once(self) -> None:
+        progress = self._walk("/learn/admin/db/api/progress", limit=4)
+        keys = [(r["user_id"], r["item_key"]) for r in progress]
+        self.assertEqual(len(keys), 15)
+        self.assertEqual(len(set(keys)), 15)
+
+        users = self._walk("/learn/admin/db/api/users", limit=2)
+        self.assertEqual([r["id"] for r in users], sorted((u.id for u in self.users), reverse=True))
+
+        events = self._walk("/learn/admin/db/api/events", limit=10)
+        self.assertEqual([r["id"] for r in events], sorted(r["id"] for r in events))
+        self.assertGreaterEqual(len(events), 25)
+
+    def test_admin_db_alias_serves_users(self) -> None:
+        response = self.client.get(f"/learn/admin/db?token={self.admin_token}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()["rows"]), 5)
+        self.assertEqual(self.client.get("/learn/admin/db").status_code, 403)
+
+    def test_bad_cursor_is_rejected(self) -> None:
+        response = self.client.get(f"/learn/admin/db/api/progress?token={self.admin_token}&cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 400)
+
+    def test_exports_stream_all_rows(self) -> None:
+        orig_page = education_routes._ADMIN_EXPORT_PAGE_SIZE
+        education_routes._ADMIN_EXPORT_PAGE_SIZE = 4
+        try:
+            response = self.client.get(f"/learn/admin/db/api/progress/export?format=csv&token={self.admin_token}")
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_streamed)
+            rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+            self.assertEqual(len(rows), 15)
+            self.assertEqual(set(rows[0]), {"user_id", "username", "item_key", "completed_at"})
+
+            response = self.client.get(
+                f"/learn/admin/db/api/events/export?user_id={self.users[0].id}&token={self.admin_token}"
+            )
+            lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+            self.assertEqual(len(lines), 25)
+            self.assertEqual(response.mimetype, "application/x-ndjson")
+        finally:
+            education_routes._ADMIN_EXPORT_PAGE_SIZE = orig_page
+
+        self.assertEqual(self.client.get("/learn/admin/db/api/progress/export").status_code, 403)
+
+
+if __name__ == "__main__":
+    unittest.main()
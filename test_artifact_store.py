@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Automated tests for the generated-artifact lifecycle manager."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+import unittest
+
+from modules.artifact_store import ArtifactKind, ArtifactManager
+from modules.pdf_jobs import PdfJobQueue
+from test_pdf_cache import padded_render
+
+
+class ArtifactManagerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)  # runs after any queue cleanup added later
+        self.root = tmpdir.name
+
+    def _write(self, directory: str, name: str, size: int, age: float) -> str:
+        path = os.path.join(directory, name)
+        with open(path, "wb") as fh:
+            fh.write(b"x" * size)
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+        return path
+
+    def test_ttl_then_lru_eviction_under_quota(self) -> None:
+        manager = ArtifactManager(quota_bytes=2500, protect_seconds=30)
+        pdfs = manager.register(ArtifactKind("pdfs", os.path.join(self.root, "pdfs"), ttl_seconds=3600))
+        other = manager.register(ArtifactKind("other", os.path.join(self.root, "other"), ttl_seconds=60))
+
+        expired = self._write(other.directory, "stale.pdf", 1000, age=120)
+        oldest = self._write(pdfs.directory, "a.pdf", 1000, age=600)
+        middle = self._write(other.directory, "b.pdf", 1000, age=50)
+        fresh = self._write(pdfs.directory, "c.pdf", 1000, age=5)
+        partial = self._write(pdfs.directory, "d.pdf.job.part", 1000, age=500)
+        ignored = self._write(pdfs.directory, "notes.txt", 1000, age=9999)
+
+        manager.touch(oldest)  # a download makes "a" the most recent
+        result = manager.sweep()
+
+        self.assertEqual((result["expired"], result["evicted"]), (1, 1))
+        self.assertFalse(os.path.exists(expired))
+        self.assertFalse(os.path.exists(middle))
+        for path in (oldest, fresh, partial, ignored):
+            self.assertTrue(os.path.exists(path), path)
+
+        stats = manager.stats()
+        self.assertEqual(stats["evictions"], {"ttl": 1, "quota": 1, "download": 0})
+        self.assertEqual(stats["kinds"]["pdfs"]["files"], 3)
+        self.assertEqual(stats["bytes_in_use"], 3000)
+
+        # Leftover renders are reclaimed once they outlive the TTL.
+        manager.sweep(now=time.time() + 4000)
+        self.assertFalse(os.path.exists(partial))
+
+    def test_delete_after_download(self) -> None:
+        manager = ArtifactManager(quota_bytes=0)
+        keep = manager.register(ArtifactKind("keep", os.path.join(self.root, "keep")))
+        once = manager.register(ArtifactKind("once", os.path.join(self.root, "once"), delete_after_download=True))
+        kept = self._write(keep.directory, "k.pdf", 10, age=100)
+        gone = self._write(once.directory, "g.pdf", 10, age=0)
+
+        self.assertFalse(manager.downloaded("keep", kept))
+        self.assertLess(time.time() - os.stat(kept).st_atime, 5)
+        self.assertTrue(manager.downloaded("once", gone))
+        self.assertFalse(os.path.exists(gone))
+        self.assertEqual(manager.stats()["evictions"]["download"], 1)
+
+    def test_eviction_drops_pdf_cache_entry(self) -> None:
+        q = PdfJobQueue(
+            db_path=os.path.join(self.root, "pdf_jobs.db"),
+            output_dir=os.path.join(self.root, "out"),
+            render_fn=padded_render,
+            max_workers=1,
+            cache_max_bytes=1024 * 1024,
+        )
+        self.addCleanup(q.stop)
+        payload = {"result_text": "ok", "title": "Report", "chemistry": "LiFePO4", "dod": "80"}
+        job = q.submit(payload)
+        deadline = time.monotonic() + 20
+        while not q.get(job.id).finished and time.monotonic() < deadline:
+            q.dispatch_once()
+            time.sleep(0.02)
+        self.assertEqual(q.stats()["cache"]["entries"], 1)
+
+        manager = ArtifactManager(quota_bytes=0)
+        manager.register(ArtifactKind("pdf_exports", q.output_dir, ttl_seconds=60, on_remove=q.forget_artifact))
+
+        # A cache hit on a file older than the TTL counts as use, so the PDF
+        # is still there when the hit is downloaded.
+        stale = time.time() - 120
+        os.utime(job.path, (stale, stale))
+        hit = q.submit(payload)
+        self.assertEqual((hit.status, hit.path), ("done", job.path))
+        manager.sweep()
+        self.assertTrue(os.path.exists(job.path))
+
+        manager.sweep(now=time.time() + 120)
+        self.assertFalse(os.path.exists(job.path))
+        self.assertEqual(q.stats()["cache"]["entries"], 0)
+        self.assertEqual(q.submit(payload).status, "queued")
+
+
+if __name__ == "__main__":
+    unittest.main()
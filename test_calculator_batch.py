@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Automated tests for the vectorised pack-design engine in calculator.py."""
+
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import app as app_module
+import calculator
+
+
+class PackDesignBatchTests(unittest.TestCase):
+    """Batch results must match the scalar web-form path row for row."""
+
+    def test_batch_matches_scalar_wrapper(self) -> None:
+        cell_voltage = np.array([3.2, 3.7, 4.3, 1.2, 3.2])
+        cell_capacity = np.array([100.0, 2.5, 50.0, 2.0, 280.0])
+        series = np.array([16, 4, 1, 10, 15])
+        parallel = np.array([1, 8, 3, 1, 2])
+        c_rate = np.array([0.5, 5.0, 1.0, 2.0, 0.0])
+        ir = np.array([0.3, 0.0, 1.5, 20.0, 0.2])
+        chemistry = np.array(["LiFePO4", "Li-ion", "Li-ion", "NiMH", "Unknown"])
+        dod = np.array([80, 100, 60, 20, 50])
+
+        batch = calculator.compute_pack_design_batch(
+            cell_voltage, cell_capacity, series, parallel,
+            c_rate=c_rate, cell_ir_milli=ir, chemistry=chemistry, dod=dod,
+        )
+        self.assertEqual(len(batch), 5)
+
+        for i in range(len(batch)):
+            expected = calculator.compute_pack_design(
+                cell_voltage=float(cell_voltage[i]),
+                cell_capacity=float(cell_capacity[i]),
+                num_cells=int(series[i] * parallel[i]),
+                connection_type="series-parallel",
+                series_cells=int(series[i]),
+                parallel_cells=int(parallel[i]),
+                c_rate=float(c_rate[i]),
+                cell_ir_milli=float(ir[i]),
+                chemistry=str(chemistry[i]),
+                dod=int(dod[i]),
+            )
+            self.assertEqual(calculator.pack_design_to_dict(batch[i]), expected)
+
+    def test_scalars_broadcast_and_summary_is_lazy(self) -> None:
+        batch = calculator.compute_pack_design_batch(3.2, 100.0, [4, 8, 16], 1, cell_ir_milli=0.5)
+        np.testing.assert_allclose(batch["total_voltage"], [12.8, 25.6, 51.2])
+        self.assertTrue(batch["needs_bms"].all())
+        row = calculator.pack_design_to_dict(batch[0], with_summary=False)
+        self.assertNotIn("summary_text", row)
+        self.assertIn("Configuration: 16S1P", calculator.render_pack_summaries(batch)[2])
+
+    def test_warning_and_cycle_life_flags(self) -> None:
+        res = calculator.compute_pack_design(4.0, 100.0, 4, "series", chemistry="LiFePO4", dod=80)
+        self.assertIn("exceeds safe max 3.65V", res["warning"])
+        self.assertEqual(res["cycle_life_estimate"], 2400)
+        self.assertEqual(res["ir_info"], "")
+
+
+class PackTopologySearchTests(unittest.TestCase):
+    """The pruned solver must return exactly the brute-force feasible set."""
+
+    def _brute_force(self, *, max_cells: int, **targets) -> set[tuple[int, int]]:
+        found = set()
+        for s in range(1, max_cells + 1):
+            for p in range(1, max_cells // s + 1):
+                row = calculator.compute_pack_design_batch(
+                    3.2, 50.0, s, p, c_rate=1.0, cell_ir_milli=1.0)[0]
+                if not (targets["min_voltage"] <= row["total_voltage"] <= targets["max_voltage"]):
+                    continue
+                if row["total_energy_Wh"] < targets["min_energy_kwh"] * 1000.0:
+                    continue
+                if row["max_power_kW"] < targets["min_peak_kw"]:
+                    continue
+                if row["voltage_sag_V"] > targets["max_sag_v"]:
+                    continue
+                found.add((s, p))
+        return found
+
+    def test_matches_brute_force(self) -> None:
+        targets = dict(min_voltage=44.0, max_voltage=58.0, min_energy_kwh=5.0,
+                       min_peak_kw=8.0, max_sag_v=0.8)
+        expected = self._brute_force(max_cells=200, **targets)
+        shortlist = calculator.search_pack_topologies(
+            3.2, 50.0, c_rate=1.0, cell_ir_milli=1.0, max_cells=200, top_n=1000, **targets)
+        got = set(zip(shortlist["series_cells"].tolist(), shortlist["parallel_cells"].tolist()))
+        self.assertEqual(got, expected)
+
+        cells = shortlist["series_cells"] * shortlist["parallel_cells"]
+        self.assertTrue((np.diff(cells) >= 0).all())
+
+    def test_large_budget_only_evaluates_shortlist_candidates(self) -> None:
+        evaluated = []
+        batch = calculator.compute_pack_design_batch
+
+        def _spy(*args, **kwargs):
+            evaluated.append(np.size(args[2]))
+            return batch(*args, **kwargs)
+
+        with mock.patch.object(calculator, "compute_pack_design_batch", _spy):
+            shortlist = calculator.search_pack_topologies(
+                3.2, 50.0, 44.0, 58.0, min_energy_kwh=5.0, max_cells=2_000_000, top_n=5)
+        self.assertEqual(len(shortlist), 5)
+        # 5 series counts (14S..18S) with at most top_n + 1 P values each.
+        self.assertLessEqual(evaluated[-1], 5 * 6)
+
+    def test_endpoint_caps_max_cells(self) -> None:
+        client = app_module.app.test_client()
+        targets = {"cell_voltage": 3.2, "cell_capacity": 50, "min_voltage": 44, "max_voltage": 58}
+        resp = client.post("/calculator/topologies", json=dict(targets, max_cells=20_000_000))
+        self.assertEqual(resp.status_code, 400)
+        resp = client.post("/calculator/topologies", json=dict(targets, max_voltage=1e9, max_sag_v=1.0))
+        self.assertEqual(resp.status_code, 400)
+        resp = client.post("/calculator/topologies", json=dict(targets, max_cells=200, top_n=3))
+        self.assertEqual(len(resp.get_json()["layouts"]), 3)
+
+    def test_requires_a_budget(self) -> None:
+        with self.assertRaises(ValueError):
+            calculator.search_pack_topologies(3.2, 100.0, 40.0, 60.0, min_energy_kwh=5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Automated tests for the batched equivalent-circuit cell model."""
+
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+
+from modules import cell_model
+from modules.interactive_tools import CellSimulator
+from modules.lithium_education import CellChemistry, CellSpecifications
+
+
+def _spec() -> CellSpecifications:
+    return CellSpecifications(3.7, 2000, CellChemistry.LI_ION, 2.5, 4.2)
+
+
+class CellModelTests(unittest.TestCase):
+    def test_rest_returns_open_circuit_voltage(self) -> None:
+        params = cell_model.params_for_cell(_spec())
+        trace = cell_model.simulate(params, np.zeros(10), 60.0, soc=50.0)
+        np.testing.assert_allclose(trace.voltage_v, params.ocv(50.0))
+        np.testing.assert_allclose(trace.soc, 50.0)
+
+    def test_rc_branches_relax_towards_steady_state_sag(self) -> None:
+        params = cell_model.params_for_cell(_spec())
+        trace = cell_model.simulate(params, np.full(3000, 1.0), 1.0, soc=90.0)
+        sag = params.ocv(trace.soc) - trace.voltage_v
+        total_r = params.r0_ohm + sum(params.rc_r_ohm)
+        self.assertAlmostEqual(sag[0], params.r0_ohm + sum(r * (1 - np.exp(-1.0 / tau))
+                                                          for r, tau in zip(params.rc_r_ohm, params.rc_tau_s)), places=6)
+        self.assertLess(sag[-1], total_r * 1.001)
+        self.assertGreater(sag[-1], total_r * 0.98)
+        # Coulomb counting: 3000 s at 0.5C removes 41.67% SOC.
+        self.assertAlmostEqual(trace.soc[-1], 90.0 - 3000 / 3600 / 2.0 * 100, places=6)
+
+    def test_batch_matches_individual_runs_and_cold_cells_sag_more(self) -> None:
+        params = cell_model.params_for_cell(_spec())
+        temps = np.array([-10.0, 25.0])
+        batch = cell_model.simulate(params, np.full((600, 2), 2.0), 1.0, soc=80.0,
+                                    temp_c=temps, ambient_c=temps)
+        for i, temp in enumerate(temps):
+            single = cell_model.simulate(params, np.full(600, 2.0), 1.0, soc=80.0,
+                                         temp_c=temp, ambient_c=temp)
+            np.testing.assert_allclose(batch.voltage_v[:, i], single.voltage_v)
+        self.assertLess(batch.voltage_v[-1, 0], batch.voltage_v[-1, 1])
+        self.assertTrue((batch.temp_c[-1] > temps).all())
+
+    def test_cell_simulator_reports_cutoff(self) -> None:
+        result = CellSimulator(_spec()).simulate_discharge(4.0, 1.0, include_trace=True)
+        self.assertEqual(result["status"], "CUTOFF")
+        self.assertLess(result["cutoff_after_hours"], 0.25)
+        self.assertEqual(len(result["trace"]["voltage_v"]), 120)
+
+    def test_large_steps_stay_bounded(self) -> None:
+        params = cell_model.params_for_cell(_spec())
+        # One step far longer than the 400 s thermal time constant lands on the
+        # steady state ambient + heat * R_th instead of overshooting.
+        state = cell_model.initial_state(params, soc=90.0)
+        _, heat = cell_model.step(params, state, 0.5, 3600.0)
+        self.assertAlmostEqual(float(state.temp_c), 25.0 + float(heat) * 10.0, places=3)
+
+        result = CellSimulator(_spec()).simulate_discharge(20.0, 1.0, steps=2)
+        self.assertLess(result["peak_temp_c"], 100.0)
+
+        # An empty cell stops sourcing current: 10 h at 2 A from a 2 Ah cell
+        # at 50% SOC cannot deliver more than the ~3.7 Wh left in it.
+        result = CellSimulator(_spec()).simulate_discharge(2.0, 10.0, steps=1)
+        self.assertEqual(result["new_soc"], 0.0)
+        self.assertLessEqual(result["energy_discharged_wh"], 3.7)
+
+
+if __name__ == "__main__":
+    unittest.main()
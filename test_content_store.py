@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Automated tests for the precompiled lesson content store."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import textwrap
+import time
+import unittest
+
+import modules.lithium_education as lithium_education
+from modules import content_store
+from modules.content_store import ContentStore
+
+
+class ContentStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.artifact_dir = os.path.join(self._tmpdir.name, "content")
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def test_artifacts_match_source(self) -> None:
+        store = ContentStore(artifact_dir=self.artifact_dir, max_modules=2)
+        self.assertIn("MODULE_1_FUNDAMENTALS", store.names())
+        self.assertEqual(
+            store.module("MODULE_1_FUNDAMENTALS"),
+            lithium_education.LithiumBatteryFundamentals.MODULE_1_FUNDAMENTALS,
+        )
+        self.assertEqual(store.module("MODULE_9_ECOSYSTEM_AND_PRODUCT_RANGE"), lithium_education.MODULE_9_ECOSYSTEM_AND_PRODUCT_RANGE)
+        # The trailing-comma tuple is unwrapped into the dict it holds.
+        self.assertEqual(store.module("MODULE_4_ASSESSMENT"), lithium_education.MODULE_4_ASSESSMENT[0])
+
+        sections = lithium_education.MODULE_4_BMS["sections"]
+        self.assertEqual(store.section_count("MODULE_4_BMS"), len(sections))
+        self.assertEqual(store.section("MODULE_4_BMS", len(sections) - 1), sections[-1])
+        with self.assertRaises(IndexError):
+            store.section("MODULE_4_BMS", len(sections))
+        with self.assertRaises(KeyError):
+            store.module("MODULE_99")
+
+    def test_cache_is_bounded(self) -> None:
+        store = ContentStore(artifact_dir=self.artifact_dir, max_modules=2)
+        for name in ("MODULE_4_BMS", "MODULE_5_ENERGY_SYSTEM_DESIGN", "MODULE_4_BMS", "MODULE_6_INSTALLATION_WIRING"):
+            store.module(name)
+        stats = store.stats()
+        self.assertEqual((stats["modules_cached"], stats["hits"], stats["misses"]), (2, 1, 3))
+        self.assertEqual(stats["evictions"], 1)
+
+        # Section counts come from the manifest without decoding anything.
+        fresh = ContentStore(artifact_dir=self.artifact_dir)
+        fresh.section_count("MODULE_4_BMS")
+        self.assertEqual((fresh.stats()["modules_cached"], fresh.stats()["builds"]), (0, 0))
+
+    def test_stale_artifacts_are_rebuilt(self) -> None:
+        source = os.path.join(self._tmpdir.name, "lessons.py")
+        with open(source, "w", encoding="utf-8") as fh:
+            fh.write('MODULE_A = {"sections": [{"title": "one"}]}\n')
+        content_store.build_artifacts(source, self.artifact_dir)
+
+        with open(source, "w", encoding="utf-8") as fh:
+            fh.write(textwrap.dedent('''
+                class Lessons:
+                    MODULE_A = {"sections": [{"title": "one"}, {"title": "two"}]}
+            '''))
+        store = ContentStore(source_path=source, artifact_dir=self.artifact_dir)
+        self.assertEqual(store.section("MODULE_A", 1), {"title": "two"})
+        self.assertEqual(store.stats()["builds"], 1)
+        with open(os.path.join(self.artifact_dir, content_store.MANIFEST_NAME), encoding="utf-8") as fh:
+            self.assertEqual(json.load(fh)["source_sha256"], content_store.source_digest(source))
+
+
+class ContentHotReloadTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self._tmpdir.name, "lessons.py")
+        self._write('{"title": "one"}')
+        self.store = ContentStore(source_path=self.source, artifact_dir=os.path.join(self._tmpdir.name, "content"))
+        self.reloads: list[int] = []
+        self.store.on_reload(lambda: self.reloads.append(self.store.section_count("MODULE_A")))
+
+    def tearDown(self) -> None:
+        self.store.stop_watcher()
+        self._tmpdir.cleanup()
+
+    def _write(self, sections: str, *, bump: int = 0) -> None:
+        with open(self.source, "w", encoding="utf-8") as fh:
+            fh.write(f"MODULE_A = {{'sections': [{sections}]}}\n")
+        # Coarse filesystem clocks can leave the mtime unchanged between writes.
+        stamp = time.time() + bump
+        os.utime(self.source, (stamp, stamp))
+
+    def test_edit_is_swapped_in_once(self) -> None:
+        first = self.store.module("MODULE_A")
+        self.assertFalse(self.store.check_for_changes())
+
+        self._write('{"title": "one"}, {"title": "two"}', bump=2)
+        self.assertTrue(self.store.check_for_changes())
+        self.assertFalse(self.store.check_for_changes())
+        self.assertEqual(self.store.section("MODULE_A", 1), {"title": "two"})
+        self.assertEqual(first["sections"], [{"title": "one"}])
+        self.assertEqual(self.reloads, [2])
+
+        # Touching the file without changing it costs a hash, not a rebuild.
+        os.utime(self.source, (time.time() + 4, time.time() + 4))
+        self.assertFalse(self.store.check_for_changes())
+        self.assertEqual(self.store.stats()["reloads"], 1)
+
+    def test_broken_source_keeps_previous_content(self) -> None:
+        self.store.module("MODULE_A")
+        self._write('{"title": "one"', bump=2)
+        with self.assertRaises(SyntaxError):
+            self.store.check_for_changes()
+        self.assertEqual(self.store.section_count("MODULE_A"), 1)
+
+    def test_watcher_thread_reloads(self) -> None:
+        self.store.module("MODULE_A")
+        self.store.start_watcher(interval_seconds=0.02)
+        self.assertIs(self.store.start_watcher(interval_seconds=0.02), self.store._watcher)
+        self._write('{"title": "a"}, {"title": "b"}, {"title": "c"}', bump=2)
+        deadline = time.monotonic() + 5
+        while not self.reloads and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(self.reloads, [3])
+        self.assertTrue(self.store.stats()["watching"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""Automated tests for CRate capacity derating curves."""
+
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+
+from modules.lithium_education import CRate, CellChemistry
+
+
+class CapacityDeratingTests(unittest.TestCase):
+    def test_every_chemistry_has_a_monotonic_curve(self) -> None:
+        crates = np.linspace(0.0, 8.0, 81)
+        for chemistry in CellChemistry:
+            factors = CRate.capacity_derating(crates, chemistry)
+            self.assertEqual(factors[0], 1.0)
+            self.assertTrue((np.diff(factors) <= 0).all(), chemistry)
+
+    def test_interpolates_between_points(self) -> None:
+        self.assertAlmostEqual(CRate.get_capacity_derating(1.5, CellChemistry.LI_ION), 0.925)
+        self.assertEqual(CRate.get_capacity_derating(5.0, CellChemistry.LIFEPO4), 0.88)
+        self.assertEqual(CRate.get_capacity_derating(10.0, CellChemistry.LIFEPO4), 0.88)
+
+    def test_vectorised_matches_scalar(self) -> None:
+        crates = np.array([[0.1, 0.7], [2.5, 4.9]])
+        got = CRate.capacity_derating(crates, CellChemistry.NCM)
+        self.assertEqual(got.shape, crates.shape)
+        expected = [[CRate.get_capacity_derating(c, CellChemistry.NCM) for c in row] for row in crates.tolist()]
+        np.testing.assert_allclose(got, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Automated tests for the shared cycle-life model in modules/cycle_life.py."""
+
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+
+import calculator
+from modules import cycle_life
+from modules.lithium_education import CapacityAndDOD, CellChemistry
+
+
+class CycleLifeModelTests(unittest.TestCase):
+    def test_tabulated_points_match_original_table(self) -> None:
+        for chemistry, base in cycle_life.BASE_CYCLE_LIFE.items():
+            for dod, multiplier in cycle_life.DOD_MULTIPLIER.items():
+                self.assertEqual(cycle_life.estimate_cycle_life(chemistry, dod), int(base * multiplier))
+
+    def test_intermediate_dod_is_interpolated(self) -> None:
+        # 50% sits halfway between 40% (x2.0) and 60% (x1.5).
+        self.assertEqual(calculator.estimate_cycle_life("LiFePO4", 50), 3500)
+        self.assertEqual(cycle_life.dod_multiplier(90), 1.1)
+        # Outside the table the nearest end point is used.
+        self.assertEqual(cycle_life.dod_multiplier(5), 3.0)
+        self.assertEqual(cycle_life.dod_multiplier(120), 1.0)
+
+    def test_batch_matches_scalar_and_call_sites_agree(self) -> None:
+        dods = np.arange(0, 101)
+        chems = np.where(dods % 2 == 0, "LiFePO4", "Lead Acid")
+        batch = cycle_life.estimate_cycle_life_batch(chems, dods)
+        expected = [cycle_life.estimate_cycle_life(c, int(d)) for c, d in zip(chems, dods)]
+        self.assertEqual(batch.tolist(), expected)
+
+        self.assertEqual(
+            CapacityAndDOD.calculate_cycle_life(CellChemistry.LIFEPO4, 70, 2000),
+            calculator.estimate_cycle_life("LiFePO4", 70),
+        )
+
+    def test_enum_members_use_their_table_rows(self) -> None:
+        self.assertEqual(cycle_life.estimate_cycle_life(CellChemistry.LIFEPO4, 80), 2400)
+        self.assertEqual(cycle_life.estimate_cycle_life(CellChemistry.LI_ION, 80), 600)
+        batch = cycle_life.estimate_cycle_life_batch(["LiFePO4", "LIFEPO4"], 80)
+        self.assertEqual(batch.tolist(), [2400, 600])
+
+    def test_unknown_chemistries_share_one_cached_curve(self) -> None:
+        cycle_life.get_curve.cache_clear()
+        for i in range(50):
+            self.assertEqual(cycle_life.estimate_cycle_life(f"made-up-{i}", 100), cycle_life.DEFAULT_BASE_CYCLES)
+        self.assertEqual(cycle_life.get_curve.cache_info().currsize, 1)
+
+if __name__ == "__main__":
+    unittest.main()
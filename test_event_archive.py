@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Automated tests for user_events retention and archives."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from datetime import date, datetime, timezone
+
+from modules import education_store, event_archive
+
+
+class EventArchiveTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self._orig = (education_store.db_path, education_store._DB_READY)
+        education_store.db_path = lambda: os.path.join(self._tmp.name, "education_test.db")
+        education_store._DB_READY = False
+        self.root = os.path.join(self._tmp.name, "archive")
+        with education_store._connect() as conn:
+            for i in range(25):
+                day = "2024-01-01" if i < 15 else "2024-01-02"
+                conn.execute(
+                    "INSERT INTO user_events (user_id, type, payload, created_at) VALUES (NULL, ?, ?, ?)",
+                    ("old" if i % 2 else "older", json.dumps({"n": i}), f"{day}T10:00:{i:02d}+00:00"),
+                )
+            conn.execute(
+                "INSERT INTO user_events (user_id, type, payload, created_at) VALUES (NULL, 'fresh', '{}', ?)",
+                ("2024-03-01T00:00:00+00:00",),
+            )
+
+    def tearDown(self) -> None:
+        education_store.db_path, education_store._DB_READY = self._orig
+        self._tmp.cleanup()
+
+    def _archive(self, **kwargs):
+        return event_archive.archive_events(
+            older_than_days=30, root=self.root, pause_seconds=0,
+            now=datetime(2024, 3, 2, tzinfo=timezone.utc), **kwargs,
+        )
+
+    def test_archives_in_chunks_and_keeps_recent_rows(self) -> None:
+        result = self._archive(chunk_size=10)
+        self.assertEqual(result["archived"], 25)
+        self.assertEqual(result["chunks"], 3)
+        self.assertEqual(result["partitions"], ["2024-01-01", "2024-01-02"])
+        with education_store._connect() as conn:
+            remaining = [r["type"] for r in conn.execute("SELECT type FROM user_events")]
+        self.assertEqual(remaining, ["fresh"])
+        self.assertEqual([p["date"] for p in event_archive.list_partitions(self.root)],
+                         ["2024-01-01", "2024-01-02"])
+
+        rows = list(event_archive.query_archive(date(2024, 1, 1), date(2024, 1, 2), root=self.root))
+        self.assertEqual([r["payload"]["n"] for r in rows], list(range(25)))
+        only_old = list(event_archive.query_archive(date(2024, 1, 1), date(2024, 1, 1), event_type="old",
+                                                    root=self.root))
+        self.assertEqual([r["payload"]["n"] for r in only_old], [1, 3, 5, 7, 9, 11, 13])
+
+    def test_rearchived_rows_are_not_duplicated(self) -> None:
+        with education_store._connect() as conn:
+            rows = [dict(r) for r in conn.execute(
+                "SELECT id, user_id, type, payload, created_at FROM user_events WHERE created_at LIKE '2024-01-02%'"
+            )]
+        # Simulate a crash after writing a chunk but before deleting it.
+        event_archive._append_partition(self.root, "2024-01-02", rows)
+        self._archive()
+        again = list(event_archive.query_archive(date(2024, 1, 2), date(2024, 1, 2), root=self.root))
+        self.assertEqual(len(again), 10)
+
+    def test_lease_allows_one_holder(self) -> None:
+        self.assertTrue(event_archive._acquire_lease("worker-a", ttl_seconds=60))
+        self.assertFalse(event_archive._acquire_lease("worker-b", ttl_seconds=60))
+        self.assertTrue(event_archive._acquire_lease("worker-a", ttl_seconds=60))
+        self.assertIsNone(event_archive.run_retention_once(older_than_days=30, holder="worker-b", root=self.root))
+
+    def test_lease_is_released_after_a_run(self) -> None:
+        # A scheduled pass must not block a manual run for the lease TTL.
+        self.assertIsNotNone(event_archive.run_retention_once(older_than_days=30, holder="scheduler", root=self.root))
+        self.assertIsNotNone(event_archive.run_retention_once(older_than_days=30, root=self.root))
+        self.assertTrue(event_archive._acquire_lease("worker-b", ttl_seconds=60))
+
+    def test_run_renews_lease_and_stops_when_it_is_lost(self) -> None:
+        calls = []
+        result = self._archive(chunk_size=10, renew=lambda: calls.append(1) or len(calls) < 2)
+        self.assertEqual(result["chunks"], 2)
+        self.assertEqual(result["archived"], 20)
+
+    def test_deleted_user_is_purged_from_archive(self) -> None:
+        keep = education_store.create_user("keep_user", "password123", email="keep@example.com")
+        gone = education_store.create_user("gone_user", "password123", email="gone@example.com")
+        with education_store._connect() as conn:
+            conn.executemany(
+                "INSERT INTO user_events (user_id, type, payload, created_at) VALUES (?, 'x', '{}', ?)",
+                [(keep.id, "2024-01-01T11:00:00+00:00"), (gone.id, "2024-01-01T11:00:01+00:00")],
+            )
+        self._archive()
+        education_store.delete_user(gone.id)
+
+        # Hidden at query time before the purge runs...
+        rows = list(event_archive.query_archive(date(2024, 1, 1), date(2024, 1, 1), root=self.root))
+        self.assertNotIn(gone.id, [r["user_id"] for r in rows])
+        self.assertIn(keep.id, [r["user_id"] for r in rows])
+
+        # ...and physically removed by the next retention pass.
+        result = event_archive.run_retention_once(older_than_days=30, holder="scheduler", root=self.root)
+        self.assertEqual(result["purged"], {"users": 1, "rows": 1, "partitions": 1})
+        with gzip.open(os.path.join(self.root, "2024-01", "2024-01-01.jsonl.gz"), "rt") as fh:
+            user_ids = [json.loads(line)["user_id"] for line in fh]
+        self.assertEqual(len(user_ids), 16)
+        self.assertNotIn(gone.id, user_ids)
+        with education_store._connect() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM archive_purges").fetchone()[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Automated tests for the admin event stream broadcaster."""
+
+from __future__ import annotations
+
+import json
+import os
+import unittest
+from unittest import mock
+
+import app as app_module
+from modules.event_broadcaster import EventBroadcaster, TooManySubscribers
+
+
+class FakeEvents:
+    def __init__(self) -> None:
+        self.rows: list[dict] = []
+        self.queries = 0
+
+    def add(self, n: int) -> None:
+        for _ in range(n):
+            self.rows.append({"id": len(self.rows) + 1, "type": "test"})
+
+    def since(self, after_id: int, limit: int) -> list[dict]:
+        self.queries += 1
+        return [r for r in self.rows if r["id"] > after_id][:limit]
+
+    def latest(self) -> int:
+        return self.rows[-1]["id"] if self.rows else 0
+
+
+class EventBroadcasterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.store = FakeEvents()
+        self.store.add(10)
+
+    def _broadcaster(self, **kwargs) -> EventBroadcaster:
+        b = EventBroadcaster(self.store.since, self.store.latest, poll_interval=3600, **kwargs)
+        # Drive polls by hand; the background poller would race the asserts.
+        b._ensure_thread = lambda: None
+        return b
+
+    def test_one_query_per_poll_regardless_of_subscribers(self) -> None:
+        b = self._broadcaster()
+        subs = [b.subscribe() for _ in range(25)]
+        self.store.add(3)
+        self.store.queries = 0
+        self.assertEqual(b.poll_once(), 3)
+        self.assertEqual(self.store.queries, 1)
+        for sub in subs:
+            self.assertEqual([e["id"] for e in sub.get(0)], [11, 12, 13])
+        self.assertEqual(subs[0].get(0.01), [])  # nothing new -> heartbeat
+
+        subs[0].close()
+        self.assertEqual(b.stats()["subscribers"], 24)
+
+    def test_resume_from_last_event_id(self) -> None:
+        b = self._broadcaster(batch_size=4, max_replay=15)
+        live = b.subscribe()
+        self.store.add(5)
+        b.poll_once()
+        b.poll_once()
+
+        # Ids 3..10 come from the database, 11..15 from the ring buffer.
+        sub = b.subscribe(last_id=2)
+        self.assertEqual([e["id"] for e in sub.get(0)], list(range(3, 16)))
+        self.store.add(1)
+        b.poll_once()
+        self.assertEqual([e["id"] for e in sub.get(0)], [16])
+        self.assertEqual([e["id"] for e in live.get(0)], list(range(11, 17)))
+
+        # Replay is capped at max_replay events behind the head.
+        self.assertEqual(b.subscribe(last_id=0).get(0)[0]["id"], 2)
+
+    def test_slow_consumer_is_evicted(self) -> None:
+        b = self._broadcaster(max_queue=5, max_subscribers=2)
+        slow, fast = b.subscribe(), b.subscribe()
+        with self.assertRaises(TooManySubscribers):
+            b.subscribe()
+
+        self.store.add(3)
+        b.poll_once()
+        fast.get(0)
+        self.store.add(3)
+        b.poll_once()
+        self.assertTrue(slow.evicted)
+        self.assertFalse(fast.evicted)
+        self.assertEqual([e["id"] for e in slow.get(0)], [11, 12, 13])
+        self.assertEqual(b.stats()["evicted"], 1)
+        self.assertEqual(b.stats()["subscribers"], 1)
+
+
+class EventStreamEndpointTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.token = "test-admin-token"
+        os.environ["ADMIN_STREAM_TOKEN"] = self.token
+        self.store = FakeEvents()
+        self.store.add(4)
+        self.broadcaster = EventBroadcaster(self.store.since, self.store.latest, poll_interval=0.01)
+        patches = [
+            mock.patch.object(app_module, "event_broadcaster", self.broadcaster),
+            mock.patch.object(app_module, "_EVENT_STREAM_HEARTBEAT_SECONDS", 0.05),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.client = app_module.app.test_client()
+
+    def test_stream_resumes_and_sends_heartbeats(self) -> None:
+        response = self.client.get(
+            f"/admin/events/stream?token={self.token}", headers={"Last-Event-ID": "2"}, buffered=False
+        )
+        self.assertEqual(response.mimetype, "text/event-stream")
+        chunks = iter(response.response)
+        self.assertEqual(next(chunks), b"retry: 3000\n\n")
+        body = next(chunks).decode()
+        self.assertTrue(body.startswith("id: 3\nevent: user_event\n"))
+        self.assertEqual(json.loads(next(chunks).decode().split("data: ", 1)[1])["id"], 4)
+        self.assertEqual(next(chunks), b": keepalive\n\n")
+        response.close()
+        self.assertEqual(self.broadcaster.stats()["subscribers"], 0)
+
+        self.assertEqual(self.client.get(f"/admin/events/stream?token={self.token}&since=x").status_code, 400)
+
+    def test_stream_over_the_cap_is_told_to_retry(self) -> None:
+        self.broadcaster.max_subscribers = 1
+        url = f"/admin/events/stream?token={self.token}"
+        first = self.client.get(url, buffered=False)
+        next(iter(first.response))
+
+        busy = self.client.get(url)
+        # EventSource only reconnects after a 200, so the rejection is one.
+        self.assertEqual(busy.status_code, 200)
+        self.assertEqual(busy.mimetype, "text/event-stream")
+        body = busy.get_data(as_text=True)
+        self.assertTrue(body.startswith("retry: 1000\nevent: busy\n"))
+        self.assertEqual(self.broadcaster.stats()["rejected"], 1)
+
+        first.close()
+        second = self.client.get(url, buffered=False)
+        self.assertEqual(next(iter(second.response)), b"retry: 3000\n\n")
+        second.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Automated tests for the write-behind user_events writer."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import unittest
+
+from modules import education_store
+from modules.event_writer import EventWriter
+
+
+class EventWriterTests(unittest.TestCase):
+    def test_batches_preserve_submission_order(self) -> None:
+        written: list[int] = []
+        writer = EventWriter(written.extend, flush_interval=0.01, batch_size=50)
+        threads = [threading.Thread(target=lambda base=b: [writer.submit(base + i) for i in range(100)])
+                   for b in (0, 1000, 2000)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertTrue(writer.flush())
+        self.assertEqual(sorted(written), sorted(list(range(100)) + list(range(1000, 1100)) + list(range(2000, 2100))))
+        for base in (0, 1000, 2000):
+            mine = [x for x in written if base <= x < base + 100]
+            self.assertEqual(mine, list(range(base, base + 100)))
+        self.assertLess(writer.stats()["batches"], 300)
+        writer.close()
+
+    def test_overflow_policies(self) -> None:
+        gate = threading.Event()
+        written: list[int] = []
+
+        def slow_write(batch) -> None:
+            gate.wait(5)
+            written.extend(batch)
+
+        writer = EventWriter(slow_write, max_queue=2, overflow="drop_newest", flush_interval=0)
+        writer.submit(0)  # picked up by the writer thread, which then blocks
+        for _ in range(100):
+            if writer.stats()["queued"] == 0:
+                break
+            threading.Event().wait(0.01)
+        for i in range(1, 5):
+            writer.submit(i)
+        self.assertEqual(writer.stats()["dropped"], 2)
+        gate.set()
+        writer.flush()
+        self.assertEqual(written, [0, 1, 2])
+        writer.close()
+
+        sync_written: list[int] = []
+        sync_writer = EventWriter(sync_written.extend, asynchronous=False)
+        sync_writer.submit("a")
+        self.assertEqual(sync_written, ["a"])
+
+    def test_record_event_reaches_db_in_id_order(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            orig = (education_store.db_path, education_store._DB_READY)
+            education_store.db_path = lambda: os.path.join(tmp, "education_test.db")
+            education_store._DB_READY = False
+            try:
+                for i in range(20):
+                    education_store.record_event("test_event", payload={"n": i})
+                education_store.record_event("orphan", user_id=999_999)
+                events = education_store.get_events_since(0, limit=100)
+                self.assertEqual([e["payload"].get("n") for e in events[:20]], list(range(20)))
+                self.assertEqual(events[-1]["type"], "orphan")
+                self.assertIsNone(events[-1]["user_id"])
+            finally:
+                education_store.db_path, education_store._DB_READY = orig
+
+
+if __name__ == "__main__":
+    unittest.main()
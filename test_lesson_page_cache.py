@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Automated tests for lesson fragment caching, ETags and the per-step content API."""
+
+from __future__ import annotations
+
+import os
+import re
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from app import app
+from modules import education_store
+from modules.content_store import lesson_content
+from routes import education_routes
+
+
+class LessonPageCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._orig = (education_store.db_path, education_store._DB_READY)
+        education_store.db_path = lambda: os.path.join(self._tmpdir.name, "education_test.db")
+        education_store._DB_READY = False
+        education_routes.lesson_fragments.clear()
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+
+    def tearDown(self) -> None:
+        education_routes.lesson_fragments.clear()
+        education_store.db_path, education_store._DB_READY = self._orig
+        self._tmpdir.cleanup()
+
+    def _login(self, client) -> None:
+        user = education_store.create_user("pager", "password123", email="pager@example.com")
+        with client.session_transaction() as sess:
+            sess["edu_user_id"] = user.id
+            sess["edu_username"] = user.username
+            sess["edu_last_activity_at"] = datetime.now(timezone.utc).isoformat()
+
+    def _count_step_renders(self):
+        return mock.patch.object(education_routes, "render_template", wraps=education_routes.render_template)
+
+    @staticmethod
+    def _step_renders(render) -> int:
+        return sum(1 for c in render.call_args_list if c.args[0] == "education/_lesson_step.html")
+
+    def test_if_none_match_returns_304_without_rendering(self) -> None:
+        first = self.client.get("/learn/fundamentals/module-4")
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+        self.assertEqual(first.headers["Cache-Control"], "private, no-cache")
+
+        with mock.patch.object(education_routes, "render_template") as render:
+            again = self.client.get("/learn/fundamentals/module-4", headers={"If-None-Match": etag})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.get_data(), b"")
+        self.assertEqual(again.headers["ETag"], etag)
+        render.assert_not_called()
+
+        other_step = self.client.get("/learn/fundamentals/module-4?step=2", headers={"If-None-Match": etag})
+        self.assertEqual(other_step.status_code, 200)
+
+    def test_fragments_are_shared_but_etag_is_per_viewer(self) -> None:
+        other = app.test_client()
+        self._login(other)
+        with self._count_step_renders() as render:
+            anonymous = self.client.get("/learn/fundamentals")
+            signed_in = other.get("/learn/fundamentals")
+        self.assertEqual(self._step_renders(render), 1)
+        self.assertNotEqual(anonymous.headers["ETag"], signed_in.headers["ETag"])
+        self.assertIn(b"Logout", signed_in.get_data())
+        self.assertNotIn(b"Logout", anonymous.get_data())
+
+    def test_page_inlines_only_the_requested_step(self) -> None:
+        outline = education_routes._lesson_outline
+        body = self.client.get("/learn/fundamentals/module-4?step=2").get_data(as_text=True)
+        step_count = body.count("data-lesson-step ")
+        srcs = re.findall(r'data-step-src="([^"]+)"', body)
+        # All steps but the inline one are placeholders; the continue card is always inline.
+        self.assertEqual(len(srcs), step_count - 2)
+        self.assertTrue(all("/learn/api/lessons/fundamentals-4/" in s for s in srcs))
+        with app.test_request_context():
+            version = education_routes._lesson_version()
+            steps = outline("lesson:fundamentals-4", version)["steps"]
+        self.assertEqual(step_count, len(steps) + 1)
+
+        full = self.client.get("/learn/fundamentals/module-4?full=1").get_data(as_text=True)
+        self.assertNotIn("data-step-src", full)
+        self.assertEqual(full.count("data-lesson-step "), step_count)
+
+    def test_step_api_serves_immutable_fragments(self) -> None:
+        body = self.client.get("/learn/fundamentals/module-5").get_data(as_text=True)
+        src = re.findall(r'data-step-src="([^"]+)"', body)[0]
+
+        response = self.client.get(src)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/html")
+        self.assertIn("immutable", response.headers["Cache-Control"])
+        self.assertTrue(response.headers["Cache-Control"].startswith("public"))
+        self.assertIn(b'class="card step-card"', response.get_data())
+
+        cached = self.client.get(src, headers={"If-None-Match": response.headers["ETag"]})
+        self.assertEqual(cached.status_code, 304)
+
+        stale = self.client.get(src.replace(src.split("/")[-3], "0" * 16))
+        self.assertEqual(stale.status_code, 302)
+        self.assertTrue(stale.headers["Location"].endswith(src))
+
+        self.assertEqual(self.client.get(src.rsplit("/", 1)[0] + "/999").status_code, 404)
+
+    def test_step_api_respects_login_gate(self) -> None:
+        with app.test_request_context():
+            version = education_routes._lesson_version()
+        url = f"/learn/api/lessons/fundamentals-6/{version}/steps/1"
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self._login(self.client)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["Cache-Control"].startswith("private"))
+
+    def test_content_version_change_busts_cache(self) -> None:
+        etag = self.client.get("/learn/fundamentals/module-5").headers["ETag"]
+        real = lesson_content.manifest()
+        with mock.patch.object(lesson_content, "manifest", return_value=dict(real, source_sha256="edited")):
+            with self._count_step_renders() as render:
+                response = self.client.get("/learn/fundamentals/module-5", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(self._step_renders(render), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
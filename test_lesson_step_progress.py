@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Automated tests for bitmask lesson step progress."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+from app import app
+from modules import education_store
+from routes.education_routes import _TRACKED_LESSON_STEP_COUNTS
+
+
+class LessonStepProgressTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._test_db = os.path.join(self._tmpdir.name, "education_test.db")
+        self._orig = (education_store.db_path, education_store._DB_READY)
+        education_store.db_path = lambda: self._test_db
+        education_store._DB_READY = False
+        education_store.ensure_db()
+        self.user = education_store.create_user("stepper", "password123", email="stepper@example.com")
+
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+
+    def tearDown(self) -> None:
+        education_store.db_path, education_store._DB_READY = self._orig
+        self._tmpdir.cleanup()
+
+    def _login(self) -> None:
+        with self.client.session_transaction() as sess:
+            sess["edu_user_id"] = self.user.id
+            sess["edu_username"] = self.user.username
+            sess["edu_last_activity_at"] = datetime.now(timezone.utc).isoformat()
+
+    def test_mark_lesson_step_sets_bits(self) -> None:
+        self.assertEqual(education_store.mark_lesson_step(self.user.id, "lesson:fundamentals", 1), 0b1)
+        self.assertEqual(education_store.mark_lesson_step(self.user.id, "lesson:fundamentals", 3), 0b101)
+        self.assertEqual(education_store.mark_lesson_step(self.user.id, "lesson:fundamentals", 3), 0b101)
+        self.assertEqual(education_store.get_lesson_step_masks(self.user.id), {"lesson:fundamentals": 0b101})
+        self.assertFalse(education_store.lesson_steps_complete(0b101, 3))
+        self.assertTrue(education_store.lesson_steps_complete(0b111, 3))
+        with self.assertRaises(ValueError):
+            education_store.mark_lesson_step(self.user.id, "lesson:fundamentals", 64)
+
+    def test_legacy_step_rows_are_folded_into_masks(self) -> None:
+        with sqlite3.connect(self._test_db) as conn:
+            conn.executemany(
+                "INSERT INTO progress (user_id, item_key, completed_at) VALUES (?, ?, ?)",
+                [(self.user.id, f"lesson:fundamentals-2:step:{n}", "2026-01-01T00:00:00+00:00") for n in (1, 2, 5)]
+                + [(self.user.id, "quiz:capacity-dod", "2026-01-01T00:00:00+00:00")],
+            )
+        education_store._DB_READY = False
+        education_store.ensure_db()
+
+        self.assertEqual(education_store.get_lesson_step_masks(self.user.id), {"lesson:fundamentals-2": 0b10011})
+        self.assertEqual(education_store.get_completed_items(self.user.id), {"quiz:capacity-dod"})
+        self.assertEqual(education_store.get_user_stats(self.user.id)["progress_items"], 4)
+
+    def test_api_completes_lesson_after_last_step(self) -> None:
+        self._login()
+        lesson_key = "lesson:fundamentals-10"
+        total = _TRACKED_LESSON_STEP_COUNTS[lesson_key]
+        for step in range(1, total + 1):
+            response = self.client.post(
+                "/learn/api/progress/lesson-step",
+                json={"lesson_key": lesson_key, "step": step, "total_steps": total},
+            )
+            self.assertEqual(response.status_code, 200)
+        payload = response.get_json()
+        self.assertEqual(payload["visited_steps"], total)
+        self.assertTrue(payload["lesson_complete"])
+        self.assertIn(lesson_key, education_store.get_completed_items(self.user.id))
+
+
+if __name__ == "__main__":
+    unittest.main()
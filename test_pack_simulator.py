@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Automated tests for the array-backed SxP pack simulator."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app import app
+from modules import education_store
+from modules.interactive_tools import ArrayPackSimulator
+from modules.lithium_education import CellChemistry, CellSpecifications
+from routes import education_routes
+
+
+def _spec() -> CellSpecifications:
+    return CellSpecifications(3.2, 100_000, CellChemistry.LIFEPO4, 2.5, 3.65)
+
+
+class ArrayPackSimulatorTests(unittest.TestCase):
+    def test_parallel_groups_share_current_by_capacity(self) -> None:
+        pack = ArrayPackSimulator(2, 2, _spec(), cell_ir_milliohm=0.5, initial_soc=100)
+        pack.capacity_mah[0, 0] = 50_000
+        current = pack.step(pack_current_a=150.0, dt_hours=0.5)
+        np.testing.assert_allclose(current[0], [50.0, 100.0])
+        np.testing.assert_allclose(current[1], [75.0, 75.0])
+        # Capacity-weighted split keeps SOC aligned inside a parallel group.
+        self.assertAlmostEqual(pack.soc[0, 0], pack.soc[0, 1])
+        self.assertAlmostEqual(pack.soc[0, 0], 50.0)
+
+    def test_single_hour_long_steps_stay_physical(self) -> None:
+        pack = ArrayPackSimulator(4, 1, _spec(), cell_ir_milliohm=0.5)
+        for _ in range(3):
+            result = pack.discharge_pack(40.0, 1.0, steps=1)
+            self.assertLess(result["max_cell_temp_c"], 60.0)
+            self.assertGreaterEqual(float(pack.temp_c.min()), pack.ambient_temp_c)
+        self.assertEqual(result["avg_soc"], 0.0)
+        self.assertEqual(result["cell_results"][0]["current_a"], 0.0)
+
+    def test_large_pack_summary(self) -> None:
+        pack = ArrayPackSimulator(200, 60, _spec(), cell_ir_milliohm=0.3, initial_soc=90)
+        pack.introduce_imbalance(capacity_spread=0.02, seed=7)
+        result = pack.discharge_pack(pack_current_a=3000.0, duration_hours=0.5, steps=50)
+        self.assertEqual(result["num_cells"], 12_000)
+        self.assertEqual(result["topology"], "200S60P")
+        self.assertNotIn("cell_results", result)
+        self.assertAlmostEqual(result["avg_soc"], 65.0, delta=0.5)
+        self.assertGreater(result["voltage_imbalance_v"], 0.0)
+
+        health = pack.get_pack_health()
+        self.assertGreaterEqual(health["weak_cell_count"], 1)
+
+    def test_api_uses_array_model_for_sxp_payloads(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            orig_path, orig_ready = education_store.db_path, education_store._DB_READY
+            education_store.db_path = lambda: os.path.join(tmp, "education_test.db")
+            education_store._DB_READY = False
+            try:
+                education_store.ensure_db()
+                user = education_store.create_user("pack_user", "password123", email="pack@example.com")
+                app.config["TESTING"] = True
+                client = app.test_client()
+                with client.session_transaction() as sess:
+                    sess["edu_user_id"] = user.id
+                    sess["edu_username"] = user.username
+                    sess["edu_last_activity_at"] = datetime.now(timezone.utc).isoformat()
+
+                resp = client.post("/learn/api/pack-simulator/discharge",
+                                   json={"series_cells": 4, "parallel_cells": 3, "pack_current_a": 3.0})
+                self.assertEqual(resp.status_code, 200)
+                self.assertEqual(resp.get_json()["topology"], "4S3P")
+                self.assertEqual(len(resp.get_json()["cell_results"]), 12)
+
+                resp = client.post("/learn/api/pack-simulator/health",
+                                   json={"series_cells": 1000, "parallel_cells": 1000})
+                self.assertEqual(resp.status_code, 400)
+            finally:
+                education_store.db_path, education_store._DB_READY = orig_path, orig_ready
+
+
+class SimulatorStreamingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._orig = (education_store.db_path, education_store._DB_READY)
+        education_store.db_path = lambda: os.path.join(self._tmpdir.name, "education_test.db")
+        education_store._DB_READY = False
+        education_store.ensure_db()
+        user = education_store.create_user("stream_user", "password123", email="stream@example.com")
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+        with self.client.session_transaction() as sess:
+            sess["edu_user_id"] = user.id
+            sess["edu_username"] = user.username
+            sess["edu_last_activity_at"] = datetime.now(timezone.utc).isoformat()
+
+    def tearDown(self) -> None:
+        education_store.db_path, education_store._DB_READY = self._orig
+        self._tmpdir.cleanup()
+
+    def test_cell_stream_ndjson(self) -> None:
+        resp = self.client.post("/learn/api/cell-simulator/discharge/stream",
+                                json={"current_a": 1.0, "duration_hours": 0.5, "steps": 100, "every": 10})
+        self.assertTrue(resp.is_streamed)
+        self.assertEqual(resp.mimetype, "application/x-ndjson")
+        frames = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+        self.assertEqual([f["step"] for f in frames[:-1]], list(range(10, 101, 10)))
+        self.assertEqual(frames[-1]["type"], "summary")
+        self.assertAlmostEqual(frames[-1]["new_soc"], 25.0, delta=0.1)
+
+    def test_pack_stream_sse_via_get(self) -> None:
+        resp = self.client.get("/learn/api/pack-simulator/discharge/stream"
+                               "?format=sse&series_cells=16&parallel_cells=4&steps=5&introduce_imbalance=false")
+        self.assertEqual(resp.mimetype, "text/event-stream")
+        events = [block for block in resp.get_data(as_text=True).split("\n\n") if block]
+        self.assertEqual(len(events), 6)
+        self.assertTrue(events[0].startswith("event: step\ndata: "))
+        summary = json.loads(events[-1].split("data: ", 1)[1])
+        self.assertEqual(summary["topology"], "16S4P")
+
+    def test_stream_work_is_bounded(self) -> None:
+        # cells x steps is capped: a 200k-cell pack gets 100 steps, not 1M.
+        frames, steps, _ = education_routes.pack_discharge_frames(
+            {"series_cells": 400, "parallel_cells": 500, "steps": 1_000_000})
+        self.assertEqual(steps, education_routes._STREAM_MAX_CELL_STEPS // 200_000)
+        frames.close()
+
+        resp = self.client.get("/learn/api/cell-simulator/discharge/stream?steps=abc")
+        self.assertEqual(resp.status_code, 400)
+
+    def test_thinned_stream_still_sends_progress(self) -> None:
+        frames = ({"type": "step", "step": n} for n in range(1, 6))
+        chunks = list(education_routes.frame_chunks(frames, total_steps=10, every=1000, progress_seconds=0))
+        self.assertEqual([json.loads(c)["type"] for c in chunks], ["progress"] * 5)
+        frames = ({"type": "step", "step": n} for n in range(1, 6))
+        self.assertEqual(list(education_routes.frame_chunks(frames, total_steps=10, every=1000)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Automated tests for the content-hash keyed PDF render cache."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+import unittest
+
+from modules.pdf_jobs import PRIORITIES, PdfJobQueue
+
+
+def padded_render(result_text, title, chemistry, dod, out_path):
+    with open(out_path, "wb") as fh:
+        fh.write(b"%PDF-1.4 " + title.encode("utf-8") + b" " * 1000)
+    return out_path
+
+
+class PdfRenderCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.queues: list[PdfJobQueue] = []
+
+    def tearDown(self) -> None:
+        for q in self.queues:
+            q.stop()
+        self._tmpdir.cleanup()
+
+    def _queue(self, **kwargs) -> PdfJobQueue:
+        kwargs.setdefault("cache_max_bytes", 1024 * 1024)
+        q = PdfJobQueue(
+            db_path=os.path.join(self._tmpdir.name, "pdf_jobs.db"),
+            output_dir=os.path.join(self._tmpdir.name, "out"),
+            render_fn=padded_render,
+            max_workers=1,
+            max_depth=10,
+            **kwargs,
+        )
+        self.queues.append(q)
+        return q
+
+    @staticmethod
+    def _payload(title: str = "Report") -> dict:
+        return {"result_text": "ok", "title": title, "chemistry": "LiFePO4", "dod": "80"}
+
+    def _drain(self, q: PdfJobQueue, job_id: str, timeout: float = 20.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            q.dispatch_once()
+            job = q.get(job_id)
+            if job.finished:
+                return job
+            time.sleep(0.02)
+        self.fail(f"job {job_id} did not finish")
+
+    def test_identical_requests_coalesce_then_hit(self) -> None:
+        q = self._queue()
+        first = q.submit(self._payload(), priority=PRIORITIES["low"])
+        second = q.submit(self._payload(), priority=PRIORITIES["high"])
+        self.assertEqual(second.id, first.id)
+        self.assertEqual(second.priority, PRIORITIES["high"])
+        self.assertEqual(q.depth(), 1)
+
+        done = self._drain(q, first.id)
+        self.assertEqual(done.status, "done")
+        self.assertFalse([n for n in os.listdir(q.output_dir) if n.endswith(".part")])
+
+        third = q.submit(self._payload())
+        self.assertNotEqual(third.id, first.id)
+        self.assertEqual((third.status, third.cache, third.path), ("done", "hit", done.path))
+        self.assertEqual(q.get(third.id).status, "done")
+
+        cache = q.stats()["cache"]
+        self.assertEqual((cache["hits"], cache["misses"], cache["coalesced"]), (1, 1, 1))
+        self.assertEqual(cache["entries"], 1)
+        self.assertAlmostEqual(cache["hit_rate"], 2 / 3, places=3)
+
+        # A different render version must not reuse the old artifact.
+        other = self._queue(render_version="next")
+        self.assertEqual(other.submit(self._payload()).status, "queued")
+
+    def test_lru_eviction_keeps_cache_under_budget(self) -> None:
+        q = self._queue(cache_max_bytes=2500)
+        paths = {}
+        for title in ("a", "b"):
+            paths[title] = self._drain(q, q.submit(self._payload(title)).id).path
+        self.assertEqual(q.submit(self._payload("a")).cache, "hit")  # "a" is now most recent
+
+        paths["c"] = self._drain(q, q.submit(self._payload("c")).id).path
+        self.assertFalse(os.path.exists(paths["b"]))
+        self.assertTrue(os.path.exists(paths["a"]))
+        cache = q.stats()["cache"]
+        self.assertEqual((cache["entries"], cache["evictions"]), (2, 1))
+        self.assertLessEqual(cache["bytes"], 2500)
+
+        self.assertEqual(q.submit(self._payload("b")).status, "queued")
+
+    def test_purge_keeps_shared_artifacts(self) -> None:
+        q = self._queue()
+        job = self._drain(q, q.submit(self._payload()).id)
+        self.assertEqual(q.purge_finished(max_age_seconds=-1), 1)
+        self.assertIsNone(q.get(job.id))
+        self.assertTrue(os.path.exists(job.path))
+        self.assertEqual(q.submit(self._payload()).cache, "hit")
+
+        uncached = self._queue(cache_max_bytes=0)
+        plain = self._drain(uncached, uncached.submit(self._payload("plain")).id)
+        self.assertIsNone(plain.cache)
+        uncached.purge_finished(max_age_seconds=-1)
+        self.assertFalse(os.path.exists(plain.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
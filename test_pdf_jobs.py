@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Automated tests for the shared SQLite PDF job queue."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import app as app_module
+from modules.pdf_jobs import PRIORITIES, PdfJobQueue, QueueFull
+
+
+def fake_render(result_text, title, chemistry, dod, out_path):
+    if result_text == "boom":
+        raise ValueError("render failed")
+    if result_text == "crash":
+        os._exit(1)  # a render child killed mid-job, e.g. by the OOM killer
+    with open(out_path, "wb") as fh:
+        fh.write(b"%PDF-1.4 " + title.encode("utf-8"))
+    return out_path
+
+
+class PdfJobQueueTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.queues: list[PdfJobQueue] = []
+
+    def tearDown(self) -> None:
+        for q in self.queues:
+            q.stop()
+        self._tmpdir.cleanup()
+
+    def _queue(self, **kwargs) -> PdfJobQueue:
+        kwargs.setdefault("max_depth", 10)
+        q = PdfJobQueue(
+            db_path=os.path.join(self._tmpdir.name, "pdf_jobs.db"),
+            output_dir=os.path.join(self._tmpdir.name, "out"),
+            render_fn=fake_render,
+            max_workers=1,
+            **kwargs,
+        )
+        self.queues.append(q)
+        return q
+
+    @staticmethod
+    def _payload(text: str = "ok", title: str = "Report") -> dict:
+        return {"result_text": text, "title": title, "chemistry": "LiFePO4", "dod": "80"}
+
+    def _drain(self, q: PdfJobQueue, job_id: str, timeout: float = 20.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            q.dispatch_once()
+            job = q.get(job_id)
+            if job.finished:
+                return job
+            time.sleep(0.02)
+        self.fail(f"job {job_id} did not finish")
+
+    def test_priority_order_and_depth_limit(self) -> None:
+        q = self._queue(max_depth=3)
+        low = q.submit(self._payload(), priority=PRIORITIES["low"])
+        normal = q.submit(self._payload())
+        high = q.submit(self._payload(), priority=PRIORITIES["high"])
+        with self.assertRaises(QueueFull):
+            q.submit(self._payload())
+        self.assertEqual([q.position(j) for j in (high, normal, low)], [1, 2, 3])
+        self.assertEqual([q.claim()[0].id for _ in range(3)], [high.id, normal.id, low.id])
+        self.assertIsNone(q.claim())
+        self.assertEqual(q.stats()["rejected"], 1)
+
+    def test_any_worker_sees_status_and_timing(self) -> None:
+        producer, renderer = self._queue(), self._queue()
+        ok = producer.submit(self._payload(title="Pack"))
+        bad = producer.submit(self._payload(text="boom"))
+
+        self.assertEqual(self._drain(renderer, ok.id).status, "done")
+        self.assertEqual(self._drain(renderer, bad.id).status, "error")
+
+        done = producer.get(ok.id)
+        with open(done.path, "rb") as fh:
+            self.assertEqual(fh.read(), b"%PDF-1.4 Pack")
+        timing = done.timing()
+        self.assertIsNotNone(timing["render_ms"])
+        self.assertGreaterEqual(timing["total_ms"], timing["render_ms"])
+        self.assertEqual(producer.get(bad.id).error, "render failed")
+
+        self.assertEqual(producer.purge_finished(max_age_seconds=-1), 2)
+        self.assertIsNone(producer.get(ok.id))
+        self.assertFalse(os.path.exists(done.path))
+
+    def test_single_leader_and_orphan_requeue(self) -> None:
+        first, second = self._queue(lease_ttl_seconds=60), self._queue(lease_ttl_seconds=60)
+        job = first.submit(self._payload())
+        self.assertTrue(first._acquire_lease())
+        self.assertFalse(second._acquire_lease())
+        self.assertEqual(first.claim()[0].id, job.id)
+
+        # The first holder dies; once its lease lapses the next one requeues its job.
+        first._release_lease()
+        self.assertEqual(self._drain(second, job.id).status, "done")
+        self.assertEqual(second.stats()["requeued"], 1)
+
+    def test_pool_recovers_after_render_child_dies(self) -> None:
+        q = self._queue()
+        crash = q.submit(self._payload(text="crash"))
+        self.assertEqual(self._drain(q, crash.id).status, "error")
+
+        later = [q.submit(self._payload(title=f"Report {n}")) for n in range(5)]
+        self.assertEqual([self._drain(q, job.id).status for job in later], ["done"] * 5)
+        self.assertEqual(q.stats()["jobs"]["running"], 0)
+
+    def test_routes_use_shared_queue(self) -> None:
+        q = self._queue(max_depth=1)
+        client = app_module.app.test_client()
+        with mock.patch.object(app_module, "pdf_queue", q):
+            response = client.post("/export-pdf", data={"result_text": "hello", "title": "Bank", "priority": "high"})
+            self.assertEqual(response.status_code, 200)
+            job_id = response.get_json()["job_id"]
+            self.assertEqual(q.get(job_id).priority, PRIORITIES["high"])
+
+            busy = client.post("/export-pdf", data={"result_text": "again"})
+            self.assertEqual(busy.status_code, 429)
+            self.assertIn("Retry-After", busy.headers)
+
+            status = client.get(f"/pdf-status-json/{job_id}").get_json()
+            self.assertEqual((status["status"], status["state"], status["position"]), ("working", "queued", 1))
+
+            self._drain(q, job_id)
+            status = client.get(f"/pdf-status-api/{job_id}").get_json()
+            self.assertEqual(status["status"], "ready")
+            self.assertIsNotNone(status["timing"]["render_ms"])
+            download = client.get(f"/download/{job_id}")
+            self.assertEqual(download.status_code, 200)
+            self.assertEqual(download.get_data(), b"%PDF-1.4 Bank")
+            download.close()
+            self.assertEqual(client.get("/pdf-status-json/missing").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
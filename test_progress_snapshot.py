@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Automated tests for the request-scoped learner progress snapshot."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from app import app
+from modules import education_store
+from routes import education_routes
+
+
+class ProgressSnapshotTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._orig = (education_store.db_path, education_store._DB_READY)
+        education_store.db_path = lambda: os.path.join(self._tmpdir.name, "education_test.db")
+        education_store._DB_READY = False
+        self.user = education_store.create_user("snapper", "password123", email="snapper@example.com")
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+        with self.client.session_transaction() as sess:
+            sess["edu_user_id"] = self.user.id
+            sess["edu_username"] = self.user.username
+            sess["edu_last_activity_at"] = datetime.now(timezone.utc).isoformat()
+
+    def tearDown(self) -> None:
+        education_store.db_path, education_store._DB_READY = self._orig
+        self._tmpdir.cleanup()
+
+    def _count_loads(self):
+        return mock.patch.object(
+            education_routes, "get_learner_state", wraps=education_store.get_learner_state
+        )
+
+    def test_progress_page_loads_state_once(self) -> None:
+        education_store.record_quiz_attempt(self.user.id, "capacity-dod", 9, 10)
+        with self._count_loads() as loads:
+            response = self.client.get("/learn/progress")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(loads.call_count, 1)
+
+    def test_derived_views(self) -> None:
+        for step in range(1, education_routes._TRACKED_LESSON_STEP_COUNTS["lesson:fundamentals"] + 1):
+            education_store.mark_lesson_step(self.user.id, "lesson:fundamentals", step)
+        education_store.mark_lesson_step(self.user.id, "lesson:fundamentals-2", 3)
+        education_store.record_quiz_attempt(self.user.id, "capacity-dod", 8, 10)
+        education_store.record_quiz_attempt(self.user.id, "module-2-assessment", 6, 10)
+
+        with app.test_request_context("/learn/progress"):
+            snap = education_routes._progress_snapshot(self.user.id)
+            self.assertIs(snap, education_routes._progress_snapshot(self.user.id))
+            self.assertIn("lesson:fundamentals", snap.completed_lessons)
+            self.assertIn("capacity-dod", snap.unlock_state["unlocked"])
+            self.assertAlmostEqual(snap.overall_pct, 70.0)
+            self.assertFalse(snap.eligible)
+            self.assertTrue(snap.continue_url().endswith("step=3"))
+
+    def test_writes_invalidate_the_snapshot(self) -> None:
+        with app.test_request_context("/learn/progress"):
+            before = education_routes._progress_snapshot(self.user.id)
+            self.assertFalse(before.has_progress)
+            education_store.mark_progress(self.user.id, "hub:learn-index")
+            self.assertIs(education_routes._progress_snapshot(self.user.id), before)
+            education_routes._invalidate_progress_snapshot(self.user.id)
+            self.assertTrue(education_routes._progress_snapshot(self.user.id).has_progress)
+
+
+if __name__ == "__main__":
+    unittest.main()
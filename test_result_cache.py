@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Automated tests for modules/result_cache.py."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import app as app_module
+import calculator
+from modules.result_cache import ResultCache, make_key
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ResultCacheTests(unittest.TestCase):
+    def test_equivalent_inputs_share_a_key(self) -> None:
+        a = calculator.normalize_pack_inputs(3.2, 100, 16, "Series", chemistry="lifepo4", dod="80")
+        b = calculator.normalize_pack_inputs(3.2000000001, 100.0, 16, "series", chemistry="LiFePO4", dod=80)
+        self.assertEqual(make_key("pack", a), make_key("pack", b))
+        self.assertNotEqual(make_key("pack", a), make_key("bank", a))
+
+    def test_lru_eviction_and_ttl(self) -> None:
+        clock = FakeClock()
+        cache = ResultCache(max_entries=2, ttl_seconds=10, clock=clock)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)  # "b" is now least recently used
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        clock.now += 11
+        self.assertIsNone(cache.get("a"))
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["expirations"], 1)
+
+    def test_sqlite_tier_is_shared_between_instances(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.db")
+            worker_a = ResultCache(sqlite_path=path)
+            worker_b = ResultCache(sqlite_path=path)
+            worker_a.set("pack:x", {"html": "<p>ok</p>"})
+            self.assertEqual(worker_b.get("pack:x"), {"html": "<p>ok</p>"})
+            self.assertEqual(worker_b.stats()["shared_hits"], 1)
+
+    def test_zero_entries_disables_cache(self) -> None:
+        cache = ResultCache(max_entries=0)
+        calls = []
+        cache.get_or_compute("k", lambda: calls.append(1) or "v")
+        cache.get_or_compute("k", lambda: calls.append(1) or "v")
+        self.assertEqual(len(calls), 2)
+
+
+class ResultPageKeyTests(unittest.TestCase):
+    def test_template_change_misses_the_cache(self) -> None:
+        cache = ResultCache(max_entries=8)
+        calls = []
+
+        def compute() -> dict:
+            calls.append(1)
+            return {"summary_text": "ok"}
+
+        with mock.patch.object(app_module, "calc_cache", cache), \
+                mock.patch.object(app_module, "render_template", lambda *a, **k: "<html>"), \
+                app_module.app.app_context():
+            app_module._cached_result_page("pack", {"n": 1}, "Pack Design Result", compute)
+            app_module._cached_result_page("pack", {"n": 1}, "Pack Design Result", compute)
+            self.assertEqual(len(calls), 1)
+            with mock.patch.object(app_module, "_result_template_version", lambda: "after-deploy"):
+                app_module._cached_result_page("pack", {"n": 1}, "Pack Design Result", compute)
+            self.assertEqual(len(calls), 2)
+        self.assertRegex(app_module._result_template_version(), r"^[0-9a-f]{16}$")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Automated tests for server-side pack simulation sessions."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+from app import app
+from modules import education_store
+from modules.interactive_tools import ArrayPackSimulator
+from modules.lithium_education import CellChemistry, CellSpecifications
+from modules.sim_sessions import SimulationSessionStore
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _pack(series: int = 4, parallel: int = 2) -> ArrayPackSimulator:
+    spec = CellSpecifications(3.7, 2000, CellChemistry.LI_ION, 2.5, 4.2)
+    return ArrayPackSimulator(series, parallel, spec, initial_soc=100.0)
+
+
+class SimulationSessionStoreTests(unittest.TestCase):
+    def test_state_persists_between_checkouts(self) -> None:
+        store = SimulationSessionStore()
+        sid = store.create(1, _pack())
+        with store.checkout(sid, 1) as sim:
+            sim.discharge_pack(2.0, 0.25)
+        with store.checkout(sid, 1) as sim:
+            self.assertAlmostEqual(sim.discharge_pack(2.0, 0.25)["avg_soc"], 75.0, delta=0.1)
+        with store.checkout(sid, 2) as sim:
+            self.assertIsNone(sim)
+
+    def test_lru_memory_cap_and_idle_ttl(self) -> None:
+        clock = FakeClock()
+        size = _pack().nbytes
+        store = SimulationSessionStore(max_bytes=size * 2, idle_ttl_seconds=60, clock=clock)
+        first = store.create(1, _pack())
+        second = store.create(1, _pack())
+        with store.checkout(first, 1):
+            pass
+        store.create(1, _pack())  # evicts `second`, the least recently used
+        with store.checkout(second, 1) as sim:
+            self.assertIsNone(sim)
+        stats = store.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertLessEqual(stats["bytes"], size * 2)
+
+        clock.now += 61
+        self.assertEqual(store.stats()["sessions"], 0)
+        with self.assertRaises(ValueError):
+            SimulationSessionStore(max_bytes=size - 1).create(1, _pack())
+
+    def test_snapshot_survives_restart(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sessions.db")
+            store = SimulationSessionStore(sqlite_path=path)
+            sid = store.create(7, _pack())
+            with store.checkout(sid, 7) as sim:
+                before = sim.discharge_pack(4.0, 0.1, steps=10)
+
+            restarted = SimulationSessionStore(sqlite_path=path)
+            with restarted.checkout(sid, 7) as sim:
+                self.assertEqual(sim.get_pack_health()["pack_voltage_v"], before["pack_voltage_v"])
+            self.assertEqual(restarted.stats()["restored"], 1)
+
+
+class SimulationSessionApiTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._orig = (education_store.db_path, education_store._DB_READY)
+        education_store.db_path = lambda: os.path.join(self._tmpdir.name, "education_test.db")
+        education_store._DB_READY = False
+        education_store.ensure_db()
+        user = education_store.create_user("session_user", "password123", email="session@example.com")
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+        with self.client.session_transaction() as sess:
+            sess["edu_user_id"] = user.id
+            sess["edu_username"] = user.username
+            sess["edu_last_activity_at"] = datetime.now(timezone.utc).isoformat()
+
+    def tearDown(self) -> None:
+        education_store.db_path, education_store._DB_READY = self._orig
+        self._tmpdir.cleanup()
+
+    def test_continue_and_delete_session(self) -> None:
+        url = "/learn/api/pack-simulator/discharge"
+        first = self.client.post(url, json={"num_cells": 4, "pack_current_a": 1.0,
+                                            "duration_hours": 0.5, "keep_session": True}).get_json()
+        sid = first["session_id"]
+        second = self.client.post(url, json={"session_id": sid, "pack_current_a": 1.0,
+                                             "duration_hours": 0.5}).get_json()
+        self.assertLess(second["avg_soc"], first["avg_soc"])
+
+        self.assertEqual(self.client.delete(f"/learn/api/pack-simulator/sessions/{sid}").status_code, 200)
+        self.assertEqual(self.client.post(url, json={"session_id": sid}).status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
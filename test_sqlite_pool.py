@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Automated tests for the per-thread SQLite connection pool."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from modules.sqlite_pool import SQLitePool
+
+
+class SQLitePoolTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmpdir.name, "pool.db")
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT UNIQUE)")
+
+    def tearDown(self) -> None:
+        self._tmpdir.cleanup()
+
+    def test_reuses_connection_and_commits(self) -> None:
+        pool = SQLitePool(pragmas=("PRAGMA foreign_keys=ON;",))
+        with pool.connection(self.path) as first:
+            first.execute("INSERT INTO t (v) VALUES ('a')")
+        with pool.connection(self.path) as second:
+            self.assertIs(first, second)
+            self.assertEqual(second.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+        with sqlite3.connect(self.path) as other:
+            self.assertEqual(other.execute("SELECT COUNT(*) FROM t").fetchone()[0], 1)
+        stats = pool.stats()
+        self.assertEqual((stats["opens"], stats["reuses"]), (1, 1))
+
+    def test_recycles_after_max_uses_and_errors(self) -> None:
+        pool = SQLitePool(max_uses=2)
+        with pool.connection(self.path) as a:
+            pass
+        with pool.connection(self.path) as b:
+            self.assertIs(a, b)
+        with pool.connection(self.path) as c:
+            self.assertIsNot(b, c)
+        with self.assertRaises(sqlite3.OperationalError):
+            with pool.connection(self.path) as conn:
+                conn.execute("SELECT * FROM missing_table")
+        with self.assertRaises(sqlite3.IntegrityError):
+            with pool.connection(self.path) as conn:
+                conn.execute("INSERT INTO t (v) VALUES ('x')")
+                conn.execute("INSERT INTO t (v) VALUES ('x')")
+        stats = pool.stats()
+        self.assertEqual(stats["recycled_max_uses"], 1)
+        self.assertEqual(stats["recycled_error"], 1)
+        with pool.connection(self.path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+
+    def test_connections_are_per_thread(self) -> None:
+        pool = SQLitePool()
+        seen = []
+
+        def worker() -> None:
+            with pool.connection(self.path) as conn:
+                seen.append(id(conn))
+
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(pool.stats()["opens"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Automated tests for the asyncio stream server."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from flask import Flask
+from flask.sessions import SecureCookieSessionInterface
+
+from modules.event_broadcaster import EventBroadcaster
+from stream_server import StreamService, serve_in_thread
+from test_event_broadcaster import FakeEvents
+
+
+async def _request(port: int, raw: str, *, until: bytes = b"", timeout: float = 10.0) -> bytes:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw.encode("latin-1"))
+    await writer.drain()
+    data = b""
+    try:
+        while not until or until not in data:
+            chunk = await asyncio.wait_for(reader.read(65536), timeout)
+            if not chunk:
+                break
+            data += chunk
+    finally:
+        writer.close()
+    return data
+
+
+class StreamServerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        os.environ["ADMIN_STREAM_TOKEN"] = "test-admin-token"
+        cls.store = FakeEvents()
+        cls.store.add(5)
+        cls.broadcaster = EventBroadcaster(cls.store.since, cls.store.latest, poll_interval=0.02)
+        cls.service = StreamService(cls.broadcaster, secret_key="test-secret", heartbeat_seconds=0.1)
+        _, cls.port = serve_in_thread(cls.service, "127.0.0.1", 0)
+
+    def _get(self, raw: str, **kwargs) -> bytes:
+        return asyncio.run(_request(self.port, raw, **kwargs))
+
+    def _cookie(self, **session) -> str:
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "test-secret"
+        value = SecureCookieSessionInterface().get_signing_serializer(app).dumps(session)
+        return f"session={value}"
+
+    def test_event_feed_fans_out_resumes_and_heartbeats(self) -> None:
+        token = "token=test-admin-token"
+        self.assertIn(b" 403 ", self._get("GET /admin/events/stream HTTP/1.1\r\n\r\n"))
+
+        async def scenario() -> list[bytes]:
+            streams = [
+                _request(self.port, f"GET /admin/events/stream?{token} HTTP/1.1\r\nLast-Event-ID: 5\r\n\r\n",
+                         until=b"id: 7\n")
+                for _ in range(20)
+            ]
+            tasks = [asyncio.ensure_future(s) for s in streams]
+            while self.broadcaster.stats()["subscribers"] < 20:
+                await asyncio.sleep(0.01)
+            self.store.add(2)
+            return await asyncio.gather(*tasks)
+
+        for body in asyncio.run(scenario()):
+            self.assertTrue(body.startswith(b"HTTP/1.1 200 OK\r\n"))
+            self.assertIn(b"Content-Type: text/event-stream", body)
+            self.assertIn(b"id: 6\nevent: user_event\n", body)
+
+        # Resume from an older id; nothing new afterwards -> keepalive comments.
+        body = self._get(f"GET /admin/events/stream?{token}&since=3 HTTP/1.1\r\n\r\n", until=b": keepalive")
+        ids = [json.loads(line[6:])["id"] for line in body.decode().splitlines() if line.startswith("data: ")]
+        self.assertEqual(ids, [4, 5, 6, 7])
+
+    def test_simulator_stream_requires_session(self) -> None:
+        path = "/learn/api/cell-simulator/discharge/stream?steps=10&every=5"
+        self.assertIn(b" 401 ", self._get(f"GET {path} HTTP/1.1\r\n\r\n"))
+        stale = (datetime.now(timezone.utc) - timedelta(hours=25)).isoformat()
+        body = self._get(f"GET {path} HTTP/1.1\r\nCookie: {self._cookie(edu_user_id=1, edu_last_activity_at=stale)}\r\n\r\n")
+        self.assertIn(b"session_expired_inactive", body)
+
+        body = self._get(f"GET {path} HTTP/1.1\r\nCookie: {self._cookie(edu_user_id=1)}\r\n\r\n")
+        head, _, payload = body.partition(b"\r\n\r\n")
+        self.assertIn(b"application/x-ndjson", head)
+        frames = [json.loads(line) for line in payload.splitlines()]
+        self.assertEqual([f["step"] for f in frames if f["type"] == "step"], [5, 10])
+        self.assertEqual(frames[-1]["type"], "summary")
+
+        pack = json.dumps({"series_cells": 1000, "parallel_cells": 1000})
+        body = self._get(
+            "POST /learn/api/pack-simulator/discharge/stream HTTP/1.1\r\n"
+            f"Cookie: {self._cookie(edu_user_id=1)}\r\nContent-Length: {len(pack)}\r\n\r\n{pack}"
+        )
+        self.assertIn(b" 400 ", body)
+
+    def test_health_and_stats(self) -> None:
+        self.assertIn(b'{"status": "ok"}', self._get("GET /healthz HTTP/1.1\r\n\r\n"))
+        self.assertIn(b" 404 ", self._get("GET /nope HTTP/1.1\r\n\r\n"))
+        body = self._get("GET /stats HTTP/1.1\r\nX-Admin-Token: test-admin-token\r\n\r\n")
+        stats = json.loads(body.partition(b"\r\n\r\n")[2])
+        self.assertIn("event_stream", stats)
+
+
+class SimulatorLimitTests(unittest.TestCase):
+    def test_per_user_cap_and_time_limit(self) -> None:
+        store = FakeEvents()
+        broadcaster = EventBroadcaster(store.since, store.latest, poll_interval=0.02)
+        service = StreamService(broadcaster, secret_key="test-secret", max_simulator_streams_per_user=1,
+                                max_simulator_seconds=0.3)
+        _, port = serve_in_thread(service, "127.0.0.1", 0)
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "test-secret"
+        cookie = "session=" + SecureCookieSessionInterface().get_signing_serializer(app).dumps({"edu_user_id": 7})
+        # A 1M-step single-cell run thinned to nothing: only progress frames.
+        raw = ("GET /learn/api/cell-simulator/discharge/stream?steps=1000000&every=1000000 HTTP/1.1\r\n"
+               f"Cookie: {cookie}\r\n\r\n")
+
+        async def scenario() -> tuple[bytes, bytes]:
+            long_run = asyncio.ensure_future(_request(port, raw))
+            while service.stats()["open_streams"]["simulator"] < 1:
+                await asyncio.sleep(0.01)
+            second = await _request(port, raw)
+            return await long_run, second
+
+        first, second = asyncio.run(scenario())
+        self.assertIn(b" 429 ", second)
+        # The event-stream executor was never used by the simulation.
+        self.assertEqual(service._executor._threads, set())
+        frames = [json.loads(line) for line in first.partition(b"\r\n\r\n")[2].splitlines()]
+        self.assertEqual(frames[-1], {"type": "error", "error": "stream_time_limit"})
+        self.assertEqual(service.stats()["sim_timeouts"], 1)
+        self.assertEqual(service.stats()["open_streams"]["simulator"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Automated tests for the materialized user_summary table."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from app import app
+from modules import education_store
+
+
+class UserSummaryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.admin_token = "test-admin-token"
+        os.environ["ADMIN_STREAM_TOKEN"] = self.admin_token
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._test_db = os.path.join(self._tmpdir.name, "education_test.db")
+        self._orig = (education_store.db_path, education_store._DB_READY)
+        education_store.db_path = lambda: self._test_db
+        education_store._DB_READY = False
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+
+        self.alpha = education_store.create_user("alpha", "password123", email="alpha@example.com")
+        self.bravo = education_store.create_user("bravo", "password123", email="bravo@example.com")
+        education_store.mark_progress(self.alpha.id, "lesson:fundamentals")
+        education_store.mark_lesson_step(self.alpha.id, "lesson:fundamentals-2", 1)
+        education_store.record_quiz_attempt(self.alpha.id, "capacity-dod", 8, 10)
+        education_store.record_quiz_attempt(self.alpha.id, "module-2-assessment", 5, 10)
+
+    def tearDown(self) -> None:
+        education_store.db_path, education_store._DB_READY = self._orig
+        self._tmpdir.cleanup()
+
+    def _summary(self, user_id: int) -> dict:
+        with sqlite3.connect(self._test_db) as conn:
+            conn.row_factory = sqlite3.Row
+            return dict(conn.execute("SELECT * FROM user_summary WHERE user_id = ?", (user_id,)).fetchone())
+
+    def test_write_paths_keep_summary_current(self) -> None:
+        row = self._summary(self.alpha.id)
+        self.assertEqual(row["lessons_completed"], 1)
+        self.assertEqual(row["modules_in_progress"], 1)
+        self.assertEqual(row["quizzes_attempted"], 2)
+        self.assertEqual(row["quizzes_passed"], 1)
+        self.assertAlmostEqual(row["overall_pct"], 65.0)
+
+        education_store.mark_progress(self.alpha.id, "lesson:fundamentals-2")
+        education_store.record_quiz_attempt(self.alpha.id, "module-2-assessment", 9, 10)
+        row = self._summary(self.alpha.id)
+        self.assertEqual(row["lessons_completed"], 2)
+        self.assertEqual(row["modules_in_progress"], 0)
+        self.assertEqual(row["quizzes_passed"], 2)
+
+        last_activity = row["last_activity"]
+        education_store.reset_user_progress(self.alpha.id)
+        row = self._summary(self.alpha.id)
+        self.assertEqual((row["lessons_completed"], row["quizzes_attempted"]), (0, 0))
+        self.assertEqual(row["last_activity"], last_activity)
+        self.assertEqual(education_store.check_user_summaries()["mismatch_count"], 0)
+
+        education_store.delete_user(self.alpha.id)
+        with sqlite3.connect(self._test_db) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM user_summary").fetchone()[0], 1)
+
+    def test_checker_detects_drift_and_rebuild_fixes_it(self) -> None:
+        with sqlite3.connect(self._test_db) as conn:
+            conn.execute("UPDATE user_summary SET quizzes_attempted = 99 WHERE user_id = ?", (self.alpha.id,))
+        report = education_store.check_user_summaries()
+        self.assertEqual(report["mismatches"], [{"user_id": self.alpha.id, "fields": ["quizzes_attempted"]}])
+        self.assertEqual(education_store.rebuild_user_summaries(), 2)
+        self.assertEqual(education_store.check_user_summaries()["mismatch_count"], 0)
+
+    def test_admin_endpoints_read_summary(self) -> None:
+        rows = self.client.get(f"/learn/admin/db/api/users_summary?token={self.admin_token}").get_json()["rows"]
+        alpha = next(r for r in rows if r["user_id"] == self.alpha.id)
+        self.assertEqual((alpha["lessons_completed"], alpha["quizzes_attempted"], alpha["overall_pct"]), (1, 2, 65.0))
+
+        reports = self.client.get(f"/learn/admin/db/api/user_reports?token={self.admin_token}").get_json()["rows"]
+        self.assertEqual([r["user_id"] for r in reports], [self.bravo.id, self.alpha.id])
+        self.assertEqual(reports[1]["quizzes_passed"], 1)
+        self.assertEqual(reports[1]["modules_in_progress"], 1)
+
+        strict = self.client.get(
+            f"/learn/admin/db/api/user_reports?pass_pct=50&user_id={self.alpha.id}&token={self.admin_token}"
+        ).get_json()["rows"]
+        self.assertEqual(strict[0]["quizzes_passed"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()